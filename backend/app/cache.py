@@ -0,0 +1,112 @@
+# In-process caches - LRU with TTL, keyed by data version counters
+
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+
+class LRUCache:
+    """Size-bounded LRU cache whose entries also expire after ttl_seconds.
+
+    Bounded by entry count and, when max_bytes is set, by the approximate
+    size callers report for each value (bytes values report their length).
+    An entry can carry a version; reading it with a different version is a
+    miss that drops it, so callers key by owner and a version bump replaces
+    the entry instead of stranding it until the TTL.
+    """
+
+    def __init__(self, max_entries=256, ttl_seconds=300.0, max_bytes=None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, version=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, entry_version, size, value = entry
+            if expires_at < time.monotonic() or entry_version != version:
+                del self._entries[key]
+                self._bytes -= size
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, version=None, size=None):
+        if size is None:
+            size = len(value) if isinstance(value, (bytes, bytearray)) else 0
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[2]
+            if self.max_bytes and size > self.max_bytes:
+                return
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, version, size, value)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or (self.max_bytes and self._bytes > self.max_bytes):
+                _, (_, _, evicted, _) = self._entries.popitem(last=False)
+                self._bytes -= evicted
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+class GraphVersion:
+    # Monotonic counter bumped by every Neo4j write - the version of each graph cache entry
+
+    _version = 0
+    _lock = threading.Lock()
+    # Distinguishes this process's counters from any other worker or earlier run
+    _epoch = uuid.uuid4().hex[:12]
+
+    @classmethod
+    def current(cls):
+        return cls._version
+
+    @classmethod
+    def tag(cls):
+        return f"{cls._epoch}:{cls._version}"
+
+    @classmethod
+    def bump(cls):
+        with cls._lock:
+            cls._version += 1
+            return cls._version
+
+
+class ActivityVersion(GraphVersion):
+    # Counter for Firestore learning activity (sessions, skill applications, snapshots)
+
+    _version = 0
+    _lock = threading.Lock()
+
+
+graph_cache = LRUCache(
+    max_entries=int(os.getenv("GRAPH_CACHE_MAX_ENTRIES", "256")),
+    ttl_seconds=float(os.getenv("GRAPH_CACHE_TTL", "300")),
+    max_bytes=int(os.getenv("GRAPH_CACHE_MAX_BYTES", str(128 << 20)))
+)
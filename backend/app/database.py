@@ -2,21 +2,25 @@ import os
 import json
 from pathlib import Path
 from typing import Optional
-from neo4j import GraphDatabase
+from neo4j import GraphDatabase, AsyncGraphDatabase
 from neo4j.exceptions import ServiceUnavailable
 import ssl
 import certifi
-from firebase_admin import initialize_app, get_app, firestore
+from firebase_admin import initialize_app, get_app, firestore, firestore_async
 from firebase_admin.credentials import Certificate
 from firebase_admin.exceptions import FirebaseError
 import firebase_admin
 
 
 class Neo4jConnection:
-    # Neo4j helper - creates new driver per request
-    
+    # Neo4j helper - one pooled async driver per process, sessions borrowed per request
+
+    _driver = None
+    _sessions_opened = 0
+    _warmed_connections = 0
+
     @classmethod
-    def create_driver(cls):
+    def _settings(cls):
         uri = os.getenv("NEO4J_URI")
         user = os.getenv("NEO4J_USER")
         password = os.getenv("NEO4J_PASSWORD")
@@ -27,16 +31,102 @@ class Neo4jConnection:
         # Python 3.13+ needs explicit SSL cert config for Neo4j Aura
         os.environ['SSL_CERT_FILE'] = certifi.where()
         os.environ['REQUESTS_CA_BUNDLE'] = certifi.where()
-        
-        driver = GraphDatabase.driver(
-            uri,
-            auth=(user, password),
+
+        return uri, (user, password), dict(
             max_connection_lifetime=3600,
-            max_connection_pool_size=50,
+            max_connection_pool_size=cls.pool_size(),
             connection_timeout=30,
             connection_acquisition_timeout=60
         )
-        return driver
+
+    @classmethod
+    def create_driver(cls):
+        # Standalone sync driver for scripts (seeders) that manage their own lifetime
+        uri, auth, options = cls._settings()
+        return GraphDatabase.driver(uri, auth=auth, **options)
+
+    @classmethod
+    def pool_size(cls):
+        return int(os.getenv("NEO4J_POOL_SIZE", "50"))
+
+    @classmethod
+    def get_driver(cls):
+        # Shared async driver - created on first use, reused by every request
+        if cls._driver is None:
+            uri, auth, options = cls._settings()
+            cls._driver = AsyncGraphDatabase.driver(uri, auth=auth, **options)
+        return cls._driver
+
+    @classmethod
+    def session(cls, **kwargs):
+        # Borrow a session from the shared pool; callers close the session, never the driver
+        cls._sessions_opened += 1
+        return cls.get_driver().session(**kwargs)
+
+    @classmethod
+    async def warm_up(cls, connections=None):
+        """Verify connectivity and open a few pooled connections ahead of traffic"""
+        if connections is None:
+            connections = int(os.getenv("NEO4J_POOL_WARMUP", "2"))
+        driver = cls.get_driver()
+        await driver.verify_connectivity()
+
+        # Hold transactions open together so each one pins its own connection
+        sessions, transactions = [], []
+        try:
+            for _ in range(max(connections, 0)):
+                session = driver.session()
+                sessions.append(session)
+                tx = await session.begin_transaction()
+                transactions.append(tx)
+                result = await tx.run("RETURN 1")
+                await result.consume()
+        finally:
+            for tx in transactions:
+                try:
+                    await tx.close()
+                except Exception:
+                    pass
+            for session in sessions:
+                try:
+                    await session.close()
+                except Exception:
+                    pass
+        cls._warmed_connections = len(transactions)
+        return cls._warmed_connections
+
+    @classmethod
+    async def close(cls):
+        if cls._driver is not None:
+            try:
+                await cls._driver.close()
+            finally:
+                cls._driver = None
+
+    @classmethod
+    def pool_stats(cls):
+        stats = {
+            "driver_open": cls._driver is not None,
+            "max_pool_size": cls.pool_size(),
+            "sessions_opened": cls._sessions_opened,
+            "warmed_connections": cls._warmed_connections,
+        }
+        # The driver has no public pool API, so read the internals defensively
+        pool = getattr(cls._driver, "_pool", None)
+        connections = getattr(pool, "connections", None)
+        if connections is not None:
+            total = 0
+            in_use = 0
+            for address, conns in list(connections.items()):
+                total += len(conns)
+                try:
+                    in_use += pool.in_use_connection_count(address)
+                except Exception:
+                    pass
+            stats["connections"] = total
+            stats["in_use"] = in_use
+            stats["idle"] = total - in_use
+        return stats
 
     @classmethod
     def is_configured(cls):
@@ -49,6 +139,7 @@ class Neo4jConnection:
 
 class FirebaseConnection:
     _initialized = False
+    _async_client = None
 
     @classmethod
     def initialize(cls):
@@ -103,8 +194,23 @@ class FirebaseConnection:
         cls.initialize()
         return firestore.client()
 
+    @classmethod
+    def get_async_firestore(cls):
+        # Non-blocking client for request handlers; firebase_admin caches it per app
+        if cls._async_client is not None:
+            return cls._async_client
+        cls.initialize()
+        return firestore_async.client()
+
+    @classmethod
+    def set_async_firestore(cls, client):
+        # Swap the request-path client (benchmarks, local stand-ins); None restores the default
+        cls._async_client = client
+
     @classmethod
     def is_configured(cls):
+        if cls._async_client is not None:
+            return True
         root = Path(__file__).parent.parent.parent
         sa_path = root / "serviceAccountKey.json"
         if not sa_path.exists():
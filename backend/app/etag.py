@@ -0,0 +1,37 @@
+# ETag helpers - conditional GETs for dashboard read endpoints
+
+import hashlib
+import os
+import time
+from fastapi import Request, Response
+
+# Versions are per process, so tags also roll over after this many seconds to bound
+# staleness from writes made by other workers or directly in the databases
+ETAG_WINDOW_SECONDS = int(os.getenv("ETAG_WINDOW_SECONDS", "300"))
+
+
+def make_etag(*parts) -> str:
+    """Strong ETag derived from data-version parts, never from the payload"""
+    window = int(time.time() // ETAG_WINDOW_SECONDS) if ETAG_WINDOW_SECONDS > 0 else 0
+    raw = "|".join(str(p) for p in (*parts, window))
+    return '"' + hashlib.sha1(raw.encode()).hexdigest() + '"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # If-None-Match uses weak comparison, so ignore a W/ prefix
+    candidates = [tag.strip().removeprefix("W/") for tag in header.split(",")]
+    return etag in candidates
+
+
+def cache_headers(etag: str) -> dict:
+    # no-cache lets browsers keep the body but revalidate it on every refresh
+    return {"ETag": etag, "Cache-Control": "no-cache"}
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers=cache_headers(etag))
@@ -0,0 +1,82 @@
+# Graph diff - delta between the stored skill graph and a regenerated one
+
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Tuple
+from app.ingest import skill_rows, relationship_rows
+
+
+SKILL_FIELDS = ("name", "category", "description", "difficulty", "hours")
+
+
+@dataclass
+class GraphDelta:
+    """Rows to write so the stored graph matches the generated one.
+
+    Skill rows use the ingest shape (id, name, category, description,
+    difficulty, hours); edge rows are {source, target, type, strength}.
+    """
+    added_skills: List[dict] = field(default_factory=list)
+    changed_skills: List[dict] = field(default_factory=list)
+    removed_skill_ids: List[str] = field(default_factory=list)
+    added_edges: List[dict] = field(default_factory=list)
+    changed_edges: List[dict] = field(default_factory=list)
+    removed_edges: List[dict] = field(default_factory=list)
+
+    @property
+    def size(self):
+        return (len(self.added_skills) + len(self.changed_skills) + len(self.removed_skill_ids)
+                + len(self.added_edges) + len(self.changed_edges) + len(self.removed_edges))
+
+    def summary(self) -> dict:
+        return {
+            "skills_added": len(self.added_skills),
+            "skills_changed": len(self.changed_skills),
+            "skills_removed": len(self.removed_skill_ids),
+            "edges_added": len(self.added_edges),
+            "edges_changed": len(self.changed_edges),
+            "edges_removed": len(self.removed_edges),
+            "total": self.size,
+        }
+
+
+def _edge_key(row) -> Tuple[str, str, str]:
+    return row["source"], row["target"], row["type"]
+
+
+def diff_graph(current_skills: Iterable[dict], current_edges: Iterable[dict], skills, relationships) -> GraphDelta:
+    """Compare stored rows (repository shape) with generated Skill/SkillRelationship models.
+
+    Edges of a removed skill are not listed; deleting the skill detaches them.
+    Generated edges pointing at skills outside the generated set are dropped.
+    """
+    delta = GraphDelta()
+
+    current = {row["id"]: row for row in current_skills}
+    generated = {row["id"]: row for row in skill_rows(skills)}
+    for skill_id, row in generated.items():
+        stored = current.get(skill_id)
+        if stored is None:
+            delta.added_skills.append(row)
+        elif any(stored.get(f) != row[f] for f in SKILL_FIELDS):
+            delta.changed_skills.append(row)
+    delta.removed_skill_ids = [skill_id for skill_id in current if skill_id not in generated]
+
+    grouped, _ = relationship_rows(relationships)
+    new_edges: Dict[Tuple[str, str, str], dict] = {}
+    for rel_type, rows in grouped.items():
+        for row in rows:
+            if row["source"] in generated and row["target"] in generated:
+                new_edges[_edge_key({**row, "type": rel_type})] = {**row, "type": rel_type}
+
+    old_edges = {_edge_key(row): row for row in current_edges}
+    for key, row in new_edges.items():
+        stored = old_edges.get(key)
+        if stored is None:
+            delta.added_edges.append(row)
+        elif stored.get("strength") != row["strength"]:
+            delta.changed_edges.append(row)
+    for key, row in old_edges.items():
+        if key not in new_edges and row["source"] in generated and row["target"] in generated:
+            delta.removed_edges.append({"source": row["source"], "target": row["target"], "type": row["type"]})
+
+    return delta
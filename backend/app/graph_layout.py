@@ -0,0 +1,234 @@
+# Graph layout - NumPy force-directed positions for the knowledge graph, cached per topology
+
+import asyncio
+import hashlib
+import math
+import os
+from typing import Dict, Iterable, List, Optional, Tuple
+import numpy as np
+
+
+# Same scale as the d3 simulation in KnowledgeGraph.tsx: link distance 100, charge -200, x/y pull 0.05
+LINK_DISTANCE = 100.0
+LINK_STRENGTH = 0.25
+CHARGE = 200.0
+GRAVITY = 0.05
+# Up to this many nodes repulsion is exact; above it a grid approximation is used
+EXACT_LIMIT = 300
+NODES_PER_CELL = 16
+MIN_DIST2 = 1.0
+# Cell pairs evaluated per block in the far field, bounding its temporary arrays
+FAR_FIELD_BLOCK = 1 << 20
+
+
+def _phyllotaxis(count, offset=0):
+    # d3's initial placement: a sunflower spiral around the origin
+    i = np.arange(offset, offset + count, dtype=np.float64)
+    radius = 10.0 * np.sqrt(0.5 + i)
+    angle = i * math.pi * (3 - math.sqrt(5))
+    return np.stack([radius * np.cos(angle), radius * np.sin(angle)], axis=1)
+
+
+def _repulsion_exact(pos):
+    x, y = pos[:, 0], pos[:, 1]
+    dx = x[:, None] - x[None, :]
+    dy = y[:, None] - y[None, :]
+    inv = 1.0 / np.maximum(dx * dx + dy * dy, MIN_DIST2)
+    np.fill_diagonal(inv, 0.0)
+    return CHARGE * np.stack([(dx * inv).sum(axis=1), (dy * inv).sum(axis=1)], axis=1)
+
+
+def _repulsion_grid(pos):
+    """Exact repulsion inside each grid cell; other cells act as one mass at their centroid.
+
+    Cell boundaries are per-axis quantiles, so dense regions get small cells
+    and every cell holds roughly NODES_PER_CELL nodes. The far field is
+    computed between cell centroids and shared by every node of a cell, so it
+    costs O(cells^2) = O(n^2 / NODES_PER_CELL^2) time and bounded memory.
+    """
+    n = len(pos)
+    side = max(1, int(math.sqrt(n / NODES_PER_CELL)))
+    quantiles = np.linspace(0, 1, side + 1)[1:-1]
+    col = np.searchsorted(np.quantile(pos[:, 0], quantiles), pos[:, 0])
+    row = np.searchsorted(np.quantile(pos[:, 1], quantiles), pos[:, 1])
+    cell = col * side + row
+    num_cells = side * side
+
+    counts = np.bincount(cell, minlength=num_cells)
+    sums = np.stack([np.bincount(cell, weights=pos[:, k], minlength=num_cells) for k in (0, 1)], axis=1)
+    occupied = np.nonzero(counts)[0]
+    mass = counts[occupied].astype(np.float64)
+    cx, cy = (sums[occupied] / mass[:, None]).T
+
+    # Far field: occupied cell against occupied cell in blocks, a cell's own mass excluded
+    m = len(occupied)
+    far = np.empty((m, 2))
+    block = max(1, FAR_FIELD_BLOCK // m)
+    for start in range(0, m, block):
+        stop = min(m, start + block)
+        dx = cx[start:stop, None] - cx[None, :]
+        dy = cy[start:stop, None] - cy[None, :]
+        weight = mass[None, :] / np.maximum(dx * dx + dy * dy, MIN_DIST2)
+        weight[np.arange(stop - start), np.arange(start, stop)] = 0.0
+        far[start:stop, 0] = (dx * weight).sum(axis=1)
+        far[start:stop, 1] = (dy * weight).sum(axis=1)
+    force = CHARGE * far[np.searchsorted(occupied, cell)]
+
+    # Near field: all ordered pairs that share a cell
+    order = np.argsort(cell, kind="stable")
+    sorted_cells = cell[order]
+    per_node = counts[sorted_cells]
+    starts = np.searchsorted(sorted_cells, sorted_cells)
+    i_sorted = np.repeat(np.arange(n), per_node)
+    offsets = np.arange(per_node.sum()) - np.repeat(np.cumsum(per_node) - per_node, per_node)
+    j_sorted = np.repeat(starts, per_node) + offsets
+    keep = i_sorted != j_sorted
+    i, j = order[i_sorted[keep]], order[j_sorted[keep]]
+    pair_delta = pos[i] - pos[j]
+    pair_force = CHARGE * pair_delta / np.maximum((pair_delta ** 2).sum(-1), MIN_DIST2)[:, None]
+    for k in (0, 1):
+        force[:, k] += np.bincount(i, weights=pair_force[:, k], minlength=n)
+    return force
+
+
+def _attraction(pos, src, dst):
+    force = np.zeros_like(pos)
+    if len(src) == 0:
+        return force
+    delta = pos[dst] - pos[src]
+    dist = np.maximum(np.sqrt((delta ** 2).sum(-1)), 1e-6)
+    pull = (LINK_STRENGTH * (dist - LINK_DISTANCE) / dist)[:, None] * delta
+    for k in (0, 1):
+        force[:, k] += np.bincount(src, weights=pull[:, k], minlength=len(pos))
+        force[:, k] -= np.bincount(dst, weights=pull[:, k], minlength=len(pos))
+    return force
+
+
+def force_layout(
+    node_ids: List[str],
+    links: Iterable[Tuple[str, str]],
+    previous: Optional[Dict[str, Tuple[float, float]]] = None,
+    iterations: int = 300
+) -> Dict[str, Tuple[float, float]]:
+    """Positions centred on the origin, keyed by node id.
+
+    Nodes found in ``previous`` start where they were and the run is shortened
+    and cooler, so small edits barely move the existing layout. New nodes
+    start at the centroid of their already-placed neighbours.
+    """
+    n = len(node_ids)
+    if n == 0:
+        return {}
+    slot = {node_id: i for i, node_id in enumerate(node_ids)}
+    edges = [(slot[s], slot[t]) for s, t in links if s in slot and t in slot and s != t]
+    src = np.array([s for s, _ in edges], dtype=np.int64)
+    dst = np.array([t for _, t in edges], dtype=np.int64)
+
+    previous = previous or {}
+    known = np.array([node_id in previous for node_id in node_ids])
+    pos = _phyllotaxis(n)
+    if known.any():
+        pos[known] = [previous[node_id] for node_id, k in zip(node_ids, known) if k]
+        pos[~known] = _phyllotaxis(int((~known).sum()), offset=int(known.sum())) + pos[known].mean(axis=0)
+        for s, t in edges:
+            # One pass is enough to drop a new leaf next to the skill it hangs off
+            for new, anchor in ((s, t), (t, s)):
+                if not known[new] and known[anchor]:
+                    pos[new] = pos[anchor] + _phyllotaxis(1, offset=new)[0]
+
+    warm = known.mean() >= 0.9
+    if warm:
+        iterations = max(1, iterations // 5)
+    temperature = 10.0 if warm else 50.0
+    cooling = (0.5 / temperature) ** (1.0 / max(iterations, 1))
+    repulsion = _repulsion_exact if n <= EXACT_LIMIT else _repulsion_grid
+
+    for _ in range(iterations):
+        force = repulsion(pos) + _attraction(pos, src, dst) - GRAVITY * pos
+        length = np.maximum(np.sqrt((force ** 2).sum(-1)), 1e-9)
+        pos += force * np.minimum(1.0, temperature / length)[:, None]
+        temperature *= cooling
+
+    pos -= pos.mean(axis=0)
+    return {node_id: (round(float(x), 1), round(float(y), 1)) for node_id, (x, y) in zip(node_ids, pos)}
+
+
+def topology_key(node_ids: Iterable[str], links: Iterable[Tuple[str, str]]) -> str:
+    digest = hashlib.sha1()
+    for node_id in sorted(node_ids):
+        digest.update(node_id.encode() + b"\0")
+    digest.update(b"\1")
+    for source, target in sorted(links):
+        digest.update(f"{source}\0{target}\0".encode())
+    return digest.hexdigest()
+
+
+class GraphLayoutCache:
+    """Latest layout per graph topology; the previous one seeds the next computation.
+
+    Keyed by a hash of node ids and links rather than GraphVersion, so
+    LEARNED-only writes and no-op regenerations reuse the same positions.
+    A new topology never waits for the simulation: requests get the last
+    positions (nodes not in them have none, and the client lays them out)
+    while one background task computes the newest requested topology in a
+    worker thread. `generation` counts finished layouts so response caches
+    can pick the new positions up. Graphs above `max_nodes` are not laid out,
+    and a topology whose layout failed is not retried until the topology
+    changes.
+    """
+
+    def __init__(self, iterations=300, max_nodes=20000):
+        self.iterations = iterations
+        self.max_nodes = max_nodes
+        self.computed = 0
+        self.generation = 0
+        self._key: Optional[str] = None
+        self._failed_key: Optional[str] = None
+        self._positions: Dict[str, Tuple[float, float]] = {}
+        self._wanted: Optional[Tuple[str, List[str], List[Tuple[str, str]]]] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def positions(self, node_ids: List[str], links: List[Tuple[str, str]]) -> Dict[str, Tuple[float, float]]:
+        if len(node_ids) > self.max_nodes:
+            return {}
+        key = topology_key(node_ids, links)
+        if key != self._key and key != self._failed_key:
+            self._wanted = (key, node_ids, links)
+            if self._task is None or self._task.done():
+                self._task = asyncio.create_task(self._compute())
+        return self._positions
+
+    async def _compute(self):
+        # Runs until the newest requested topology is laid out; requests made meanwhile only update _wanted
+        while self._wanted is not None and self._wanted[0] not in (self._key, self._failed_key):
+            key, node_ids, links = self._wanted
+            try:
+                positions = await asyncio.to_thread(force_layout, node_ids, links, self._positions, self.iterations)
+            except Exception as e:
+                print(f"Graph layout failed: {e}")
+                self._failed_key = key
+                continue
+            self._key, self._positions, self._failed_key = key, positions, None
+            self.computed += 1
+            self.generation += 1
+
+    async def wait(self):
+        """Wait for a pending layout, for scripts and benchmarks"""
+        if self._task is not None:
+            await self._task
+
+    def stats(self):
+        return {
+            "nodes": len(self._positions),
+            "computed": self.computed,
+            "iterations": self.iterations,
+            "maxNodes": self.max_nodes,
+            "pending": self._task is not None and not self._task.done(),
+            "failed": self._failed_key is not None,
+        }
+
+
+graph_layout = GraphLayoutCache(
+    iterations=int(os.getenv("GRAPH_LAYOUT_ITERATIONS", "300")),
+    max_nodes=int(os.getenv("GRAPH_LAYOUT_MAX_NODES", "20000"))
+)
@@ -1,10 +1,21 @@
 # GraphRAG - uses OpenAI to generate skills and relationships dynamically
 
 import os
-from typing import List, Dict, Any, Optional
+import re
+import math
+import asyncio
+import functools
+import itertools
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import List, Dict, Any, Optional, Callable
 import json
-from openai import OpenAI
+from openai import OpenAI, AsyncOpenAI
 from pydantic import BaseModel
+from app.llm_cache import get_llm_cache
+from app.metrics import LLM_CACHE_HITS, record_completion
 
 
 class Skill(BaseModel):
@@ -31,14 +42,129 @@ class LearningPath(BaseModel):
     difficulty_progression: List[int]
 
 
+def parse_json_content(content):
+    # Models sometimes wrap JSON in markdown fences
+    content = content.strip()
+    if content.startswith("```"):
+        content = content.split("```")[1]
+        if content.startswith("json"):
+            content = content[4:]
+        content = content.strip()
+    return json.loads(content)
+
+
+SKILL_CATEGORIES = ["frontend", "backend", "database", "devops", "ai-ml", "mobile", "security"]
+
+# Above this many skills, generation is split into one completion per category
+SHARD_THRESHOLD = int(os.getenv("SKILL_SHARD_THRESHOLD", "30"))
+
+
+def normalise_skill_id(value):
+    return re.sub(r"[^a-z0-9]+", "-", value.lower()).strip("-")
+
+
+def plan_skill_shards(num_skills, categories=SKILL_CATEGORIES):
+    # (category, count) pairs; every category asks for an equal share, rounded up
+    per_shard = math.ceil(num_skills / len(categories))
+    return [(category, per_shard) for category in categories]
+
+
+def merge_skill_shards(shards: List[List["Skill"]], limit):
+    """Round-robin across shards so truncation keeps categories balanced; first id or name wins"""
+    merged, seen_ids, seen_names = [], set(), set()
+    for row in itertools.zip_longest(*shards):
+        for skill in row:
+            if skill is None:
+                continue
+            skill_id = normalise_skill_id(skill.id or skill.name)
+            name_key = normalise_skill_id(skill.name)
+            if not skill_id or skill_id in seen_ids or name_key in seen_names:
+                continue
+            seen_ids.add(skill_id)
+            seen_names.add(name_key)
+            merged.append(skill.model_copy(update={"id": skill_id}))
+    return merged[:limit]
+
+
+@dataclass
+class LLMCall:
+    # One completion: prompt, sampling params, how to read the JSON and what to return on failure
+    messages: Optional[List[dict]]
+    temperature: float = 0.3
+    params: Dict[str, Any] = field(default_factory=dict)
+    parse: Callable[[Any], Any] = lambda data: data
+    fallback: Callable[[], Any] = lambda: None
+    error: str = "LLM call failed"
+
+    @classmethod
+    def skip(cls, value):
+        # Nothing to ask the model - resolve straight to value
+        return cls(messages=None, fallback=lambda: value)
+
+
 class GraphRAG:
-    def __init__(self, api_key=None):
+    def __init__(self, api_key=None, cache=None):
         self.api_key = api_key or os.getenv("OPENAI_API_KEY")
         if not self.api_key:
             raise ValueError("OpenAI API key not found. Set OPENAI_API_KEY environment variable.")
         
-        self.client = OpenAI(api_key=self.api_key)
+        self.client = self._make_client()
         self.model = "gpt-4o-mini"
+        self.cache = cache if cache is not None else get_llm_cache()
+    
+    def _make_client(self):
+        return OpenAI(api_key=self.api_key)
+    
+    def _execute(self, call: LLMCall):
+        if call.messages is None:
+            return call.fallback()
+        try:
+            return call.parse(self._complete_json(call.messages, call.temperature, **call.params))
+        except Exception as e:
+            print(f"{call.error}: {e}")
+            return call.fallback()
+    
+    def _gather(self, calls, combine):
+        # Independent calls (zero-argument callables) run on a thread pool; AsyncGraphRAG awaits them together
+        workers = min(len(calls), int(os.getenv("OPENAI_MAX_CONCURRENCY", "8"))) or 1
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            return combine(list(pool.map(lambda call: call(), calls)))
+    
+    def _cache_lookup(self, messages, temperature, params):
+        # Returns (cache key, parsed cached response or None)
+        if self.cache is None:
+            return None, None
+        key = self.cache.make_key(self.model, messages, temperature, **params)
+        cached = self.cache.get(key)
+        if cached is None:
+            return key, None
+        LLM_CACHE_HITS.inc(model=self.model)
+        return key, parse_json_content(cached)
+    
+    def _cache_store(self, key, content):
+        # Parse first: only responses that parsed are cached, so a bad completion is retried
+        parsed = parse_json_content(content)
+        if key is not None:
+            self.cache.set(key, content)
+        return parsed
+    
+    def _complete_json(self, messages, temperature, **params):
+        # Chat completion parsed as JSON; identical requests are served from the LLM cache
+        key, cached = self._cache_lookup(messages, temperature, params)
+        if cached is not None:
+            return cached
+        
+        start, res = time.perf_counter(), None
+        try:
+            res = self.client.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                temperature=temperature,
+                **params
+            )
+        finally:
+            record_completion(self.model, time.perf_counter() - start, res)
+        return self._cache_store(key, res.choices[0].message.content)
     
     def enrich_single_skill(self, skill_name):
         # Use AI to get skill metadata
@@ -59,46 +185,32 @@ Respond with ONLY valid JSON, no markdown, no explanation:
   "learning_time_hours": Y
 }}"""
 
-        try:
-            res = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": "You are a technical skill analysis expert. Respond only with valid JSON."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.3,
-                max_tokens=200
-            )
-            
-            content = res.choices[0].message.content.strip()
-            
-            # Remove markdown if present
-            if content.startswith("```"):
-                content = content.split("```")[1]
-                if content.startswith("json"):
-                    content = content[4:]
-                content = content.strip()
-            
-            enriched = json.loads(content)
-            
+        def parse(enriched):
             enriched.setdefault('description', f'User-added skill: {skill_name}')
             enriched.setdefault('difficulty_level', 2)
             enriched.setdefault('learning_time_hours', 20)
-            
             return enriched
-            
-        except Exception as e:
-            print(f"Error enriching skill '{skill_name}': {e}")
-            return {
+        
+        return self._execute(LLMCall(
+            messages=[
+                {"role": "system", "content": "You are a technical skill analysis expert. Respond only with valid JSON."},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=0.3,
+            params={"max_tokens": 200},
+            parse=parse,
+            fallback=lambda: {
                 'description': f'User-added skill: {skill_name}',
                 'difficulty_level': 2,
                 'learning_time_hours': 20
-            }
+            },
+            error=f"Error enriching skill '{skill_name}'"
+        ))
     
     def find_related_skills(self, skill_name, existing_skills):
         # Find semantically related skills using AI
         if not existing_skills:
-            return []
+            return self._execute(LLMCall.skip([]))
         
         prompt = f"""Given the skill: "{skill_name}"
 
@@ -134,40 +246,27 @@ If no real relationships exist, return empty array.
 Respond with ONLY a JSON array of skill names, no explanation:
 ["skill1"]"""
 
-        try:
-            res = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": "You are a technical skill relationship expert. Respond only with valid JSON."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.3,
-                max_tokens=100
-            )
-            
-            content = res.choices[0].message.content.strip()
-            
-            if content.startswith("```"):
-                content = content.split("```")[1]
-                if content.startswith("json"):
-                    content = content[4:]
-                content = content.strip()
-            
-            related = json.loads(content)
-            
+        def parse(related):
             if isinstance(related, list):
                 return [s for s in related if s in existing_skills][:3]
-            
-            return []
-            
-        except Exception as e:
-            print(f"Error finding related skills: {e}")
             return []
+        
+        return self._execute(LLMCall(
+            messages=[
+                {"role": "system", "content": "You are a technical skill relationship expert. Respond only with valid JSON."},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=0.3,
+            params={"max_tokens": 100},
+            parse=parse,
+            fallback=lambda: [],
+            error="Error finding related skills"
+        ))
     
     def find_prerequisites(self, skill_name, existing_skills):
         # Find prerequisite skills using AI
         if not existing_skills:
-            return []
+            return self._execute(LLMCall.skip([]))
         
         prompt = f"""Given the skill: "{skill_name}"
 
@@ -194,38 +293,88 @@ If no real prerequisites exist in the list, return empty array.
 Respond with ONLY a JSON array of skill names, no explanation:
 ["skill1", "skill2"]"""
 
-        try:
-            res = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": "You are a technical skill prerequisite expert. Only return TRUE prerequisites. Respond only with valid JSON."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.2,
-                max_tokens=100
-            )
-            
-            content = res.choices[0].message.content.strip()
-            
-            if content.startswith("```"):
-                content = content.split("```")[1]
-                if content.startswith("json"):
-                    content = content[4:]
-                content = content.strip()
-            
-            prereqs = json.loads(content)
-            
+        def parse(prereqs):
             if isinstance(prereqs, list):
                 return [s for s in prereqs if s in existing_skills][:2]
-            
-            return []
-            
-        except Exception as e:
-            print(f"Error finding prerequisites: {e}")
             return []
+        
+        return self._execute(LLMCall(
+            messages=[
+                {"role": "system", "content": "You are a technical skill prerequisite expert. Only return TRUE prerequisites. Respond only with valid JSON."},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=0.2,
+            params={"max_tokens": 100},
+            parse=parse,
+            fallback=lambda: [],
+            error="Error finding prerequisites"
+        ))
+    
+    def analyze_skill(self, skill_name, candidate_skills):
+        # One completion for metadata, related skills and prerequisites, sharing one candidate list
+        candidates_text = ', '.join(candidate_skills) if candidate_skills else '(none)'
+        prompt = f"""Analyze the technical skill: "{skill_name}"
+
+Existing skills in the knowledge graph:
+{candidates_text}
+
+Provide:
+1. description: Brief 1-sentence description of what this skill is
+2. difficulty_level: Integer 1-5 (1=beginner, 5=expert)
+3. learning_time_hours: Estimated hours to learn (realistic estimate)
+4. related: 0-2 skills FROM THE LIST that are DIRECTLY RELATED to "{skill_name}"
+   - same ecosystem (React ↔ Next.js), direct extension (Python ↔ FastAPI),
+     or always used together (HTML ↔ CSS)
+   - NOT alternatives (Python vs Node.js), NOT deployment platforms (AWS, Docker),
+     NOT different domains (Django ↔ React)
+5. prerequisites: 0-2 skills FROM THE LIST you should learn BEFORE "{skill_name}"
+   - e.g. JavaScript is a prerequisite of React, Python of Django, SQL of PostgreSQL
+   - only truly foundational skills; never a different language or stack
+
+Be STRICT. Use exact names from the list. Use empty arrays when nothing qualifies.
+
+Respond with ONLY valid JSON:
+{{
+  "description": "...",
+  "difficulty_level": X,
+  "learning_time_hours": Y,
+  "related": ["..."],
+  "prerequisites": ["..."]
+}}"""
+
+        def parse(data):
+            related = data.get("related") or []
+            prereqs = data.get("prerequisites") or []
+            return {
+                'description': data.get('description') or f'User-added skill: {skill_name}',
+                'difficulty_level': data.get('difficulty_level', 2),
+                'learning_time_hours': data.get('learning_time_hours', 20),
+                'related': [s for s in related if s in candidate_skills][:3],
+                'prerequisites': [s for s in prereqs if s in candidate_skills][:2],
+            }
+        
+        # None tells the caller to fall back to the separate enrich/related/prerequisite calls
+        return self._execute(LLMCall(
+            messages=[
+                {"role": "system", "content": "You are a technical skill analysis expert. Respond only with valid JSON."},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=0.2,
+            params={"max_tokens": 300, "response_format": {"type": "json_object"}},
+            parse=parse,
+            fallback=lambda: None,
+            error=f"Error analyzing skill '{skill_name}'"
+        ))
     
     def generate_skills_from_domain(self, domain, num_skills=20):
-        # Generate skills for a domain using AI
+        # Generate skills for a domain using AI; large requests are sharded by category
+        if num_skills > SHARD_THRESHOLD:
+            return self._gather(
+                [functools.partial(self.generate_category_skills, domain, category, count)
+                 for category, count in plan_skill_shards(num_skills)],
+                lambda shards: merge_skill_shards(shards, num_skills) or self._get_fallback_skills(domain)
+            )
+        
         prompt = f"""You are an expert curriculum designer. Generate {num_skills} technical skills for the domain: "{domain}".
 
 For each skill, provide:
@@ -242,28 +391,53 @@ Include variety across all categories.
 Return ONLY valid JSON array of skills with no additional text:
 [{{"id": "...", "name": "...", "category": "...", "description": "...", "difficulty_level": 1, "learning_time_hours": 10}}, ...]"""
 
-        try:
-            res = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": "You are an expert technical curriculum designer. Return only valid JSON."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.7,
-                response_format={"type": "json_object"}
-            )
-            
-            content = res.choices[0].message.content
-            data = json.loads(content)
-            
+        def parse(data):
             skills_data = data if isinstance(data, list) else data.get("skills", [])
-            
-            skills = [Skill(**skill) for skill in skills_data]
-            return skills
-            
-        except Exception as e:
-            print(f"Error generating skills: {e}")
-            return self._get_fallback_skills(domain)
+            return [Skill(**skill) for skill in skills_data]
+        
+        return self._execute(LLMCall(
+            messages=[
+                {"role": "system", "content": "You are an expert technical curriculum designer. Return only valid JSON."},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=0.7,
+            params={"response_format": {"type": "json_object"}},
+            parse=parse,
+            fallback=lambda: self._get_fallback_skills(domain),
+            error="Error generating skills"
+        ))
+    
+    def generate_category_skills(self, domain, category, num_skills):
+        # One shard of a large generation; a failed shard contributes nothing instead of the fallback skills
+        prompt = f"""You are an expert curriculum designer. Generate up to {num_skills} technical skills in the "{category}" category for the domain: "{domain}".
+
+For each skill, provide:
+- id: lowercase, hyphenated identifier (e.g., "react-hooks")
+- name: Proper display name (e.g., "React Hooks")
+- description: Brief 1-sentence description
+- difficulty_level: 1 (beginner) to 5 (expert)
+- learning_time_hours: Estimated hours to learn (5-100)
+
+Cover fundamentals to advanced topics. Only include skills that belong to the "{category}" category and matter for this domain; return fewer (or none) if the category is a poor fit.
+
+Return ONLY valid JSON with no additional text:
+{{"skills": [{{"id": "...", "name": "...", "description": "...", "difficulty_level": 1, "learning_time_hours": 10}}, ...]}}"""
+
+        def parse(data):
+            skills_data = data if isinstance(data, list) else data.get("skills", [])
+            return [Skill(**{**skill, "category": category}) for skill in skills_data[:num_skills]]
+        
+        return self._execute(LLMCall(
+            messages=[
+                {"role": "system", "content": "You are an expert technical curriculum designer. Return only valid JSON."},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=0.7,
+            params={"response_format": {"type": "json_object"}},
+            parse=parse,
+            fallback=lambda: [],
+            error=f"Error generating {category} skills"
+        ))
     
     def generate_skill_relationships(self, skills):
         # Generate relationships between skills using AI
@@ -298,97 +472,55 @@ Ensure beginners have prerequisites and advanced skills build on fundamentals.
 Return ONLY valid JSON array:
 [{{"source_skill_id": "...", "target_skill_id": "...", "relationship_type": "PREREQUISITE_OF", "strength": 0.9}}, ...]"""
 
-        try:
-            res = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": "You are an expert at knowledge graph design. Return only valid JSON."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.5,
-                response_format={"type": "json_object"}
-            )
-            
-            content = res.choices[0].message.content
-            data = json.loads(content)
-            
+        def parse(data):
             rels_data = data if isinstance(data, list) else data.get("relationships", [])
-            
-            relationships = [SkillRelationship(**rel) for rel in rels_data]
-            return relationships
-            
-        except Exception as e:
-            print(f"Error generating relationships: {e}")
-            return self._generate_basic_relationships(skills)
-    
-    def generate_learning_path(self, user_skills, target_skill, all_skills, relationships):
-        # Generate personalized learning path
-        skills_map = {skill.id: skill for skill in all_skills}
-        target = skills_map.get(target_skill)
-        
-        if not target:
-            return None
+            return [SkillRelationship(**rel) for rel in rels_data]
         
-        context = {
-            "user_skills": user_skills,
-            "target_skill": {
-                "id": target.id,
-                "name": target.name,
-                "difficulty": target.difficulty_level
-            },
-            "available_skills": [
-                {"id": s.id, "name": s.name, "difficulty": s.difficulty_level, "hours": s.learning_time_hours}
-                for s in all_skills if s.id not in user_skills
+        return self._execute(LLMCall(
+            messages=[
+                {"role": "system", "content": "You are an expert at knowledge graph design. Return only valid JSON."},
+                {"role": "user", "content": prompt}
             ],
-            "prerequisites": [
-                {"from": r.source_skill_id, "to": r.target_skill_id}
-                for r in relationships if r.relationship_type == "PREREQUISITE_OF"
-            ]
-        }
+            temperature=0.5,
+            params={"response_format": {"type": "json_object"}},
+            parse=parse,
+            fallback=lambda: self._generate_basic_relationships(skills),
+            error="Error generating relationships"
+        ))
+    
+    def annotate_learning_path(self, path, skills):
+        # Optional LLM commentary on a path computed by app.learning_path; skills are its skill_rows
+        steps = [
+            {"id": s, "name": skills[s]["name"], "difficulty": skills[s]["difficulty"]}
+            for s in path.skills if s in skills
+        ]
         
-        prompt = f"""Create an optimal learning path for a student.
+        prompt = f"""A student will follow this learning path, in order:
 
-Current situation:
-- User knows: {', '.join(user_skills) if user_skills else 'None (beginner)'}
-- Target skill: {target.name}
+{json.dumps(steps, indent=2)}
 
-Available skills and prerequisites:
-{json.dumps(context, indent=2)}
+Total estimated time: {path.estimated_duration_hours} hours.
 
-Generate a logical learning path:
-1. Start from user's current level
-2. Include necessary prerequisites
-3. Progress from easier to harder skills
-4. End at the target skill
+Do NOT change, add or remove steps. Write:
+1. summary: 1-2 sentences on what the path builds towards
+2. tips: one short tip per step, in the same order
 
 Return ONLY valid JSON:
 {{
-  "path_id": "path-to-{target_skill}",
-  "name": "Learning Path to {target.name}",
-  "skills": ["skill-id-1", "skill-id-2", ...],
-  "estimated_duration_hours": <total hours>,
-  "difficulty_progression": [1, 2, 2, 3, ...]
+  "summary": "...",
+  "tips": ["...", "..."]
 }}"""
 
-        try:
-            res = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": "You are an expert learning path designer. Return only valid JSON."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.3,
-                response_format={"type": "json_object"}
-            )
-            
-            content = res.choices[0].message.content
-            data = json.loads(content)
-            
-            return LearningPath(**data)
-            
-        except Exception as e:
-            print(f"Error generating learning path: {e}")
-            return None
+        return self._execute(LLMCall(
+            messages=[
+                {"role": "system", "content": "You are an expert learning path designer. Return only valid JSON."},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=0.3,
+            params={"response_format": {"type": "json_object"}},
+            fallback=lambda: None,
+            error="Error annotating learning path"
+        ))
     
     def enrich_skill_with_resources(self, skill):
         # Get learning resources for a skill
@@ -413,28 +545,20 @@ Return ONLY valid JSON:
   "pitfalls": ["..."]
 }}"""
 
-        try:
-            res = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": "You are a technical education expert. Return only valid JSON."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.6,
-                response_format={"type": "json_object"}
-            )
-            
-            content = res.choices[0].message.content
-            enrichment = json.loads(content)
-            
-            return {
+        return self._execute(LLMCall(
+            messages=[
+                {"role": "system", "content": "You are a technical education expert. Return only valid JSON."},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=0.6,
+            params={"response_format": {"type": "json_object"}},
+            parse=lambda enrichment: {
                 **skill.model_dump(),
                 **enrichment
-            }
-            
-        except Exception as e:
-            print(f"Error enriching skill: {e}")
-            return skill.model_dump()
+            },
+            fallback=lambda: skill.model_dump(),
+            error="Error enriching skill"
+        ))
     
     def _get_fallback_skills(self, domain):
         # Fallback if AI fails
@@ -476,6 +600,92 @@ Return ONLY valid JSON:
         return relationships
 
 
+_async_client = None
+
+
+def set_async_client(client):
+    # Swap the AsyncOpenAI client (benchmarks, local stand-ins); None restores the default
+    global _async_client
+    _async_client = client
+
+
+class AsyncGraphRAG(GraphRAG):
+    """GraphRAG on AsyncOpenAI.
+
+    Public methods are inherited unchanged: they return self._execute(...), which
+    here is a coroutine, so every call is awaited. A semaphore caps in-flight
+    completions; by default it is shared by all instances running on the same
+    event loop (one per loop, since a semaphore binds to the loop that first
+    waits on it).
+    """
+
+    _loop_semaphores = weakref.WeakKeyDictionary()
+
+    def __init__(self, api_key=None, cache=None, max_concurrency=None):
+        super().__init__(api_key=api_key, cache=cache)
+        self._semaphore = asyncio.Semaphore(max_concurrency) if max_concurrency is not None else None
+    
+    def _make_client(self):
+        return _async_client or AsyncOpenAI(api_key=self.api_key)
+    
+    def _slots(self) -> asyncio.Semaphore:
+        if self._semaphore is not None:
+            return self._semaphore
+        loop = asyncio.get_running_loop()
+        semaphore = AsyncGraphRAG._loop_semaphores.get(loop)
+        if semaphore is None:
+            semaphore = AsyncGraphRAG._loop_semaphores[loop] = asyncio.Semaphore(
+                int(os.getenv("OPENAI_MAX_CONCURRENCY", "8"))
+            )
+        return semaphore
+    
+    async def _execute(self, call: LLMCall):
+        if call.messages is None:
+            return call.fallback()
+        try:
+            return call.parse(await self._complete_json(call.messages, call.temperature, **call.params))
+        except Exception as e:
+            print(f"{call.error}: {e}")
+            return call.fallback()
+    
+    async def _complete_json(self, messages, temperature, **params):
+        # The cache is blocking SQLite, so it is read and written from a worker thread
+        key, cached = None, None
+        if self.cache is not None:
+            key, cached = await asyncio.to_thread(self._cache_lookup, messages, temperature, params)
+        if cached is not None:
+            return cached
+        
+        async with self._slots():
+            # Timed inside the semaphore so queueing for a slot isn't counted as API latency
+            start, res = time.perf_counter(), None
+            try:
+                res = await self.client.chat.completions.create(
+                    model=self.model,
+                    messages=messages,
+                    temperature=temperature,
+                    **params
+                )
+            finally:
+                record_completion(self.model, time.perf_counter() - start, res)
+        content = res.choices[0].message.content
+        if key is None:
+            return self._cache_store(key, content)
+        return await asyncio.to_thread(self._cache_store, key, content)
+    
+    async def _gather(self, calls, combine):
+        return combine(await asyncio.gather(*(call() for call in calls)))
+    
+    async def analyze_new_skill(self, skill_name, existing_skills):
+        # Enrichment, related skills and prerequisites are independent - run them together
+        enriched, related, prereqs = await asyncio.gather(
+            self.enrich_single_skill(skill_name),
+            self.find_related_skills(skill_name, existing_skills),
+            self.find_prerequisites(skill_name, existing_skills)
+        )
+        return enriched, related, prereqs
+
+
 if __name__ == "__main__":
     rag = GraphRAG()
     
@@ -488,7 +698,8 @@ if __name__ == "__main__":
     print(f"Generated {len(relationships)} relationships")
     
     # Test: Generate learning path
-    path = rag.generate_learning_path(
+    from app.learning_path import compute_learning_path
+    path = compute_learning_path(
         user_skills=["html-css", "javascript"],
         target_skill="react",
         all_skills=skills,
@@ -0,0 +1,183 @@
+# Bulk graph ingestion - UNWIND parameter lists inside one write transaction
+
+import os
+from collections import defaultdict
+from typing import Dict, Iterator, List, Tuple
+
+
+# Relationship types can't be Cypher parameters, so only these are interpolated
+RELATIONSHIP_TYPES = ("PREREQUISITE_OF", "RELATES_TO", "BUILDS_ON")
+
+CREATE_SKILLS = """
+    UNWIND $rows AS row
+    CREATE (s:Skill {
+        id: row.id,
+        name: row.name,
+        category: row.category,
+        description: row.description,
+        difficulty_level: row.difficulty,
+        learning_time_hours: row.hours
+    })
+    RETURN count(s) as count
+"""
+
+CREATE_RELATIONSHIPS = """
+    UNWIND $rows AS row
+    MATCH (s1:Skill {{id: row.source}})
+    MATCH (s2:Skill {{id: row.target}})
+    CREATE (s1)-[r:{rel_type} {{strength: row.strength}}]->(s2)
+    RETURN count(r) as count
+"""
+
+# Delta writes for merge-mode regeneration (see app.graph_diff)
+MERGE_SKILLS = """
+    UNWIND $rows AS row
+    MERGE (s:Skill {id: row.id})
+    SET s.name = row.name,
+        s.category = row.category,
+        s.description = row.description,
+        s.difficulty_level = row.difficulty,
+        s.learning_time_hours = row.hours
+    RETURN count(s) as count
+"""
+
+DELETE_SKILLS = """
+    UNWIND $rows AS skillId
+    MATCH (s:Skill {id: skillId})
+    DETACH DELETE s
+    RETURN count(s) as count
+"""
+
+MERGE_RELATIONSHIPS = """
+    UNWIND $rows AS row
+    MATCH (s1:Skill {{id: row.source}})
+    MATCH (s2:Skill {{id: row.target}})
+    MERGE (s1)-[r:{rel_type}]->(s2)
+    SET r.strength = row.strength
+    RETURN count(r) as count
+"""
+
+DELETE_RELATIONSHIPS = """
+    UNWIND $rows AS row
+    MATCH (:Skill {{id: row.source}})-[r:{rel_type}]->(:Skill {{id: row.target}})
+    DELETE r
+    RETURN count(r) as count
+"""
+
+
+def chunk_size():
+    return int(os.getenv("NEO4J_INGEST_CHUNK_SIZE", "1000"))
+
+
+def _chunks(rows: List[dict], size: int) -> Iterator[List[dict]]:
+    for start in range(0, len(rows), max(size, 1)):
+        yield rows[start:start + size]
+
+
+def skill_rows(skills) -> List[dict]:
+    # First occurrence wins; a repeated id would violate the Skill.id uniqueness constraint
+    rows = {}
+    for skill in skills:
+        rows.setdefault(skill.id, {
+            "id": skill.id,
+            "name": skill.name,
+            "category": skill.category,
+            "description": skill.description,
+            "difficulty": skill.difficulty_level,
+            "hours": skill.learning_time_hours,
+        })
+    return list(rows.values())
+
+
+def relationship_rows(relationships) -> Tuple[Dict[str, List[dict]], int]:
+    """Rows grouped by relationship type, plus the number dropped for an unknown type"""
+    grouped = defaultdict(list)
+    skipped = 0
+    for rel in relationships:
+        if rel.relationship_type not in RELATIONSHIP_TYPES:
+            skipped += 1
+            continue
+        grouped[rel.relationship_type].append({
+            "source": rel.source_skill_id,
+            "target": rel.target_skill_id,
+            "strength": rel.strength,
+        })
+    return grouped, skipped
+
+
+def ingest_statements(skills, relationships, size=None) -> Iterator[Tuple[str, str, dict]]:
+    """(kind, query, params) for every chunk - skills first so edge MATCHes find them"""
+    size = size or chunk_size()
+    for rows in _chunks(skill_rows(skills), size):
+        yield "skills", CREATE_SKILLS, {"rows": rows}
+    grouped, _ = relationship_rows(relationships)
+    for rel_type, rows in grouped.items():
+        query = CREATE_RELATIONSHIPS.format(rel_type=rel_type)
+        for chunk in _chunks(rows, size):
+            yield "relationships", query, {"rows": chunk}
+
+
+def _empty_counts(relationships):
+    _, skipped = relationship_rows(relationships)
+    return {"skills": 0, "relationships": 0, "skipped_relationships": skipped, "batches": 0}
+
+
+async def ingest_graph(tx, skills, relationships, size=None) -> dict:
+    """Create skills and relationships on an open async transaction.
+
+    Relationships whose endpoints don't exist are silently not created;
+    compare the returned counts against the input to spot them.
+    """
+    counts = _empty_counts(relationships)
+    for kind, query, params in ingest_statements(skills, relationships, size):
+        result = await tx.run(query, **params)
+        record = await result.single()
+        counts[kind] += record["count"] if record else 0
+        counts["batches"] += 1
+    return counts
+
+
+def ingest_graph_sync(tx, skills, relationships, size=None) -> dict:
+    # Same as ingest_graph for scripts on the sync driver
+    counts = _empty_counts(relationships)
+    for kind, query, params in ingest_statements(skills, relationships, size):
+        record = tx.run(query, **params).single()
+        counts[kind] += record["count"] if record else 0
+        counts["batches"] += 1
+    return counts
+
+
+def _by_type(rows) -> Dict[str, List[dict]]:
+    grouped = defaultdict(list)
+    for row in rows:
+        if row["type"] in RELATIONSHIP_TYPES:
+            grouped[row["type"]].append(row)
+    return grouped
+
+
+def delta_statements(delta, size=None) -> Iterator[Tuple[str, str, dict]]:
+    """(kind, query, params) applying a GraphDelta: deletes first, then merges"""
+    size = size or chunk_size()
+    for rel_type, rows in _by_type(delta.removed_edges).items():
+        query = DELETE_RELATIONSHIPS.format(rel_type=rel_type)
+        for chunk in _chunks(rows, size):
+            yield "edges_removed", query, {"rows": chunk}
+    for chunk in _chunks(delta.removed_skill_ids, size):
+        yield "skills_removed", DELETE_SKILLS, {"rows": chunk}
+    for chunk in _chunks(delta.added_skills + delta.changed_skills, size):
+        yield "skills_merged", MERGE_SKILLS, {"rows": chunk}
+    for rel_type, rows in _by_type(delta.added_edges + delta.changed_edges).items():
+        query = MERGE_RELATIONSHIPS.format(rel_type=rel_type)
+        for chunk in _chunks(rows, size):
+            yield "edges_merged", query, {"rows": chunk}
+
+
+async def apply_delta(tx, delta, size=None) -> dict:
+    # Write cost follows delta.size, not the size of the stored graph
+    counts = {"skills_removed": 0, "skills_merged": 0, "edges_removed": 0, "edges_merged": 0, "batches": 0}
+    for kind, query, params in delta_statements(delta, size):
+        result = await tx.run(query, **params)
+        record = await result.single()
+        counts[kind] += record["count"] if record else 0
+        counts["batches"] += 1
+    return counts
@@ -0,0 +1,367 @@
+# Background jobs - SQLite job table plus an asyncio worker pool
+
+import asyncio
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List, Optional
+
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED = (SUCCEEDED, FAILED, CANCELLED)
+
+# A running job whose owner has not heartbeated for this long is considered orphaned
+LEASE_SECONDS = float(os.getenv("JOB_LEASE_SECONDS", "60"))
+# How often idle workers look for jobs queued by other processes
+POLL_SECONDS = float(os.getenv("JOB_POLL_SECONDS", "1"))
+
+
+def new_owner_id() -> str:
+    # Host and pid for humans; the random suffix keeps a restarted pid from inheriting leases
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+class JobStore:
+    """Persistent job table; every state change is committed before it is reported.
+
+    Several processes (uvicorn --workers, rolling restarts) may share one
+    file. Running jobs record their owner and a heartbeat, and only jobs whose
+    lease has expired are requeued. Methods block, so async code calls them
+    through asyncio.to_thread.
+    """
+
+    def __init__(self, path):
+        self.path = str(path)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                status TEXT NOT NULL,
+                params TEXT NOT NULL,
+                progress REAL NOT NULL DEFAULT 0,
+                message TEXT,
+                result TEXT,
+                error TEXT,
+                cancel_requested INTEGER NOT NULL DEFAULT 0,
+                created_at REAL NOT NULL,
+                started_at REAL,
+                finished_at REAL
+            )
+        """)
+        columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(jobs)")}
+        for column, ddl in (("owner", "TEXT"), ("heartbeat_at", "REAL")):
+            if column not in columns:
+                self._conn.execute(f"ALTER TABLE jobs ADD COLUMN {column} {ddl}")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at)")
+        self._conn.commit()
+
+    @staticmethod
+    def _job(row) -> Optional[dict]:
+        if row is None:
+            return None
+        job = dict(row)
+        job["params"] = json.loads(job["params"])
+        job["result"] = json.loads(job["result"]) if job["result"] is not None else None
+        job["cancel_requested"] = bool(job["cancel_requested"])
+        return job
+
+    def _execute(self, query, args=()):
+        with self._lock:
+            cursor = self._conn.execute(query, args)
+            self._conn.commit()
+            return cursor.rowcount
+
+    def create(self, kind, params) -> dict:
+        job_id = uuid.uuid4().hex
+        self._execute(
+            "INSERT INTO jobs (id, kind, status, params, created_at) VALUES (?, ?, ?, ?, ?)",
+            (job_id, kind, QUEUED, json.dumps(params), time.time())
+        )
+        return self.get(job_id)
+
+    def get(self, job_id) -> Optional[dict]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._job(row)
+
+    def list(self, limit=50, kind=None, status=None) -> List[dict]:
+        query, args = "SELECT * FROM jobs WHERE 1 = 1", []
+        if kind:
+            query += " AND kind = ?"
+            args.append(kind)
+        if status:
+            query += " AND status = ?"
+            args.append(status)
+        query += " ORDER BY created_at DESC LIMIT ?"
+        args.append(limit)
+        with self._lock:
+            rows = self._conn.execute(query, args).fetchall()
+        return [self._job(row) for row in rows]
+
+    def claim_next(self, owner) -> Optional[dict]:
+        """Atomically move the oldest queued job to running under `owner`; None when none is queued.
+
+        The status check in the UPDATE makes this safe across processes: a
+        job claimed by someone else between the two statements is skipped.
+        """
+        while True:
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT id FROM jobs WHERE status = ? ORDER BY created_at LIMIT 1", (QUEUED,)
+                ).fetchone()
+            if row is None:
+                return None
+            now = time.time()
+            claimed = self._execute(
+                "UPDATE jobs SET status = ?, owner = ?, started_at = ?, heartbeat_at = ? WHERE id = ? AND status = ?",
+                (RUNNING, owner, now, now, row["id"], QUEUED)
+            )
+            if claimed:
+                return self.get(row["id"])
+
+    def heartbeat(self, owner) -> List[str]:
+        """Extend the lease on owner's running jobs; returns those another process asked to cancel"""
+        self._execute(
+            "UPDATE jobs SET heartbeat_at = ? WHERE owner = ? AND status = ?",
+            (time.time(), owner, RUNNING)
+        )
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id FROM jobs WHERE owner = ? AND status = ? AND cancel_requested = 1", (owner, RUNNING)
+            ).fetchall()
+        return [row["id"] for row in rows]
+
+    def set_progress(self, job_id, progress, message=None):
+        self._execute(
+            "UPDATE jobs SET progress = ?, message = COALESCE(?, message) WHERE id = ?",
+            (max(0.0, min(1.0, progress)), message, job_id)
+        )
+
+    def finish(self, job_id, status, result=None, error=None, owner=None):
+        # With an owner, a job whose lease was lost and handed to another process is left alone
+        self._execute(
+            "UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ?, "
+            "progress = CASE WHEN ? = ? THEN 1.0 ELSE progress END "
+            "WHERE id = ? AND (? IS NULL OR owner = ?)",
+            (status, json.dumps(result) if result is not None else None, error, time.time(),
+             status, SUCCEEDED, job_id, owner, owner)
+        )
+
+    def request_cancel(self, job_id) -> Optional[dict]:
+        """Queued jobs are cancelled outright; running ones are flagged for the worker"""
+        self._execute(
+            "UPDATE jobs SET status = ?, finished_at = ? WHERE id = ? AND status = ?",
+            (CANCELLED, time.time(), job_id, QUEUED)
+        )
+        self._execute(
+            "UPDATE jobs SET cancel_requested = 1 WHERE id = ? AND status = ?",
+            (job_id, RUNNING)
+        )
+        return self.get(job_id)
+
+    def requeue_expired(self, lease_seconds=None) -> int:
+        """Requeue running jobs whose owner stopped heartbeating; returns how many were requeued.
+
+        Jobs still heartbeating belong to a live process and are never
+        touched. Orphans that had a cancel request are cancelled instead.
+        """
+        cutoff = time.time() - (lease_seconds if lease_seconds is not None else LEASE_SECONDS)
+        expired = "status = ? AND COALESCE(heartbeat_at, started_at, 0) < ?"
+        requeued = self._execute(
+            f"UPDATE jobs SET status = ?, owner = NULL, started_at = NULL, heartbeat_at = NULL, progress = 0 "
+            f"WHERE {expired} AND cancel_requested = 0",
+            (QUEUED, RUNNING, cutoff)
+        )
+        self._execute(
+            f"UPDATE jobs SET status = ?, finished_at = ? WHERE {expired}",
+            (CANCELLED, time.time(), RUNNING, cutoff)
+        )
+        return requeued
+
+    def release(self, owner) -> int:
+        # Graceful shutdown: hand owner's running jobs straight back instead of waiting for the lease
+        return self._execute(
+            "UPDATE jobs SET status = ?, owner = NULL, started_at = NULL, heartbeat_at = NULL, progress = 0 "
+            "WHERE owner = ? AND status = ? AND cancel_requested = 0",
+            (QUEUED, owner, RUNNING)
+        )
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._conn.execute("SELECT status, count(*) FROM jobs GROUP BY status").fetchall()
+        return {row[0]: row[1] for row in rows}
+
+
+class JobContext:
+    """Handed to job handlers: params in, progress out"""
+
+    def __init__(self, store: JobStore, job: dict):
+        self.store = store
+        self.id = job["id"]
+        self.params = job["params"]
+
+    async def progress(self, fraction, message=None):
+        await asyncio.to_thread(self.store.set_progress, self.id, fraction, message)
+
+
+JobHandler = Callable[[JobContext], Awaitable[Optional[dict]]]
+
+
+class JobQueue:
+    """Fixed pool of asyncio workers claiming queued jobs from the store.
+
+    Workers claim from the table itself, so a job submitted to one process
+    can run in any process sharing the file; local submissions wake a worker
+    at once, others are seen within POLL_SECONDS. A heartbeat task keeps the
+    leases on this process's running jobs alive, requeues orphaned jobs and
+    relays cancel requests made elsewhere. Handlers are registered per job
+    kind and return a JSON-serialisable result. Cancelling a running job
+    cancels its task, so handlers are interrupted at their next await.
+    """
+
+    def __init__(self, store_factory: Callable[[], JobStore], workers=2):
+        self._store_factory = store_factory
+        self._store: Optional[JobStore] = None
+        self.workers = workers
+        self.owner = new_owner_id()
+        self._handlers: Dict[str, JobHandler] = {}
+        self._wakeup: Optional[asyncio.Event] = None
+        self._workers: List[asyncio.Task] = []
+        self._heartbeat: Optional[asyncio.Task] = None
+        self._running: Dict[str, asyncio.Task] = {}
+        self._cancelling = set()
+
+    @property
+    def store(self) -> JobStore:
+        if self._store is None:
+            self._store = self._store_factory()
+        return self._store
+
+    @property
+    def started(self):
+        return bool(self._workers)
+
+    def register(self, kind, handler: JobHandler):
+        self._handlers[kind] = handler
+
+    async def start(self, workers=None):
+        if self.started:
+            return
+        self.workers = workers or self.workers
+        self._wakeup = asyncio.Event()
+        await asyncio.to_thread(self.store.requeue_expired)
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        self._heartbeat = asyncio.create_task(self._keep_alive())
+
+    async def stop(self):
+        tasks = [*self._workers, *([self._heartbeat] if self._heartbeat else [])]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._workers, self._heartbeat = [], None
+        self._running = {}
+        # Interrupted jobs go straight back to the queue for the next process
+        await asyncio.to_thread(self.store.release, self.owner)
+
+    async def submit(self, kind, params) -> dict:
+        if kind not in self._handlers:
+            raise ValueError(f"Unknown job kind: {kind}")
+        job = await asyncio.to_thread(self.store.create, kind, params)
+        if self._wakeup is not None:
+            self._wakeup.set()
+        return job
+
+    async def get(self, job_id) -> Optional[dict]:
+        return await asyncio.to_thread(self.store.get, job_id)
+
+    async def list(self, limit=50, kind=None, status=None) -> List[dict]:
+        return await asyncio.to_thread(self.store.list, limit, kind, status)
+
+    async def cancel(self, job_id) -> Optional[dict]:
+        job = await asyncio.to_thread(self.store.request_cancel, job_id)
+        self._cancel_local(job_id)
+        return job
+
+    async def stats(self) -> dict:
+        return {
+            "owner": self.owner,
+            "workers": len(self._workers),
+            "running": len(self._running),
+            "by_status": await asyncio.to_thread(self.store.stats),
+        }
+
+    def _cancel_local(self, job_id):
+        task = self._running.get(job_id)
+        if task is not None and job_id not in self._cancelling:
+            self._cancelling.add(job_id)
+            task.cancel()
+
+    async def _worker(self):
+        while True:
+            # Cleared before claiming, so a submit that lands during the claim is not missed
+            self._wakeup.clear()
+            job = await asyncio.to_thread(self.store.claim_next, self.owner)
+            if job is None:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), POLL_SECONDS)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            await self._run(job)
+
+    async def _keep_alive(self):
+        while True:
+            await asyncio.sleep(LEASE_SECONDS / 4)
+            try:
+                for job_id in await asyncio.to_thread(self.store.heartbeat, self.owner):
+                    self._cancel_local(job_id)
+                if await asyncio.to_thread(self.store.requeue_expired):
+                    self._wakeup.set()
+            except Exception as e:
+                print(f"Job heartbeat failed: {e}")
+
+    async def _run(self, job):
+        job_id = job["id"]
+        handler = self._handlers.get(job["kind"])
+        if handler is None:
+            await asyncio.to_thread(
+                self.store.finish, job_id, FAILED, error=f"No handler for job kind: {job['kind']}", owner=self.owner
+            )
+            return
+
+        task = asyncio.create_task(handler(JobContext(self.store, job)))
+        self._running[job_id] = task
+        try:
+            result = await task
+            await asyncio.to_thread(self.store.finish, job_id, SUCCEEDED, result=result, owner=self.owner)
+        except asyncio.CancelledError:
+            if job_id not in self._cancelling:
+                # The worker itself is shutting down; stop() releases the job for requeue
+                raise
+            await asyncio.to_thread(self.store.finish, job_id, CANCELLED, owner=self.owner)
+        except Exception as e:
+            await asyncio.to_thread(self.store.finish, job_id, FAILED, error=str(e), owner=self.owner)
+        finally:
+            self._running.pop(job_id, None)
+            self._cancelling.discard(job_id)
+
+
+def _default_store() -> JobStore:
+    default_path = Path(__file__).parent.parent / ".jobs.sqlite3"
+    return JobStore(os.getenv("JOB_DB_PATH", str(default_path)))
+
+
+job_queue = JobQueue(_default_store, workers=int(os.getenv("JOB_WORKERS", "2")))
@@ -0,0 +1,120 @@
+# Learning path engine - deterministic paths over the PREREQUISITE_OF DAG
+
+import heapq
+from collections import defaultdict
+from typing import Callable, Dict, Iterable, List, Optional
+from app.graph_rag import Skill, SkillRelationship, LearningPath
+
+# Direct prerequisites of a skill id, e.g. skill_index.prerequisites
+Prerequisites = Callable[[str], Iterable[str]]
+
+
+def prerequisite_closure(target_id: str, prerequisites: Prerequisites, learned: set) -> set:
+    """Unlearned skills the target transitively depends on, plus the target itself.
+
+    The walk stops at learned skills, so their own prerequisites are never pulled in.
+    """
+    closure = {target_id}
+    stack = [target_id]
+    while stack:
+        skill_id = stack.pop()
+        for prereq in prerequisites(skill_id):
+            if prereq not in learned and prereq not in closure:
+                closure.add(prereq)
+                stack.append(prereq)
+    return closure
+
+
+def topological_order(closure: set, prerequisites: Prerequisites, skills: Dict[str, dict]) -> List[str]:
+    """Kahn's algorithm; among ready skills the easiest (then shortest) comes first"""
+    def rank(skill_id):
+        skill = skills[skill_id]
+        return (skill["difficulty"], skill["hours"], skill_id)
+
+    indegree = {s: 0 for s in closure}
+    dependents = defaultdict(list)
+    for skill_id in closure:
+        for prereq in set(prerequisites(skill_id)):
+            if prereq in closure:
+                indegree[skill_id] += 1
+                dependents[prereq].append(skill_id)
+
+    ready = [rank(s) for s, degree in indegree.items() if degree == 0]
+    heapq.heapify(ready)
+    order = []
+    while ready:
+        skill_id = heapq.heappop(ready)[-1]
+        order.append(skill_id)
+        for dependent in dependents[skill_id]:
+            indegree[dependent] -= 1
+            if indegree[dependent] == 0:
+                heapq.heappush(ready, rank(dependent))
+
+    # Skills on a prerequisite cycle never become ready; keep them, easiest first
+    if len(order) < len(closure):
+        placed = set(order)
+        order.extend(sorted((s for s in closure if s not in placed), key=rank))
+    return order
+
+
+def skill_rows(records: Iterable[dict]) -> Dict[str, dict]:
+    """Skill records (repository column names) by id, with the graph's defaults filled in"""
+    return {
+        record["id"]: {
+            "id": record["id"],
+            "name": record["name"],
+            "category": record.get("category"),
+            "difficulty": int(record.get("difficulty") or 1),
+            "hours": int(record.get("hours") or 10),
+        }
+        for record in records
+    }
+
+
+def path_from_closure(
+    target_skill: str,
+    closure: set,
+    prerequisites: Prerequisites,
+    skills: Dict[str, dict]
+) -> Optional[LearningPath]:
+    """Order a prerequisite closure into a LearningPath; skills needs rows for the closure only"""
+    target = skills.get(target_skill)
+    if not target:
+        return None
+
+    # Ids the metadata lookup no longer knows (deleted since the closure was taken) are dropped
+    closure = {s for s in closure if s in skills}
+    path_ids = topological_order(closure, prerequisites, skills)
+    return LearningPath(
+        path_id=f"path-to-{target_skill}",
+        name=f"Learning Path to {target['name']}",
+        skills=path_ids,
+        estimated_duration_hours=sum(skills[s]["hours"] for s in path_ids),
+        difficulty_progression=[skills[s]["difficulty"] for s in path_ids]
+    )
+
+
+def compute_learning_path(
+    user_skills: Iterable[str],
+    target_skill: str,
+    all_skills: List[Skill],
+    relationships: List[SkillRelationship]
+) -> Optional[LearningPath]:
+    """Minimal prerequisite path from the user's learned skills to target_skill"""
+    skills = skill_rows(
+        {"id": skill.id, "name": skill.name, "category": skill.category,
+         "difficulty": skill.difficulty_level, "hours": skill.learning_time_hours}
+        for skill in all_skills
+    )
+    if target_skill not in skills:
+        return None
+
+    prereqs_of = defaultdict(list)
+    for rel in relationships:
+        if rel.relationship_type == "PREREQUISITE_OF" and rel.source_skill_id in skills:
+            prereqs_of[rel.target_skill_id].append(rel.source_skill_id)
+    prerequisites = lambda skill_id: prereqs_of.get(skill_id, ())
+
+    learned = set(user_skills)
+    closure = set() if target_skill in learned else prerequisite_closure(target_skill, prerequisites, learned)
+    return path_from_closure(target_skill, closure, prerequisites, skills)
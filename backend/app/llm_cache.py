@@ -0,0 +1,141 @@
+# LLM response cache - SQLite on disk, keyed by a hash of model, prompt and sampling params
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+# Hits whose access time is buffered before it is written back
+TOUCH_FLUSH_SIZE = 100
+
+
+class LLMCache:
+    """Content-addressed completion cache with TTL and approximate LRU eviction by last access.
+
+    Access times from hits are buffered and written with the next insert,
+    and eviction runs only once the table is max_entries / 10 rows over its
+    cap, so neither a hit nor a typical insert pays for a write or a sort.
+    """
+
+    def __init__(self, path, ttl_seconds=7 * 24 * 3600, max_entries=5000):
+        self.path = str(path)
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS llm_cache (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS llm_cache_accessed ON llm_cache (accessed_at)")
+        self._conn.commit()
+        self._touched: Dict[str, float] = {}
+        self._slack = max(1, max_entries // 10)
+        # Upper bound on the row count: replacing an existing key also counts, so it errs early
+        self._rows = self._conn.execute("SELECT count(*) FROM llm_cache").fetchone()[0]
+
+    @staticmethod
+    def make_key(model, messages, temperature, **params) -> str:
+        payload = json.dumps(
+            {"model": model, "messages": messages, "temperature": temperature, "params": params},
+            sort_keys=True, ensure_ascii=False
+        )
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def get(self, key) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            value, created_at = row
+            if now - created_at > self.ttl_seconds:
+                self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                self._conn.commit()
+                self.misses += 1
+                return None
+            self._touched[key] = now
+            if len(self._touched) >= TOUCH_FLUSH_SIZE:
+                self._flush_touched()
+                self._conn.commit()
+            self.hits += 1
+            return value
+
+    def _flush_touched(self):
+        # Caller holds the lock and commits
+        if self._touched:
+            self._conn.executemany(
+                "UPDATE llm_cache SET accessed_at = ? WHERE key = ?",
+                [(accessed_at, key) for key, accessed_at in self._touched.items()]
+            )
+            self._touched.clear()
+
+    def set(self, key, value: str):
+        now = time.time()
+        with self._lock:
+            self._flush_touched()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, value, now, now)
+            )
+            self._rows += 1
+            if self._rows > self.max_entries + self._slack:
+                # Keep only the most recently used max_entries rows; walks the accessed_at index
+                self._conn.execute("""
+                    DELETE FROM llm_cache WHERE key IN (
+                        SELECT key FROM llm_cache ORDER BY accessed_at DESC LIMIT -1 OFFSET ?
+                    )
+                """, (self.max_entries,))
+                self._rows = self._conn.execute("SELECT count(*) FROM llm_cache").fetchone()[0]
+            self._conn.commit()
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_cache")
+            self._conn.commit()
+            self._touched.clear()
+            self._rows = 0
+
+    def stats(self):
+        with self._lock:
+            entries = self._conn.execute("SELECT count(*) FROM llm_cache").fetchone()[0]
+        return {
+            "path": self.path,
+            "entries": entries,
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+_cache: Optional[LLMCache] = None
+
+
+def get_llm_cache() -> Optional[LLMCache]:
+    # Shared cache, or None when LLM_CACHE_ENABLED=0
+    global _cache
+    if os.getenv("LLM_CACHE_ENABLED", "1") in ("0", "false", "False"):
+        return None
+    if _cache is None:
+        default_path = Path(__file__).parent.parent / ".llm_cache.sqlite3"
+        _cache = LLMCache(
+            os.getenv("LLM_CACHE_PATH", str(default_path)),
+            ttl_seconds=float(os.getenv("LLM_CACHE_TTL", str(7 * 24 * 3600))),
+            max_entries=int(os.getenv("LLM_CACHE_MAX_ENTRIES", "5000"))
+        )
+    return _cache
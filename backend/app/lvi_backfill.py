@@ -0,0 +1,275 @@
+# LVI backfill - rebuild weekly lvi_snapshots from raw sessions and applications
+
+"""
+Rebuilds the weekly ``lvi_snapshots`` history that /api/lvi-trend reads.
+
+Each user's sessions and applications are streamed once, grouped by week
+with NumPy and scored in one vectorised pass, then written with batched
+writes. Users are spread over a process pool. Snapshot ids are
+``{userId}_{weekStart}``, so re-running overwrites instead of duplicating.
+
+    python -m app.lvi_backfill                   # every user with activity
+    python -m app.lvi_backfill --user user-1 --replace
+"""
+
+import argparse
+import multiprocessing
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import date, datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+import numpy as np
+from dotenv import load_dotenv
+
+from app.lvi_engine import utc_day
+
+
+SNAPSHOTS = "lvi_snapshots"
+# Firestore rejects batches with more than 500 writes
+BATCH_LIMIT = 500
+SCALING_FACTOR = 10
+_EPOCH = date(1970, 1, 1).toordinal()
+
+
+def epoch_days(values: Iterable) -> np.ndarray:
+    # UTC days, the same ones the live rollups and windowed scores use
+    return np.fromiter((utc_day(v).toordinal() - _EPOCH for v in values), dtype=np.int64)
+
+
+def sunday_week(days: np.ndarray) -> np.ndarray:
+    # Vectorised lvi_engine.week_start_day: 1970-01-01 was a Thursday, so shifting by 4
+    # makes every bucket start on a Sunday
+    return (days + 4) // 7
+
+
+def week_start_days(weeks: np.ndarray) -> np.ndarray:
+    return weeks * 7 - 4
+
+
+def week_numbers(start_days: np.ndarray):
+    """(weekNumber, year) as the seed script's getWeekNum computes them"""
+    starts = start_days.astype("datetime64[D]")
+    jan1 = starts.astype("datetime64[Y]").astype("datetime64[D]")
+    years = starts.astype("datetime64[Y]").astype(np.int64) + 1970
+    # datetime64 day 0 is a Thursday; JavaScript's getDay() counts from Sunday
+    jan1_dow = (jan1.astype(np.int64) + 4) % 7
+    day_of_year = (starts - jan1).astype(np.int64)
+    return np.ceil((day_of_year + jan1_dow + 1) / 7).astype(np.int64), years
+
+
+def lvi_arrays(concepts: np.ndarray, duration: np.ndarray, rate_sum: np.ndarray, applications: np.ndarray) -> dict:
+    """Column-wise lvi_engine.lvi_metrics; the same float operations in the same order"""
+    concepts = concepts.astype(np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rate = np.where(applications > 0, rate_sum / np.maximum(applications, 1), 0.0)
+        avg_time = np.where(concepts > 0, (duration / 60 / 24) / np.maximum(concepts, 1), 1.0)
+        raw = np.where(avg_time > 0, (concepts * rate) / np.where(avg_time > 0, avg_time, 1.0) * SCALING_FACTOR, 0.0)
+    return {
+        "score": np.clip(np.round(raw), 0, 100).astype(np.int64),
+        "conceptsMastered": concepts.astype(np.int64),
+        "applicationRate": rate,
+        "avgTimeToMastery": np.maximum(avg_time, 0.1),
+    }
+
+
+class UserActivity:
+    """Columnar session/application data for one user, filled while streaming"""
+
+    def __init__(self):
+        self.session_days: List[datetime] = []
+        self.durations: List[float] = []
+        self.concept_counts: List[int] = []
+        self.concept_codes: List[int] = []
+        self.app_days: List[datetime] = []
+        self.rates: List[float] = []
+        self._codes: Dict[str, int] = {}
+
+    def add_session(self, session: dict):
+        learned = session.get('conceptsLearned') or []
+        self.session_days.append(session['startTime'])
+        self.durations.append(session.get('duration', 0) or 0)
+        self.concept_counts.append(len(learned))
+        self.concept_codes.extend(self._codes.setdefault(c, len(self._codes)) for c in learned)
+
+    def add_application(self, application: dict):
+        self.app_days.append(application['appliedAt'])
+        self.rates.append(float(application.get('successRate', 0.0)))
+
+    @property
+    def vocabulary(self):
+        return len(self._codes)
+
+    @property
+    def empty(self):
+        return not self.session_days and not self.app_days
+
+
+def weekly_snapshots(user_id: str, activity: UserActivity) -> List[dict]:
+    """One snapshot per Sunday-based week from the first to the last active week"""
+    if activity.empty:
+        return []
+    session_weeks = sunday_week(epoch_days(activity.session_days))
+    app_weeks = sunday_week(epoch_days(activity.app_days))
+    first = int(min(session_weeks.min(initial=np.iinfo(np.int64).max), app_weeks.min(initial=np.iinfo(np.int64).max)))
+    last = int(max(session_weeks.max(initial=np.iinfo(np.int64).min), app_weeks.max(initial=np.iinfo(np.int64).min)))
+    n = last - first + 1
+
+    # Duration only counts for sessions that taught something, as in the weekly rollup
+    counts = np.array(activity.concept_counts, dtype=np.int64)
+    durations = np.array(activity.durations, dtype=np.float64)
+    taught = counts > 0
+    duration = np.bincount(session_weeks[taught] - first, weights=durations[taught], minlength=n)
+
+    # Distinct concepts per week: unique (week, concept) pairs, then count per week
+    pair_weeks = np.repeat(session_weeks - first, counts)
+    codes = np.array(activity.concept_codes, dtype=np.int64)
+    pairs = np.unique(pair_weeks * (activity.vocabulary + 1) + codes)
+    concepts = np.bincount(pairs // (activity.vocabulary + 1), minlength=n)
+
+    rate_sum = np.bincount(app_weeks - first, weights=np.array(activity.rates, dtype=np.float64), minlength=n)
+    applications = np.bincount(app_weeks - first, minlength=n)
+
+    metrics = lvi_arrays(concepts, duration, rate_sum, applications)
+    start_days = week_start_days(np.arange(first, last + 1))
+    numbers, years = week_numbers(start_days)
+
+    snapshots = []
+    for i, start_day in enumerate(start_days.tolist()):
+        week_start = date.fromordinal(start_day + _EPOCH)
+        snapshots.append({
+            "userId": user_id,
+            "weekStart": week_start.isoformat(),
+            "weekNumber": int(numbers[i]),
+            "year": int(years[i]),
+            "score": int(metrics["score"][i]),
+            "conceptsMastered": int(metrics["conceptsMastered"][i]),
+            "applicationRate": float(metrics["applicationRate"][i]),
+            "avgTimeToMastery": float(metrics["avgTimeToMastery"][i]),
+            "scalingFactor": SCALING_FACTOR,
+            # get_snapshots orders by createdAt, so it carries the week rather than the run time
+            "createdAt": datetime(week_start.year, week_start.month, week_start.day, tzinfo=timezone.utc),
+        })
+    return snapshots
+
+
+def stream_activity(db, user_id: str) -> UserActivity:
+    activity = UserActivity()
+    sessions = db.collection('sessions').where('userId', '==', user_id)\
+        .select(['startTime', 'duration', 'conceptsLearned'])
+    for doc in sessions.stream():
+        data = doc.to_dict()
+        if data.get('startTime') is not None:
+            activity.add_session(data)
+    apps = db.collection('skill_applications').where('userId', '==', user_id)\
+        .select(['appliedAt', 'successRate'])
+    for doc in apps.stream():
+        data = doc.to_dict()
+        if data.get('appliedAt') is not None:
+            activity.add_application(data)
+    return activity
+
+
+def write_snapshots(db, user_id: str, snapshots: List[dict], replace: bool = False) -> int:
+    """Batched upserts; with replace, also delete the user's snapshots this run didn't produce"""
+    collection = db.collection(SNAPSHOTS)
+    writes = [("set", collection.document(f"{user_id}_{s['weekStart']}"), s) for s in snapshots]
+    if replace:
+        keep = {f"{user_id}_{s['weekStart']}" for s in snapshots}
+        existing = collection.where('userId', '==', user_id).select([]).stream()
+        writes += [("delete", doc.reference, None) for doc in existing if doc.id not in keep]
+
+    for i in range(0, len(writes), BATCH_LIMIT):
+        batch = db.batch()
+        for op, ref, data in writes[i:i + BATCH_LIMIT]:
+            if op == "set":
+                batch.set(ref, data)
+            else:
+                batch.delete(ref)
+        batch.commit()
+    return len(writes)
+
+
+def backfill_user(user_id: str, replace: bool = False, dry_run: bool = False) -> dict:
+    """Worker entry point - each process opens its own Firestore client"""
+    from app.database import FirebaseConnection
+
+    db = FirebaseConnection.get_firestore()
+    activity = stream_activity(db, user_id)
+    snapshots = weekly_snapshots(user_id, activity)
+    writes = 0 if dry_run else write_snapshots(db, user_id, snapshots, replace=replace)
+    return {
+        "userId": user_id,
+        "sessions": len(activity.session_days),
+        "applications": len(activity.app_days),
+        "weeks": len(snapshots),
+        "writes": writes,
+    }
+
+
+def discover_users(db) -> List[str]:
+    users = set()
+    for collection in ('sessions', 'skill_applications'):
+        for doc in db.collection(collection).select(['userId']).stream():
+            user_id = doc.to_dict().get('userId')
+            if user_id:
+                users.add(user_id)
+    return sorted(users)
+
+
+def backfill(user_ids: List[str], workers: int, replace: bool = False, dry_run: bool = False):
+    """Yields one result per user as workers finish"""
+    if workers <= 1 or len(user_ids) <= 1:
+        for user_id in user_ids:
+            # One bad user is reported like a failed worker, not fatal to the rest
+            try:
+                yield backfill_user(user_id, replace, dry_run)
+            except Exception as e:
+                yield {"userId": user_id, "error": str(e)}
+        return
+    # gRPC channels don't survive fork, so workers are spawned and open their own clients
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        futures = {pool.submit(backfill_user, user_id, replace, dry_run): user_id for user_id in user_ids}
+        for future in as_completed(futures):
+            try:
+                yield future.result()
+            except Exception as e:
+                yield {"userId": futures[future], "error": str(e)}
+
+
+def _main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Rebuild weekly LVI snapshots from sessions and applications")
+    parser.add_argument("--user", action="append", dest="users", help="user id (repeatable); default: all users")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="worker processes")
+    parser.add_argument("--replace", action="store_true",
+                        help="also delete the user's other snapshots (e.g. the seed script's)")
+    parser.add_argument("--dry-run", action="store_true", help="compute but don't write")
+    args = parser.parse_args(argv)
+
+    project_root = Path(__file__).parent.parent.parent
+    load_dotenv(project_root / '.env.local')
+    load_dotenv(project_root / '.env')
+
+    from app.database import FirebaseConnection
+    if not FirebaseConnection.is_configured():
+        print("Firestore not configured")
+        return 1
+
+    user_ids = args.users or discover_users(FirebaseConnection.get_firestore())
+    print(f"Backfilling {len(user_ids)} users with {args.workers} workers")
+
+    failed = 0
+    for result in backfill(user_ids, args.workers, replace=args.replace, dry_run=args.dry_run):
+        if "error" in result:
+            failed += 1
+            print(f"  ❌ {result['userId']}: {result['error']}")
+        else:
+            print(f"  ✅ {result['userId']}: {result['weeks']} weeks from {result['sessions']} sessions, "
+                  f"{result['applications']} applications ({result['writes']} writes)")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(_main())
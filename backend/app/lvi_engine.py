@@ -0,0 +1,161 @@
+# LVI engine - scores over arbitrary date ranges and rolling windows from one pass over events
+
+import asyncio
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+from typing import Iterable, List, Tuple
+import numpy as np
+from app.metrics import firestore_read
+
+
+def calc_lvi(concepts: int, rate: float, time: float, scale: int = 10) -> int:
+    if time <= 0:
+        return 0
+    return min(max(round((concepts * rate) / time * scale), 0), 100)
+
+
+def lvi_metrics(concepts: int, duration_sum: float, rate_sum: float, applications: int) -> dict:
+    """Score inputs shared by the weekly rollup and windowed paths"""
+    rate = rate_sum / applications if applications else 0.0
+    avg_time = (duration_sum / 60 / 24) / concepts if concepts > 0 else 1.0
+    return {
+        "score": calc_lvi(concepts, rate, avg_time),
+        "conceptsMastered": concepts,
+        "applicationRate": rate,
+        "avgTimeToMastery": max(avg_time, 0.1),
+        "scalingFactor": 10,
+    }
+
+
+def utc_day(value) -> date:
+    """The UTC calendar day of a Firestore timestamp, datetime or date.
+
+    Every LVI day and week is a UTC one (rollups, windows, backfilled
+    snapshots). Naive datetimes are taken as UTC, as Firestore stores them.
+    """
+    if hasattr(value, 'to_datetime'):
+        value = value.to_datetime()
+    if not isinstance(value, datetime):
+        return value
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc)
+    return value.date()
+
+
+def utc_today() -> date:
+    return datetime.now(timezone.utc).date()
+
+
+def week_start_day(day: date) -> date:
+    # Weeks run Sunday to Saturday; weekday() is Monday=0, so Sunday itself is 0 days back
+    return day - timedelta(days=(day.weekday() + 1) % 7)
+
+
+@dataclass
+class DailyActivity:
+    """Per-day totals and concept lists for consecutive days from `start`"""
+    start: date
+    duration: np.ndarray
+    rate_sum: np.ndarray
+    applications: np.ndarray
+    concepts: List[List[str]]
+
+    def index(self, day: date) -> int:
+        return (day - self.start).days
+
+
+def _prefix(values):
+    return np.concatenate(([0.0], np.cumsum(values, dtype=np.float64)))
+
+
+def bucket_events(sessions: Iterable[dict], applications: Iterable[dict], start: date, days: int) -> DailyActivity:
+    """One pass over raw session/application dicts; events outside [start, start + days) are ignored"""
+    concepts: List[List[str]] = [[] for _ in range(days)]
+    duration_days, durations = [], []
+    for session in sessions:
+        learned = session.get('conceptsLearned') or []
+        if not learned:
+            continue
+        i = (utc_day(session['startTime']) - start).days
+        if 0 <= i < days:
+            concepts[i].extend(learned)
+            duration_days.append(i)
+            durations.append(session.get('duration', 0))
+
+    app_days, rates = [], []
+    for application in applications:
+        i = (utc_day(application['appliedAt']) - start).days
+        if 0 <= i < days:
+            app_days.append(i)
+            rates.append(float(application.get('successRate', 0.0)))
+
+    return DailyActivity(
+        start=start,
+        duration=np.bincount(np.array(duration_days, dtype=np.int64), weights=durations, minlength=days),
+        rate_sum=np.bincount(np.array(app_days, dtype=np.int64), weights=rates, minlength=days),
+        applications=np.bincount(np.array(app_days, dtype=np.int64), minlength=days),
+        concepts=concepts
+    )
+
+
+def window_metrics(daily: DailyActivity, windows: List[Tuple[date, date]]) -> List[dict]:
+    """LVI metrics for each inclusive (first, last) day window in O(days + K).
+
+    Sums come from prefix arrays. Distinct concepts use a sliding multiset, so
+    windows must be ordered with non-decreasing first and last days.
+    """
+    duration, rate_sum, applications = (_prefix(a) for a in (daily.duration, daily.rate_sum, daily.applications))
+    seen = {}
+    distinct = 0
+    lo = hi = 0  # days [lo, hi) are currently counted in `seen`
+    results = []
+    for first, last in windows:
+        l, r = daily.index(first), daily.index(last) + 1
+        if l < lo or r < hi:
+            raise ValueError("windows must be sorted by first and last day")
+        while hi < r:
+            for concept in daily.concepts[hi]:
+                seen[concept] = seen.get(concept, 0) + 1
+                distinct += seen[concept] == 1
+            hi += 1
+        while lo < l:
+            for concept in daily.concepts[lo]:
+                seen[concept] -= 1
+                distinct -= seen[concept] == 0
+            lo += 1
+        metrics = lvi_metrics(
+            distinct,
+            duration[r] - duration[l],
+            rate_sum[r] - rate_sum[l],
+            int(applications[r] - applications[l])
+        )
+        results.append({**metrics, "weekStart": first.strftime('%Y-%m-%d'), "weekEnd": last.strftime('%Y-%m-%d')})
+    return results
+
+
+def rolling_windows(first: date, last: date, window: int) -> List[Tuple[date, date]]:
+    # One window of `window` days ending on every day from first to last
+    return [(day - timedelta(days=window - 1), day)
+            for day in (first + timedelta(days=i) for i in range((last - first).days + 1))]
+
+
+async def load_daily_activity(db, user_id: str, first: date, last: date) -> DailyActivity:
+    """A single scan of each collection covering the UTC days [first, last]"""
+    range_start = datetime.combine(first, datetime.min.time(), tzinfo=timezone.utc)
+    range_end = datetime.combine(last, datetime.max.time(), tzinfo=timezone.utc)
+    sessions_query = db.collection('sessions').where('userId', '==', user_id)\
+        .where('startTime', '>=', range_start)\
+        .where('startTime', '<=', range_end)
+    apps_query = db.collection('skill_applications').where('userId', '==', user_id)\
+        .where('appliedAt', '>=', range_start)\
+        .where('appliedAt', '<=', range_end)
+    sessions, apps = await asyncio.gather(
+        firestore_read('sessions', sessions_query.get()),
+        firestore_read('skill_applications', apps_query.get())
+    )
+    return bucket_events(
+        (doc.to_dict() for doc in sessions),
+        (doc.to_dict() for doc in apps),
+        first,
+        (last - first).days + 1
+    )
@@ -0,0 +1,132 @@
+# Weekly LVI rollups - one Firestore document per user and week, kept current on every write
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+from typing import Iterable
+from firebase_admin import firestore
+from app.lvi_engine import utc_day, week_start_day
+from app.metrics import firestore_read
+
+
+ROLLUPS = "lvi_weekly"
+
+
+def week_bounds(moment: datetime):
+    """Sunday 00:00 to Saturday 23:59:59 UTC around `moment`.
+
+    Writes pass the client's tz-aware event time and reads pass the current
+    time; both are normalised to UTC here so they pick the same rollup.
+    """
+    start_day = week_start_day(utc_day(moment))
+    week_start = datetime(start_day.year, start_day.month, start_day.day, tzinfo=timezone.utc)
+    week_end = week_start + timedelta(days=6, hours=23, minutes=59, seconds=59, microseconds=999)
+    return week_start, week_end
+
+
+def rollup_id(user_id: str, week_start: datetime) -> str:
+    return f"{user_id}_{week_start.strftime('%Y-%m-%d')}"
+
+
+def empty_rollup(user_id: str, week_start: datetime) -> dict:
+    return {
+        "userId": user_id,
+        "weekStart": week_start.strftime('%Y-%m-%d'),
+        "concepts": [],
+        "durationSum": 0,
+        "sessionCount": 0,
+        "successRateSum": 0.0,
+        "applicationCount": 0,
+    }
+
+
+def session_delta(session: dict) -> dict:
+    # Duration only counts for sessions that taught something, as in the original weekly scan
+    concepts = session.get('conceptsLearned') or []
+    delta = {"sessionCount": firestore.Increment(1)}
+    if concepts:
+        delta["concepts"] = firestore.ArrayUnion(list(concepts))
+        delta["durationSum"] = firestore.Increment(session.get('duration', 0))
+    return delta
+
+
+def application_delta(application: dict) -> dict:
+    return {
+        "successRateSum": firestore.Increment(float(application.get('successRate', 0.0))),
+        "applicationCount": firestore.Increment(1),
+    }
+
+
+def rollup_from_documents(user_id: str, week_start: datetime, sessions: Iterable[dict], applications: Iterable[dict]) -> dict:
+    """Reduce raw session/application dicts into a rollup (backfill path)"""
+    rollup = empty_rollup(user_id, week_start)
+    concepts = set()
+    for session in sessions:
+        concepts_learned = session.get('conceptsLearned') or []
+        if concepts_learned:
+            concepts.update(concepts_learned)
+            rollup["durationSum"] += session.get('duration', 0)
+        rollup["sessionCount"] += 1
+    for application in applications:
+        rollup["successRateSum"] += float(application.get('successRate', 0.0))
+        rollup["applicationCount"] += 1
+    rollup["concepts"] = sorted(concepts)
+    return rollup
+
+
+async def scan_week(db, user_id: str, week_start: datetime, week_end: datetime):
+    """Raw session and application dicts for one week - only used to build a missing rollup"""
+    sessions_query = db.collection('sessions').where('userId', '==', user_id)\
+        .where('startTime', '>=', week_start)\
+        .where('startTime', '<=', week_end)
+    apps_query = db.collection('skill_applications').where('userId', '==', user_id)\
+        .where('appliedAt', '>=', week_start)\
+        .where('appliedAt', '<=', week_end)
+    sessions, apps = await asyncio.gather(
+        firestore_read('sessions', sessions_query.get()),
+        firestore_read('skill_applications', apps_query.get())
+    )
+    return [doc.to_dict() for doc in sessions], [doc.to_dict() for doc in apps]
+
+
+async def ensure_rollup(db, user_id: str, week_start: datetime, week_end: datetime) -> dict:
+    """The week's rollup; built once from the raw collections when it doesn't exist yet.
+
+    Writes call this before incrementing, so activity stored before rollups
+    existed (seed scripts, older deployments) is counted exactly once.
+    """
+    ref = db.collection(ROLLUPS).document(rollup_id(user_id, week_start))
+    snapshot = await firestore_read(ROLLUPS, ref.get())
+    if snapshot.exists:
+        return snapshot.to_dict()
+
+    sessions, apps = await scan_week(db, user_id, week_start, week_end)
+    rollup = rollup_from_documents(user_id, week_start, sessions, apps)
+    try:
+        await ref.create({**rollup, "updatedAt": firestore.SERVER_TIMESTAMP})
+        return rollup
+    except Exception:
+        # Another request built it first; its copy is the one later increments apply to
+        snapshot = await firestore_read(ROLLUPS, ref.get())
+        return snapshot.to_dict() if snapshot.exists else rollup
+
+
+async def _record(db, collection, user_id, week_start, week_end, document, delta):
+    await ensure_rollup(db, user_id, week_start, week_end)
+    doc_ref = db.collection(collection).document()
+    rollup_ref = db.collection(ROLLUPS).document(rollup_id(user_id, week_start))
+    batch = db.batch()
+    batch.set(doc_ref, document)
+    batch.set(rollup_ref, {"updatedAt": firestore.SERVER_TIMESTAMP, **delta}, merge=True)
+    await batch.commit()
+    return doc_ref.id
+
+
+async def record_session(db, user_id: str, week_start: datetime, week_end: datetime, session: dict) -> str:
+    """Write a session and fold it into its week's rollup in one atomic batch"""
+    return await _record(db, 'sessions', user_id, week_start, week_end, session, session_delta(session))
+
+
+async def record_application(db, user_id: str, week_start: datetime, week_end: datetime, application: dict) -> str:
+    """Write a skill application and fold it into its week's rollup in one atomic batch"""
+    return await _record(db, 'skill_applications', user_id, week_start, week_end, application,
+                         application_delta(application))
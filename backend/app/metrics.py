@@ -0,0 +1,240 @@
+# Metrics - in-process latency histograms and counters, rendered in Prometheus text format
+
+import bisect
+import contextvars
+import functools
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Seconds; wide enough for sub-millisecond cache hits and multi-second LLM calls
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def enabled():
+    return os.getenv("METRICS_ENABLED", "1") not in ("0", "false", "False")
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Tuple[str, ...], values: Tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class Counter:
+    """Monotonic per-label-set totals"""
+
+    kind = "counter"
+
+    def __init__(self, name, help_text, labels: Iterable[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(labels)
+        self._values: Dict[Tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1.0, **labels):
+        key = tuple(labels.get(name, "") for name in self.label_names)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_labels(self.label_names, key)} {_number(value)}" for key, value in items]
+
+
+class Histogram:
+    """Cumulative-bucket histogram per label set, as Prometheus expects"""
+
+    kind = "histogram"
+
+    def __init__(self, name, help_text, labels: Iterable[str] = (), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [per-bucket counts (last is +Inf), sum, count]
+        self._series: Dict[Tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(labels.get(name, "") for name in self.label_names)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = sorted((key, (list(counts), total, count)) for key, (counts, total, count) in self._series.items())
+        lines = []
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = 'le="+Inf"' if bound == float("inf") else f'le="{_number(bound)}"'
+                lines.append(f"{self.name}_bucket{_labels(self.label_names, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.label_names, key)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels(self.label_names, key)} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: List = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name, help_text, labels: Iterable[str] = ()) -> Counter:
+        return self.register(Counter(name, help_text, labels))
+
+    def histogram(self, name, help_text, labels: Iterable[str] = (), buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, help_text, labels, buckets))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+HTTP_REQUEST_SECONDS = registry.histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template", ("method", "route", "status"))
+NEO4J_QUERY_SECONDS = registry.histogram(
+    "neo4j_query_duration_seconds", "Neo4j query latency by repository method", ("query", "outcome"))
+FIRESTORE_READ_SECONDS = registry.histogram(
+    "firestore_read_duration_seconds", "Firestore read latency by collection", ("collection", "outcome"))
+FIRESTORE_DOCUMENTS_READ = registry.counter(
+    "firestore_documents_read_total", "Documents returned by Firestore reads", ("collection",))
+OPENAI_REQUEST_SECONDS = registry.histogram(
+    "openai_request_duration_seconds", "chat.completions.create latency", ("model", "outcome"))
+OPENAI_TOKENS = registry.counter(
+    "openai_tokens_total", "Tokens reported by chat.completions.create", ("model", "kind"))
+LLM_CACHE_HITS = registry.counter(
+    "llm_cache_hits_total", "Completions served from the LLM response cache", ("model",))
+
+
+# Name of the repository method whose Cypher is running; set per call, so gathered queries keep their own
+_query_name: contextvars.ContextVar[str] = contextvars.ContextVar("neo4j_query", default="unnamed")
+
+
+def query_name() -> str:
+    return _query_name.get()
+
+
+def named_query(method):
+    """Label Neo4j time spent inside an async repository method with the method's name"""
+    @functools.wraps(method)
+    async def wrapper(*args, **kwargs):
+        token = _query_name.set(method.__name__)
+        try:
+            return await method(*args, **kwargs)
+        finally:
+            _query_name.reset(token)
+    return wrapper
+
+
+@contextmanager
+def observe_query(name: Optional[str] = None):
+    start = time.perf_counter()
+    outcome = "ok"
+    try:
+        yield
+    except BaseException:
+        outcome = "error"
+        raise
+    finally:
+        NEO4J_QUERY_SECONDS.observe(time.perf_counter() - start, query=name or query_name(), outcome=outcome)
+
+
+async def firestore_read(collection: str, awaitable):
+    """Await a Firestore get() and record its latency and document count"""
+    start = time.perf_counter()
+    outcome = "ok"
+    try:
+        result = await awaitable
+    except BaseException:
+        outcome = "error"
+        raise
+    finally:
+        FIRESTORE_READ_SECONDS.observe(time.perf_counter() - start, collection=collection, outcome=outcome)
+    if isinstance(result, list):
+        FIRESTORE_DOCUMENTS_READ.inc(len(result), collection=collection)
+    elif getattr(result, "exists", False):
+        FIRESTORE_DOCUMENTS_READ.inc(1, collection=collection)
+    return result
+
+
+class RequestMetricsMiddleware:
+    """Pure ASGI middleware timing every HTTP request into HTTP_REQUEST_SECONDS.
+
+    Labelled by route template (/api/jobs/{job_id}) rather than the raw path,
+    so series stay bounded. The router records the matched route in the scope.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        start = time.perf_counter()
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = scope.get("route")
+            HTTP_REQUEST_SECONDS.observe(
+                time.perf_counter() - start,
+                method=scope["method"],
+                route=getattr(route, "path", "unmatched"),
+                status=status
+            )
+
+
+def record_completion(model: str, seconds: float, response=None):
+    """Latency and token usage of one chat.completions.create call; response None means it failed"""
+    OPENAI_REQUEST_SECONDS.observe(seconds, model=model, outcome="ok" if response is not None else "error")
+    usage = getattr(response, "usage", None)
+    if usage is not None:
+        OPENAI_TOKENS.inc(getattr(usage, "prompt_tokens", 0) or 0, model=model, kind="prompt")
+        OPENAI_TOKENS.inc(getattr(usage, "completion_tokens", 0) or 0, model=model, kind="completion")
@@ -0,0 +1,185 @@
+# Request profiling - opt-in sampling profiler producing flamegraph-compatible collapsed stacks
+
+import hmac
+import os
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from pathlib import Path
+from typing import Optional
+from urllib.parse import parse_qs
+
+PROFILE_HEADER = b"x-profile"
+TOKEN_HEADER = b"x-profile-token"
+
+
+def enabled():
+    # Off unless explicitly turned on; the header alone must never enable profiling in production
+    return os.getenv("PROFILING_ENABLED", "0") in ("1", "true", "True")
+
+
+def token_matches(presented: Optional[str], token: Optional[str] = None) -> bool:
+    """True when PROFILING_TOKEN is unset or `presented` equals it (constant-time)"""
+    token = token if token is not None else os.getenv("PROFILING_TOKEN")
+    return not token or hmac.compare_digest((presented or "").encode(), token.encode())
+
+
+def profile_dir() -> Path:
+    return Path(os.getenv("PROFILE_DIR", str(Path(__file__).parent.parent / ".profiles")))
+
+
+def _frame_name(frame) -> str:
+    code = frame.f_code
+    module = frame.f_globals.get("__name__", "?")
+    return f"{module}:{getattr(code, 'co_qualname', code.co_name)}"
+
+
+class StackSampler:
+    """Samples one thread's Python stack every `interval` seconds from a helper thread.
+
+    The event loop runs every request on the same thread, so concurrent
+    requests can show up in each other's profiles; profile on a quiet
+    instance for a clean picture. Work moved to asyncio.to_thread is not seen.
+
+    The sampler needs the GIL to read the stack, so while any sampler runs the
+    interpreter's switch interval is lowered to the sampling interval;
+    otherwise a busy loop thread would hold it for 5 ms at a time.
+    """
+
+    _active = 0
+    _saved_switch_interval = None
+    _lock = threading.Lock()
+
+    def __init__(self, thread_id: int, interval: float = 0.001):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.started_at = 0.0
+        self.elapsed = 0.0
+
+    def _run(self):
+        # Event-loop frames below the handler stay in: a stack ending in select() is time awaiting I/O
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(_frame_name(frame))
+                frame = frame.f_back
+            self.stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+    def start(self):
+        with StackSampler._lock:
+            if StackSampler._active == 0:
+                StackSampler._saved_switch_interval = sys.getswitchinterval()
+                sys.setswitchinterval(min(self.interval, StackSampler._saved_switch_interval))
+            StackSampler._active += 1
+        self.started_at = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+            with StackSampler._lock:
+                StackSampler._active -= 1
+                if StackSampler._active == 0:
+                    sys.setswitchinterval(StackSampler._saved_switch_interval)
+        self.elapsed = time.perf_counter() - self.started_at
+        return self
+
+    def collapsed(self) -> str:
+        """Brendan Gregg's folded format: 'root;child;leaf count' per line"""
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+def _safe(value: str) -> str:
+    return re.sub(r"[^A-Za-z0-9_.-]+", "_", value).strip("_")[:80] or "root"
+
+
+class ProfilingMiddleware:
+    """Profiles single requests that ask for it with `X-Profile` or `?profile=`.
+
+    Only installed when PROFILING_ENABLED=1. If PROFILING_TOKEN is set the
+    request must also carry a matching X-Profile-Token header. Modes:
+
+      store  (default) - write <PROFILE_DIR>/<name>.collapsed and return the
+                         normal response with an X-Profile-File header
+      inline           - replace the response with the collapsed stacks
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.token = os.getenv("PROFILING_TOKEN")
+        self.interval = float(os.getenv("PROFILE_INTERVAL_MS", "1")) / 1000
+
+    def _mode(self, scope) -> Optional[str]:
+        headers = dict(scope.get("headers") or [])
+        mode = headers.get(PROFILE_HEADER, b"").decode()
+        if not mode:
+            query = parse_qs(scope.get("query_string", b"").decode())
+            mode = (query.get("profile") or [""])[0]
+        if not mode or mode in ("0", "false"):
+            return None
+        if not token_matches(headers.get(TOKEN_HEADER, b"").decode(), self.token):
+            return None
+        return "inline" if mode == "inline" else "store"
+
+    async def __call__(self, scope, receive, send):
+        mode = self._mode(scope) if scope["type"] == "http" else None
+        if mode is None:
+            return await self.app(scope, receive, send)
+
+        name = f"{time.strftime('%Y%m%d-%H%M%S')}-{scope['method']}-{_safe(scope['path'])}-{uuid.uuid4().hex[:6]}"
+        sampler = StackSampler(threading.get_ident(), self.interval).start()
+
+        if mode == "inline":
+            async def discard(message):
+                pass
+            try:
+                await self.app(scope, receive, discard)
+            finally:
+                sampler.stop()
+            body = sampler.collapsed().encode()
+            await send({"type": "http.response.start", "status": 200, "headers": [
+                (b"content-type", b"text/plain; charset=utf-8"),
+                (b"content-length", str(len(body)).encode()),
+                (b"x-profile-samples", str(sampler.samples).encode()),
+            ]})
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        async def send_with_header(message):
+            if message["type"] == "http.response.start":
+                message = {**message, "headers": [*message.get("headers", []),
+                                                   (b"x-profile-file", f"{name}.collapsed".encode())]}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_header)
+        finally:
+            sampler.stop()
+            path = profile_dir() / f"{name}.collapsed"
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(sampler.collapsed())
+            print(f"Profiled {scope['method']} {scope['path']}: {sampler.samples} samples "
+                  f"over {sampler.elapsed * 1000:.0f} ms -> {path}")
+
+
+def read_profile(name: str) -> Optional[str]:
+    # Names come from X-Profile-File; anything that could leave the directory is rejected
+    if _safe(name.removesuffix(".collapsed")) != name.removesuffix(".collapsed"):
+        return None
+    path = profile_dir() / f"{name.removesuffix('.collapsed')}.collapsed"
+    return path.read_text() if path.exists() else None
@@ -0,0 +1,272 @@
+# Graph repository - async Neo4j data access shared by every graph router
+
+import asyncio
+import inspect
+from typing import List, Optional
+from app.database import Neo4jConnection
+from app.graph_diff import diff_graph
+from app.ingest import RELATIONSHIP_TYPES, apply_delta, ingest_graph
+from app.metrics import named_query, observe_query
+
+
+class GraphRepository:
+    """Runs Cypher on sessions borrowed from the shared async driver.
+
+    Methods return plain dicts (``result.data()``) so callers can index
+    records the same way they did with the sync driver.
+    """
+
+    async def _run(self, query, **params) -> List[dict]:
+        with observe_query():
+            async with Neo4jConnection.session() as session:
+                result = await session.run(query, **params)
+                return await result.data()
+
+    async def _single(self, query, **params) -> Optional[dict]:
+        records = await self._run(query, **params)
+        return records[0] if records else None
+
+    # Knowledge graph reads
+
+    async def graph_nodes(self, user_id):
+        return await self._run("""
+            MATCH (s:Skill)
+            OPTIONAL MATCH (u:User {id: $userId})-[l:LEARNED]->(s)
+            RETURN s.id as id, s.name as name, s.category as category,
+                   COALESCE(l.confidence, 0) as confidence,
+                   CASE WHEN l IS NOT NULL THEN true ELSE false END as learned
+        """, userId=user_id)
+
+    async def graph_links(self):
+        return await self._run("""
+            MATCH (s1:Skill)-[r:PREREQUISITE_OF|RELATES_TO]->(s2:Skill)
+            RETURN s1.id as source, s2.id as target, type(r) as type
+        """)
+
+    async def skill_topology(self):
+        return await self._run("""
+            MATCH (s:Skill)
+            RETURN s.id as id, s.name as name, s.category as category
+        """)
+
+    async def fetch_graph(self, user_id):
+        # Independent reads run on separate pooled sessions so their I/O overlaps
+        return await asyncio.gather(
+            self.graph_nodes(user_id),
+            self.graph_links()
+        )
+
+    async def top_skills(self, user_id, limit=6):
+        return await self._run("""
+            MATCH (u:User {id: $userId})-[l:LEARNED]->(s:Skill)
+            RETURN s.name as skill, l.confidence as confidence
+            ORDER BY l.confidence DESC
+            LIMIT $limit
+        """, userId=user_id, limit=limit)
+
+    # Skill lookups
+
+    async def skill_exists(self, skill_id):
+        record = await self._single("""
+            MATCH (s:Skill {id: $skillId})
+            RETURN s.id as id
+        """, skillId=skill_id)
+        return record is not None
+
+    async def get_skill(self, skill_id):
+        return await self._single("""
+            MATCH (s:Skill {id: $skillId})
+            RETURN s.id as id, s.name as name, s.category as category,
+                   s.description as description, s.difficulty_level as difficulty,
+                   s.learning_time_hours as hours
+        """, skillId=skill_id)
+
+    async def get_skills(self, skill_ids):
+        return await self._run("""
+            MATCH (s:Skill)
+            WHERE s.id IN $skillIds
+            RETURN s.id as id, s.name as name, s.category as category,
+                   s.description as description, s.difficulty_level as difficulty,
+                   s.learning_time_hours as hours
+        """, skillIds=list(skill_ids))
+
+    async def all_skills(self):
+        return await self._run("""
+            MATCH (s:Skill)
+            RETURN s.id as id, s.name as name, s.category as category,
+                   s.description as description, s.difficulty_level as difficulty,
+                   s.learning_time_hours as hours
+        """)
+
+    async def learned_skill_ids(self, user_id):
+        records = await self._run("""
+            MATCH (u:User {id: $userId})-[:LEARNED]->(s:Skill)
+            RETURN s.id as skill_id
+        """, userId=user_id)
+        return [r['skill_id'] for r in records]
+
+    # Skill writes
+
+    async def create_skill(self, skill_id, name, category, description, difficulty, learning_time):
+        await self._run("""
+            CREATE (s:Skill {
+                id: $id,
+                name: $name,
+                category: $category,
+                description: $description,
+                difficulty_level: $difficulty,
+                learning_time_hours: $learningTime
+            })
+        """,
+        id=skill_id,
+        name=name,
+        category=category,
+        description=description,
+        difficulty=difficulty,
+        learningTime=learning_time)
+
+    async def link_related(self, skill_id, related_id, related_name):
+        # Returns the ids of the skills that were linked; the UNION keeps both lookups index seeks
+        records = await self._run("""
+            MATCH (new:Skill {id: $skillId})
+            CALL {
+                MATCH (related:Skill {id: $relatedId}) RETURN related
+                UNION
+                MATCH (related:Skill {name: $relatedName}) RETURN related
+            }
+            CREATE (new)-[:RELATES_TO]->(related)
+            RETURN related.id as id
+        """, skillId=skill_id, relatedId=related_id, relatedName=related_name)
+        return [r['id'] for r in records]
+
+    async def link_prerequisite(self, skill_id, prereq_id, prereq_name):
+        # Returns the ids of the skills that were linked
+        records = await self._run("""
+            CALL {
+                MATCH (prereq:Skill {id: $prereqId}) RETURN prereq
+                UNION
+                MATCH (prereq:Skill {name: $prereqName}) RETURN prereq
+            }
+            MATCH (new:Skill {id: $skillId})
+            CREATE (prereq)-[:PREREQUISITE_OF]->(new)
+            RETURN prereq.id as id
+        """, prereqId=prereq_id, prereqName=prereq_name, skillId=skill_id)
+        return [r['id'] for r in records]
+
+    async def delete_skill(self, skill_id):
+        record = await self._single("""
+            MATCH (s:Skill {id: $skillId})
+            DETACH DELETE s
+            RETURN count(s) as deleted
+        """, skillId=skill_id)
+        return record['deleted'] if record else 0
+
+    # LEARNED edges
+
+    async def add_learned(self, user_id, skill_id, confidence):
+        await self._run("""
+            MATCH (u:User {id: $userId})
+            MATCH (s:Skill {id: $skillId})
+            CREATE (u)-[:LEARNED {confidence: $confidence}]->(s)
+        """, userId=user_id, skillId=skill_id, confidence=confidence)
+
+    async def set_learned(self, user_id, skill_id, confidence):
+        await self._run("""
+            MATCH (u:User {id: $userId})
+            MATCH (s:Skill {id: $skillId})
+            MERGE (u)-[l:LEARNED]->(s)
+            SET l.confidence = $confidence
+        """, userId=user_id, skillId=skill_id, confidence=confidence)
+
+    async def remove_learned(self, user_id, skill_id):
+        await self._run("""
+            MATCH (u:User {id: $userId})-[l:LEARNED]->(s:Skill {id: $skillId})
+            DELETE l
+        """, userId=user_id, skillId=skill_id)
+
+    # Bulk graph replacement (generated data)
+
+    async def replace_graph(self, skills, relationships, user_id, chunk_size=None):
+        """Swap in a generated graph in one write transaction; returns ingest counts"""
+        async def work(tx):
+            # Clear existing skills (keep user)
+            await tx.run("MATCH (s:Skill) DETACH DELETE s")
+            counts = await ingest_graph(tx, skills, relationships, chunk_size)
+
+            # Assign some random skills to user as "learned"
+            await tx.run("""
+                MATCH (u:User {id: $userId})
+                MATCH (s:Skill)
+                WHERE s.difficulty_level <= 2
+                WITH u, s, rand() as r
+                WHERE r < 0.6
+                CREATE (u)-[:LEARNED {confidence: toInteger(70 + rand() * 25)}]->(s)
+            """, userId=user_id)
+            return counts
+
+        with observe_query():
+            async with Neo4jConnection.session() as session:
+                return await session.execute_write(work)
+
+    async def merge_graph(self, skills, relationships, user_id, chunk_size=None):
+        """Bring the stored graph in line with a generated one by writing only the delta.
+
+        Surviving skills keep their LEARNED edges and confidence; only newly
+        added skills are candidates for the demo user's random LEARNED edges.
+        Returns (GraphDelta, write counts).
+        """
+        async def work(tx):
+            result = await tx.run("""
+                MATCH (s:Skill)
+                RETURN s.id as id, s.name as name, s.category as category,
+                       s.description as description, s.difficulty_level as difficulty,
+                       s.learning_time_hours as hours
+            """)
+            current_skills = await result.data()
+            result = await tx.run("""
+                MATCH (s1:Skill)-[r]->(s2:Skill)
+                WHERE type(r) IN $types
+                RETURN s1.id as source, s2.id as target, type(r) as type, r.strength as strength
+            """, types=list(RELATIONSHIP_TYPES))
+            current_edges = await result.data()
+
+            delta = diff_graph(current_skills, current_edges, skills, relationships)
+            counts = await apply_delta(tx, delta, chunk_size)
+
+            if delta.added_skills:
+                await tx.run("""
+                    MATCH (u:User {id: $userId})
+                    UNWIND $skillIds AS skillId
+                    MATCH (s:Skill {id: skillId})
+                    WHERE s.difficulty_level <= 2
+                    WITH u, s, rand() as r
+                    WHERE r < 0.6
+                    CREATE (u)-[:LEARNED {confidence: toInteger(70 + rand() * 25)}]->(s)
+                """, userId=user_id, skillIds=[row["id"] for row in delta.added_skills])
+            return delta, counts
+
+        with observe_query():
+            async with Neo4jConnection.session() as session:
+                return await session.execute_write(work)
+
+
+# Every public method labels the Cypher it runs (neo4j_query_duration_seconds) with its own name
+for _name, _method in list(vars(GraphRepository).items()):
+    if not _name.startswith("_") and inspect.iscoroutinefunction(_method):
+        setattr(GraphRepository, _name, named_query(_method))
+
+
+_repository: Optional[GraphRepository] = None
+
+
+def get_repository() -> GraphRepository:
+    global _repository
+    if _repository is None:
+        _repository = GraphRepository()
+    return _repository
+
+
+def set_repository(repository: Optional[GraphRepository]):
+    # Swap the data-access layer (benchmarks, local stand-ins); None restores the default
+    global _repository
+    _repository = repository
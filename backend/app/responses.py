@@ -0,0 +1,59 @@
+# Response helpers - ApiResponse bodies serialised once with orjson or MessagePack for large payloads
+
+from typing import Any, Iterable, Optional
+import msgpack
+import orjson
+from fastapi import Response
+
+JSON_MEDIA_TYPE = "application/json"
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+# Older spellings clients still send for the same thing
+MSGPACK_ALIASES = (MSGPACK_MEDIA_TYPE, "application/x-msgpack", "application/vnd.msgpack")
+
+
+def api_body(data: Any, error: Optional[str] = None, success: bool = True) -> bytes:
+    """The ApiResponse envelope as JSON bytes, without a Pydantic validation pass"""
+    return orjson.dumps({"data": data, "error": error, "success": success})
+
+
+def api_msgpack_body(data: Any, error: Optional[str] = None, success: bool = True) -> bytes:
+    """The ApiResponse envelope as MessagePack; bytes values travel as bin, not base64"""
+    return msgpack.packb({"data": data, "error": error, "success": success}, use_bin_type=True)
+
+
+def json_response(body: bytes, headers: Optional[dict] = None) -> Response:
+    # Returning a Response makes FastAPI skip response_model validation and re-encoding
+    return Response(content=body, media_type=JSON_MEDIA_TYPE, headers=headers)
+
+
+def msgpack_response(body: bytes, headers: Optional[dict] = None) -> Response:
+    return Response(content=body, media_type=MSGPACK_MEDIA_TYPE, headers=headers)
+
+
+def _quality(accept: str, media_types: Iterable[str]) -> float:
+    """Highest q the Accept header gives any of media_types; exact types beat wildcards"""
+    exact, wildcard = None, None
+    for item in accept.split(","):
+        media_type, *params = [part.strip() for part in item.split(";")]
+        q = 1.0
+        for param in params:
+            if param.startswith("q="):
+                try:
+                    q = float(param[2:])
+                except ValueError:
+                    q = 0.0
+        if media_type.lower() in media_types:
+            exact = max(q, exact or 0.0)
+        elif media_type in ("*/*", "application/*"):
+            wildcard = max(q, wildcard or 0.0)
+    if exact is not None:
+        return exact
+    return wildcard or 0.0
+
+
+def wants_msgpack(accept: Optional[str]) -> bool:
+    """True when Accept prefers MessagePack to JSON; JSON wins ties and absent headers"""
+    if not accept:
+        return False
+    msgpack_q = _quality(accept, MSGPACK_ALIASES)
+    return msgpack_q > 0 and msgpack_q > _quality(accept, (JSON_MEDIA_TYPE,))
@@ -0,0 +1,95 @@
+"""
+Activity API - record learning sessions and skill applications
+
+Every write also updates the user's weekly LVI rollup, so /api/lvi stays a
+single document read.
+"""
+
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel
+from typing import List, Optional, Literal
+from datetime import datetime
+from firebase_admin import firestore
+from app.models import ApiResponse
+from app.database import FirebaseConnection
+from app.cache import ActivityVersion
+from app.lvi_rollups import record_session, record_application, week_bounds
+
+router = APIRouter()
+
+
+class SessionCreate(BaseModel):
+    userId: str = "user-1"
+    startTime: datetime
+    endTime: Optional[datetime] = None
+    duration: Optional[int] = None  # minutes; derived from endTime when omitted
+    sessionType: Optional[str] = None
+    skillsPracticed: List[str] = []
+    conceptsLearned: List[str] = []
+    completionRate: Optional[float] = None
+
+
+class SkillApplicationCreate(BaseModel):
+    userId: str = "user-1"
+    skillId: str
+    appliedAt: datetime
+    projectId: Optional[str] = None
+    projectName: Optional[str] = None
+    context: Optional[str] = None
+    successRate: float
+    timeSpent: Optional[int] = None
+    complexity: Optional[Literal['low', 'medium', 'high']] = None
+
+
+def _firestore_db():
+    if not FirebaseConnection.is_configured():
+        raise HTTPException(status_code=500, detail="Firestore not configured")
+    return FirebaseConnection.get_async_firestore()
+
+
+@router.post("/sessions", response_model=ApiResponse)
+async def create_session(request: SessionCreate):
+    """Store a learning session and add it to its week's LVI rollup"""
+    db = _firestore_db()
+
+    session = request.model_dump(exclude_none=True)
+    if request.duration is None:
+        if request.endTime is None:
+            raise HTTPException(status_code=422, detail="Provide duration or endTime")
+        session["duration"] = max(0, round((request.endTime - request.startTime).total_seconds() / 60))
+    session["createdAt"] = firestore.SERVER_TIMESTAMP
+
+    try:
+        week_start, week_end = week_bounds(request.startTime)
+        session_id = await record_session(db, request.userId, week_start, week_end, session)
+        return ApiResponse(
+            data={"id": session_id, "weekStart": week_start.strftime('%Y-%m-%d')},
+            error=None,
+            success=True
+        )
+    except Exception as e:
+        return ApiResponse(data=None, error=f"Failed to record session: {str(e)}", success=False)
+    finally:
+        ActivityVersion.bump()
+
+
+@router.post("/applications", response_model=ApiResponse)
+async def create_application(request: SkillApplicationCreate):
+    """Store a skill application and add it to its week's LVI rollup"""
+    db = _firestore_db()
+
+    application = request.model_dump(exclude_none=True)
+    application["createdAt"] = firestore.SERVER_TIMESTAMP
+
+    try:
+        week_start, week_end = week_bounds(request.appliedAt)
+        application_id = await record_application(db, request.userId, week_start, week_end, application)
+        return ApiResponse(
+            data={"id": application_id, "weekStart": week_start.strftime('%Y-%m-%d')},
+            error=None,
+            success=True
+        )
+    except Exception as e:
+        return ApiResponse(data=None, error=f"Failed to record application: {str(e)}", success=False)
+    finally:
+        ActivityVersion.bump()
@@ -2,26 +2,38 @@
 Graph RAG Admin API - Generate and manage dynamic knowledge graph
 """
 
-from fastapi import APIRouter, HTTPException, BackgroundTasks
+from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import List, Literal, Optional
 from app.models import ApiResponse
-from app.graph_rag import GraphRAG, Skill, SkillRelationship, LearningPath
+from app.graph_rag import AsyncGraphRAG, Skill, SkillRelationship, LearningPath
 from app.database import Neo4jConnection
+from app.learning_path import path_from_closure, prerequisite_closure, skill_rows
+from app.repository import get_repository
+from app.cache import GraphVersion
+from app.skill_index import skill_index
+from app.skill_embeddings import skill_embeddings
+from app.jobs import JobContext, job_queue
+import asyncio
 import os
 
 router = APIRouter()
 
+GENERATE_SKILLS_JOB = "generate-skills"
+
 
 class GenerateSkillsRequest(BaseModel):
     domain: str
     num_skills: int = 20
     user_id: str = "user-1"
+    # merge: write only the diff against the stored graph; replace: wipe and reload
+    mode: Literal["merge", "replace"] = "merge"
 
 
 class GeneratePathRequest(BaseModel):
     user_id: str
     target_skill_id: str
+    annotate: bool = False
 
 
 class EnrichSkillRequest(BaseModel):
@@ -29,46 +41,27 @@ class EnrichSkillRequest(BaseModel):
 
 
 @router.post("/generate-skills", response_model=ApiResponse)
-async def generate_skills(request: GenerateSkillsRequest, background_tasks: BackgroundTasks):
+async def generate_skills(request: GenerateSkillsRequest):
     """
-    Generate skills dynamically using Graph RAG and populate Neo4j
+    Queue dynamic skill generation with Graph RAG and return the job id
     
-    This endpoint:
+    The job:
     1. Uses LLM to generate skills for the specified domain
     2. Generates intelligent relationships between skills
-    3. Populates Neo4j with the generated data
+    3. Populates Neo4j with the generated data, merging the delta by default
+    
+    Poll /api/jobs/{job_id} for status and progress.
     """
     try:
-        # Initialize Graph RAG
-        graph_rag = GraphRAG()
-        
-        # Generate skills
-        skills = graph_rag.generate_skills_from_domain(
-            domain=request.domain,
-            num_skills=request.num_skills
-        )
-        
-        if not skills:
-            raise HTTPException(status_code=500, detail="Failed to generate skills")
-        
-        # Generate relationships
-        relationships = graph_rag.generate_skill_relationships(skills)
-        
-        # Populate Neo4j in background
-        background_tasks.add_task(
-            populate_neo4j_with_generated_data,
-            skills=skills,
-            relationships=relationships,
-            user_id=request.user_id
-        )
+        job = await job_queue.submit(GENERATE_SKILLS_JOB, request.model_dump())
         
         return ApiResponse(
             data={
-                "message": f"Generating {len(skills)} skills and {len(relationships)} relationships",
+                "message": f"Queued generation of {request.num_skills} skills",
+                "job_id": job["id"],
                 "domain": request.domain,
-                "skills_count": len(skills),
-                "relationships_count": len(relationships),
-                "status": "processing"
+                "mode": request.mode,
+                "status": job["status"]
             },
             error=None,
             success=True
@@ -77,86 +70,88 @@ async def generate_skills(request: GenerateSkillsRequest, background_tasks: Back
     except Exception as e:
         return ApiResponse(
             data=None,
-            error=f"Failed to generate skills: {str(e)}",
+            error=f"Failed to queue skill generation: {str(e)}",
             success=False
         )
 
 
+async def run_generate_skills_job(job: JobContext):
+    """Job handler behind /generate-skills; survives restarts via the job table"""
+    request = GenerateSkillsRequest(**job.params)
+    graph_rag = AsyncGraphRAG()
+    
+    await job.progress(0.05, f"Generating {request.num_skills} skills for '{request.domain}'")
+    skills = await graph_rag.generate_skills_from_domain(
+        domain=request.domain,
+        num_skills=request.num_skills
+    )
+    if not skills:
+        raise RuntimeError("Failed to generate skills")
+    
+    await job.progress(0.4, f"Generating relationships between {len(skills)} skills")
+    relationships = await graph_rag.generate_skill_relationships(skills)
+    
+    await job.progress(0.8, f"Writing {len(skills)} skills and {len(relationships)} relationships to Neo4j")
+    written = await populate_neo4j_with_generated_data(
+        skills=skills,
+        relationships=relationships,
+        user_id=request.user_id,
+        mode=request.mode
+    )
+    
+    return {
+        "domain": request.domain,
+        "mode": request.mode,
+        "skills_count": len(skills),
+        "relationships_count": len(relationships),
+        "written": written
+    }
+
+
+job_queue.register(GENERATE_SKILLS_JOB, run_generate_skills_job)
+
+
 @router.post("/generate-learning-path", response_model=ApiResponse)
 async def generate_learning_path(request: GeneratePathRequest):
     """
-    Generate personalized learning path using Graph RAG
+    Generate personalized learning path from the prerequisite graph
     
-    Analyzes user's current skills and generates optimal path to target skill
+    Computes the minimal set of unlearned prerequisites for the target skill,
+    ordered easiest-first. Set annotate=true to add LLM summary and tips.
     """
     try:
         if not Neo4jConnection.is_configured():
             raise HTTPException(status_code=500, detail="Neo4j not configured")
         
-        # Get user's current skills from Neo4j
-        driver = Neo4jConnection.create_driver()
-        session = driver.session()
-        
-        try:
-            # Get user's learned skills
-            user_skills_result = session.run("""
-                MATCH (u:User {id: $userId})-[:LEARNED]->(s:Skill)
-                RETURN s.id as skill_id
-            """, userId=request.user_id)
-            user_skills = [record["skill_id"] for record in user_skills_result]
-            
-            # Get all skills
-            all_skills_result = session.run("""
-                MATCH (s:Skill)
-                RETURN s.id as id, s.name as name, s.category as category,
-                       s.description as description, s.difficulty_level as difficulty,
-                       s.learning_time_hours as hours
-            """)
-            
-            all_skills = []
-            for record in all_skills_result:
-                all_skills.append(Skill(
-                    id=record["id"],
-                    name=record["name"],
-                    category=record["category"],
-                    description=record.get("description", ""),
-                    difficulty_level=int(record.get("difficulty", 1)),
-                    learning_time_hours=int(record.get("hours", 10))
-                ))
-            
-            # Get relationships
-            relationships_result = session.run("""
-                MATCH (s1:Skill)-[r:PREREQUISITE_OF|RELATES_TO]->(s2:Skill)
-                RETURN s1.id as source, s2.id as target, type(r) as type
-            """)
-            
-            relationships = []
-            for record in relationships_result:
-                relationships.append(SkillRelationship(
-                    source_skill_id=record["source"],
-                    target_skill_id=record["target"],
-                    relationship_type=record["type"],
-                    strength=0.8
-                ))
-            
-        finally:
-            session.close()
-            driver.close()
+        repo = get_repository()
         
-        # Generate learning path using Graph RAG
-        graph_rag = GraphRAG()
-        learning_path = graph_rag.generate_learning_path(
-            user_skills=user_skills,
-            target_skill=request.target_skill_id,
-            all_skills=all_skills,
-            relationships=relationships
+        # The closure is walked on the in-memory prerequisite index; only its skills are fetched
+        user_skills, _ = await asyncio.gather(
+            repo.learned_skill_ids(request.user_id),
+            skill_index.ensure_loaded(repo)
         )
+        learned = set(user_skills)
+        target = request.target_skill_id
+        closure = (set() if target in learned
+                   else prerequisite_closure(target, skill_index.prerequisites, learned))
+        skills = skill_rows(await repo.get_skills(closure | {target}))
+        
+        learning_path = path_from_closure(target, closure, skill_index.prerequisites, skills)
         
         if not learning_path:
             raise HTTPException(status_code=404, detail="Could not generate learning path")
         
+        data = learning_path.model_dump()
+        if request.annotate:
+            # The LLM only describes the computed path, it never changes it
+            try:
+                data["annotation"] = await AsyncGraphRAG().annotate_learning_path(learning_path, skills)
+            except Exception as e:
+                print(f"Learning path annotation skipped: {e}")
+                data["annotation"] = None
+        
         return ApiResponse(
-            data=learning_path.model_dump(),
+            data=data,
             error=None,
             success=True
         )
@@ -179,37 +174,22 @@ async def enrich_skill(request: EnrichSkillRequest):
             raise HTTPException(status_code=500, detail="Neo4j not configured")
         
         # Get skill from Neo4j
-        driver = Neo4jConnection.create_driver()
-        session = driver.session()
+        record = await get_repository().get_skill(request.skill_id)
+        if not record:
+            raise HTTPException(status_code=404, detail="Skill not found")
         
-        try:
-            result = session.run("""
-                MATCH (s:Skill {id: $skillId})
-                RETURN s.id as id, s.name as name, s.category as category,
-                       s.description as description, s.difficulty_level as difficulty,
-                       s.learning_time_hours as hours
-            """, skillId=request.skill_id)
-            
-            record = result.single()
-            if not record:
-                raise HTTPException(status_code=404, detail="Skill not found")
-            
-            skill = Skill(
-                id=record["id"],
-                name=record["name"],
-                category=record["category"],
-                description=record.get("description", ""),
-                difficulty_level=int(record.get("difficulty", 1)),
-                learning_time_hours=int(record.get("hours", 10))
-            )
-            
-        finally:
-            session.close()
-            driver.close()
+        skill = Skill(
+            id=record["id"],
+            name=record["name"],
+            category=record["category"],
+            description=record.get("description") or "",
+            difficulty_level=int(record.get("difficulty") or 1),
+            learning_time_hours=int(record.get("hours") or 10)
+        )
         
         # Enrich skill using Graph RAG
-        graph_rag = GraphRAG()
-        enriched_data = graph_rag.enrich_skill_with_resources(skill)
+        graph_rag = AsyncGraphRAG()
+        enriched_data = await graph_rag.enrich_skill_with_resources(skill)
         
         return ApiResponse(
             data=enriched_data,
@@ -225,59 +205,59 @@ async def enrich_skill(request: EnrichSkillRequest):
         )
 
 
-def populate_neo4j_with_generated_data(
+async def populate_neo4j_with_generated_data(
     skills: List[Skill],
     relationships: List[SkillRelationship],
-    user_id: str
+    user_id: str,
+    mode: str = "replace"
 ):
-    """Background task to populate Neo4j with generated data"""
+    """Write generated data to Neo4j; raises so the calling job is marked failed"""
+    if mode == "merge":
+        return await merge_generated_data(skills, relationships, user_id)
+
     try:
-        driver = Neo4jConnection.create_driver()
-        session = driver.session()
-        
-        try:
-            # Clear existing skills (keep user)
-            session.run("MATCH (s:Skill) DETACH DELETE s")
-            
-            # Create skills
-            for skill in skills:
-                session.run("""
-                    CREATE (s:Skill {
-                        id: $id,
-                        name: $name,
-                        category: $category,
-                        description: $description,
-                        difficulty_level: $difficulty,
-                        learning_time_hours: $hours
-                    })
-                """, **skill.model_dump())
-            
-            # Create relationships
-            for rel in relationships:
-                session.run(f"""
-                    MATCH (s1:Skill {{id: $source}})
-                    MATCH (s2:Skill {{id: $target}})
-                    CREATE (s1)-[:{rel.relationship_type} {{strength: $strength}}]->(s2)
-                """, source=rel.source_skill_id, target=rel.target_skill_id, strength=rel.strength)
-            
-            # Assign some random skills to user as "learned"
-            session.run("""
-                MATCH (u:User {id: $userId})
-                MATCH (s:Skill)
-                WHERE s.difficulty_level <= 2
-                WITH u, s, rand() as r
-                WHERE r < 0.6
-                CREATE (u)-[:LEARNED {confidence: toInteger(70 + rand() * 25)}]->(s)
-            """, userId=user_id)
-            
-            print(f"✅ Populated Neo4j with {len(skills)} skills and {len(relationships)} relationships")
-            
-        finally:
-            session.close()
-            driver.close()
+        counts = await get_repository().replace_graph(skills, relationships, user_id)
+        print(f"✅ Populated Neo4j with {counts['skills']} skills and {counts['relationships']} relationships "
+              f"in {counts['batches']} batches")
+        return counts
             
     except Exception as e:
         print(f"❌ Error populating Neo4j: {e}")
+        raise
+    finally:
+        skill_index.invalidate()
+        skill_embeddings.invalidate()
+        GraphVersion.bump()
+
+
+async def merge_generated_data(skills: List[Skill], relationships: List[SkillRelationship], user_id: str):
+    """Apply only the diff between the stored and generated graphs; caches follow the delta"""
+    try:
+        delta, counts = await get_repository().merge_graph(skills, relationships, user_id)
+    except Exception as e:
+        print(f"❌ Error merging generated graph into Neo4j: {e}")
+        skill_index.invalidate()
+        skill_embeddings.invalidate()
+        GraphVersion.bump()
+        raise
+
+    summary = delta.summary()
+    print(f"✅ Merged generated graph into Neo4j: {summary}")
+    if not delta.size:
+        return summary
+
+    skill_index.remove_skills(delta.removed_skill_ids)
+    for skill_id in delta.removed_skill_ids:
+        skill_embeddings.remove(skill_id)
+    for row in delta.added_skills + delta.changed_skills:
+        skill_index.add_skill(row["id"], row["name"], row["category"])
+        skill_embeddings.add(row["id"], row["name"], row["description"])
+    for row in delta.removed_edges:
+        skill_index.remove_edge(row["source"], row["target"], row["type"])
+    for row in delta.added_edges:
+        skill_index.add_edge(row["source"], row["target"], row["type"])
+    GraphVersion.bump()
+    return summary
 
 
 @router.get("/status", response_model=ApiResponse)
@@ -0,0 +1,46 @@
+"""
+Jobs API - status, progress and cancellation for background jobs
+"""
+
+from fastapi import APIRouter, HTTPException
+from typing import Optional
+from app.models import ApiResponse
+from app.jobs import FINISHED, job_queue
+
+router = APIRouter()
+
+
+@router.get("", response_model=ApiResponse)
+async def list_jobs(kind: Optional[str] = None, status: Optional[str] = None, limit: int = 50):
+    """Most recent jobs first, optionally filtered by kind and status"""
+    try:
+        return ApiResponse(
+            data={
+                "jobs": await job_queue.list(limit=max(1, min(limit, 500)), kind=kind, status=status),
+                "queue": await job_queue.stats()
+            },
+            error=None,
+            success=True
+        )
+    except Exception as e:
+        return ApiResponse(data=None, error=f"Failed to list jobs: {str(e)}", success=False)
+
+
+@router.get("/{job_id}", response_model=ApiResponse)
+async def get_job(job_id: str):
+    """Status, progress (0-1), last progress message and, once finished, result or error"""
+    job = await job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return ApiResponse(data=job, error=None, success=True)
+
+
+@router.post("/{job_id}/cancel", response_model=ApiResponse)
+async def cancel_job(job_id: str):
+    """Cancel a queued or running job; finished jobs are returned unchanged"""
+    job = await job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job["status"] in FINISHED:
+        return ApiResponse(data=job, error=f"Job already {job['status']}", success=False)
+    return ApiResponse(data=await job_queue.cancel(job_id), error=None, success=True)
@@ -1,142 +1,205 @@
-from fastapi import APIRouter, HTTPException
-from app.models import KnowledgeGraphData, ApiResponse, GraphNode, GraphLink, SuggestedSkill
+from fastapi import APIRouter, HTTPException, Request, Response
+from app.models import ApiResponse
 from app.database import Neo4jConnection
+from app.repository import get_repository
+from app.cache import GraphVersion, graph_cache
+from app.skill_index import skill_index
+from app.graph_layout import graph_layout
+from app.etag import make_etag, etag_matches, cache_headers, not_modified
+from app.responses import api_body, api_msgpack_body, json_response, msgpack_response, wants_msgpack
 from typing import List
+import asyncio
+import os
+import numpy as np
 
 router = APIRouter()
 
 
-def get_graph_data(user_id: str) -> KnowledgeGraphData:
-    """Get knowledge graph data - matches Next.js implementation"""
+def _float(value) -> float:
+    # Neo4j Integer/Float values expose to_number(); None means "not learned"
+    if hasattr(value, 'to_number'):
+        value = value.to_number()
+    return float(value) if value is not None else 0.0
+
+
+def graph_rows(nodes_records: List[dict], links_records: List[dict]):
+    """Plain node and link dicts shaped like GraphNode / GraphLink.
+
+    Rows come from our own Cypher, so they are built directly instead of
+    validating a Pydantic model per record - for large graphs that
+    validation was most of the request's CPU time.
+    """
+    nodes = [
+        {
+            "id": str(record["id"]),
+            "name": str(record["name"]),
+            "category": str(record["category"]),
+            "confidence": _float(record["confidence"]),
+            "learned": bool(record["learned"]),
+            "x": None,
+            "y": None,
+            "fx": None,
+            "fy": None,
+        }
+        for record in nodes_records
+    ]
+    links = [
+        {"source": str(record["source"]), "target": str(record["target"]), "type": str(record["type"])}
+        for record in links_records
+    ]
+    return nodes, links
+
+
+def graph_columns(data: dict) -> dict:
+    """Columnar form of KnowledgeGraphData for the MessagePack representation.
+
+    Skill ids appear once in `ids`; links refer to them by index. Categories
+    and link types are small string tables indexed by uint8 (uint16 past 256
+    entries). Numeric columns are little-endian typed arrays packed as raw
+    bytes, so a browser can wrap them in Float32Array/Uint32Array without
+    parsing. Missing positions are NaN. The first `nodeCount` ids are the
+    nodes; any link endpoint without a node row is appended after them.
+    """
+    nodes, links = data["nodes"], data["links"]
+    ids = [node["id"] for node in nodes]
+    index = {node_id: i for i, node_id in enumerate(ids)}
+    for link in links:
+        for end in (link["source"], link["target"]):
+            if end not in index:
+                index[end] = len(ids)
+                ids.append(end)
+
+    categories: dict = {}
+    link_types: dict = {}
+    category = [categories.setdefault(node["category"], len(categories)) for node in nodes]
+    link_type = [link_types.setdefault(link["type"], len(link_types)) for link in links]
+    table_dtype = lambda table: "u1" if len(table) <= 256 else "<u2"
+    position = lambda key: np.array(
+        [np.nan if node[key] is None else node[key] for node in nodes], dtype="<f4").tobytes()
+
+    return {
+        "format": "columnar-v1",
+        "nodeCount": len(nodes),
+        "ids": ids,
+        "names": [node["name"] for node in nodes],
+        "categories": list(categories),
+        "category": np.array(category, dtype=table_dtype(categories)).tobytes(),
+        "confidence": np.array([node["confidence"] for node in nodes], dtype="<f4").tobytes(),
+        "learned": np.array([node["learned"] for node in nodes], dtype="u1").tobytes(),
+        "x": position("x"),
+        "y": position("y"),
+        "source": np.array([index[link["source"]] for link in links], dtype="<u4").tobytes(),
+        "target": np.array([index[link["target"]] for link in links], dtype="<u4").tobytes(),
+        "linkTypes": list(link_types),
+        "linkType": np.array(link_type, dtype=table_dtype(link_types)).tobytes(),
+        "suggestedNextSkills": data["suggestedNextSkills"],
+    }
+
+
+# Rough resident size of graph_rows output, so the cache can be bounded in bytes
+NODE_BYTES = 512
+LINK_BYTES = 256
+
+
+async def get_graph_data(user_id: str) -> dict:
+    """Get knowledge graph data, served from memory until the graph version or layout changes"""
+    # Read the versions before querying so a concurrent write can't be cached as current
+    version = (GraphVersion.current(), graph_layout.generation)
+    key = ("data", user_id)
+    cached = graph_cache.get(key, version)
+    if cached is not None:
+        return cached
+
+    data = await load_graph_data(user_id)
+    graph_cache.set(key, data, version, size=len(data["nodes"]) * NODE_BYTES + len(data["links"]) * LINK_BYTES)
+    return data
+
+
+async def get_graph_body(user_id: str, fmt: str = "json") -> bytes:
+    """The serialised ApiResponse for the graph, encoded once per graph version, layout and format"""
+    version = (GraphVersion.current(), graph_layout.generation)
+    key = ("body", user_id, fmt)
+    body = graph_cache.get(key, version)
+    if body is None:
+        data = await get_graph_data(user_id)
+        body = api_msgpack_body(graph_columns(data)) if fmt == "msgpack" else api_body(data)
+        graph_cache.set(key, body, version)
+    return body
+
+
+async def load_graph_data(user_id: str) -> dict:
+    """Get knowledge graph data (KnowledgeGraphData shape) - matches Next.js implementation"""
     if not Neo4jConnection.is_configured():
         raise HTTPException(status_code=500, detail="Neo4j not configured")
 
-    # Create new driver for each request (like Next.js does)
-    driver = Neo4jConnection.create_driver()
-    session = driver.session()
-    
+    repo = get_repository()
+
     try:
-        # Get nodes
-        nodes_query = """
-        MATCH (s:Skill)
-        OPTIONAL MATCH (u:User {id: $userId})-[l:LEARNED]->(s)
-        RETURN s.id as id, s.name as name, s.category as category,
-               COALESCE(l.confidence, 0) as confidence,
-               CASE WHEN l IS NOT NULL THEN true ELSE false END as learned
-        """
-        nodes_result = session.run(nodes_query, userId=user_id)
-        nodes_records = list(nodes_result)  # Consume results immediately
-
-        # Get links
-        links_query = """
-        MATCH (s1:Skill)-[r:PREREQUISITE_OF|RELATES_TO]->(s2:Skill)
-        RETURN s1.id as source, s2.id as target, type(r) as type
-        """
-        links_result = session.run(links_query)
-        links_records = list(links_result)  # Consume results immediately
-
-        # Get suggestions
-        suggestions_query = """
-        MATCH (u:User {id: $userId})-[:LEARNED]->(known:Skill)-[:PREREQUISITE_OF]->(next:Skill)
-        WHERE NOT (u)-[:LEARNED]->(next)
-        WITH next, collect(DISTINCT known.name) as learnedPrereqs
-        OPTIONAL MATCH (allPrereq:Skill)-[:PREREQUISITE_OF]->(next)
-        WITH next, learnedPrereqs, collect(DISTINCT allPrereq.name) as allPrereqs
-        WITH next, learnedPrereqs, allPrereqs,
-             CASE WHEN size(allPrereqs) > 0 
-                  THEN toFloat(size(learnedPrereqs)) / size(allPrereqs) * 100 
-                  ELSE 100.0 END as readiness
-        RETURN DISTINCT next.id as id, next.name as name, next.category as category,
-               learnedPrereqs as prerequisites, readiness
-        ORDER BY readiness DESC, size(learnedPrereqs) DESC
-        LIMIT 5
-        """
-        suggestions_result = session.run(suggestions_query, userId=user_id)
-        suggestions_records = list(suggestions_result)  # Consume results immediately
-
-        # Process nodes
-        nodes: List[GraphNode] = []
-        for record in nodes_records:
-            confidence = record["confidence"]
-            # Handle Neo4j Integer type conversion
-            if hasattr(confidence, 'to_number'):
-                confidence = confidence.to_number()
-            elif hasattr(confidence, '__int__'):
-                confidence = float(confidence)
-            else:
-                confidence = float(confidence) if confidence is not None else 0.0
-            
-            nodes.append(GraphNode(
-                id=str(record["id"]),
-                name=str(record["name"]),
-                category=str(record["category"]),
-                confidence=float(confidence),
-                learned=bool(record["learned"])
-            ))
-
-        # Process links
-        links: List[GraphLink] = []
-        for record in links_records:
-            links.append(GraphLink(
-                source=str(record["source"]),
-                target=str(record["target"]),
-                type=str(record["type"])
-            ))
+        # Nodes and links are fetched concurrently; suggestions come from the in-memory index
+        (nodes_records, links_records), _ = await asyncio.gather(
+            repo.fetch_graph(user_id),
+            skill_index.ensure_loaded(repo)
+        )
+        skill_index.sync_learned(user_id, (str(r["id"]) for r in nodes_records if r["learned"]))
+        suggestions_records = skill_index.suggestions(user_id, limit=5)
+
+        nodes, links = graph_rows(nodes_records, links_records)
+
+        # Server-side layout, cached per topology and computed in the background; until it
+        # finishes nodes carry the previous layout's positions, or none
+        if os.getenv("GRAPH_LAYOUT_ENABLED", "1") not in ("0", "false", "False"):
+            try:
+                positions = await graph_layout.positions(
+                    [node["id"] for node in nodes],
+                    [(link["source"], link["target"]) for link in links]
+                )
+                for node in nodes:
+                    node["x"], node["y"] = positions.get(node["id"], (None, None))
+            except Exception as e:
+                print(f"Graph layout skipped: {e}")
 
         # Process suggestions
-        suggested_skills: List[SuggestedSkill] = []
+        suggested_skills = []
         for record in suggestions_records:
-            readiness = record["readiness"]
-            # Handle Neo4j Integer/Float type conversion
-            if hasattr(readiness, 'to_number'):
-                readiness = readiness.to_number()
-            elif hasattr(readiness, '__float__'):
-                readiness = float(readiness)
-            else:
-                readiness = float(readiness) if readiness is not None else 0.0
-            
-            prerequisites = record["prerequisites"]
-            if prerequisites is None:
-                prerequisites = []
-            
-            suggested_skills.append(SuggestedSkill(
-                id=str(record["id"]),
-                name=str(record["name"]),
-                category=str(record["category"]),
-                prerequisites=[str(p) for p in prerequisites] if prerequisites else [],
-                readinessScore=int(round(readiness))
-            ))
-
-        return KnowledgeGraphData(
-            nodes=nodes,
-            links=links,
-            suggestedNextSkills=suggested_skills
-        )
+            prerequisites = record["prerequisites"] or []
+            suggested_skills.append({
+                "id": str(record["id"]),
+                "name": str(record["name"]),
+                "category": str(record["category"]),
+                "prerequisites": [str(p) for p in prerequisites],
+                "readinessScore": int(round(_float(record["readiness"])))
+            })
+
+        return {
+            "nodes": nodes,
+            "links": links,
+            "suggestedNextSkills": suggested_skills
+        }
     except Exception as e:
         # Re-raise to be handled by endpoint
         raise e
-    finally:
-        # Always close session and driver (like Next.js does)
-        try:
-            session.close()
-        except:
-            pass
-        try:
-            driver.close()
-        except:
-            pass
 
 
 @router.get("", response_model=ApiResponse)
-async def get_knowledge_graph():
-    """Get knowledge graph data directly from Neo4j"""
+async def get_knowledge_graph(request: Request, response: Response):
+    """Get knowledge graph data directly from Neo4j.
+
+    Sends the columnar MessagePack form (see graph_columns) when Accept
+    prefers application/msgpack, JSON otherwise.
+    """
+    fmt = "msgpack" if wants_msgpack(request.headers.get("accept")) else "json"
+    # Each representation gets its own ETag, and caches must key on Accept
+    etag = make_etag("knowledge-graph", "user-1", GraphVersion.tag(), graph_layout.generation, fmt)
+    headers = {**cache_headers(etag), "Vary": "Accept"}
+    if etag_matches(request, etag):
+        not_modified_response = not_modified(etag)
+        not_modified_response.headers["Vary"] = "Accept"
+        return not_modified_response
+
     try:
-        data = get_graph_data("user-1")
-        return ApiResponse(
-            data=data.model_dump(),
-            error=None,
-            success=True
-        )
+        # Pre-serialised body: FastAPI's response_model validation and encoding are skipped
+        body = await get_graph_body("user-1", fmt)
+        return msgpack_response(body, headers=headers) if fmt == "msgpack" else json_response(body, headers=headers)
     except Exception as e:
         # Return error response
             return ApiResponse(
@@ -148,4 +211,3 @@ async def get_knowledge_graph():
             error=f"Failed to fetch knowledge graph: {str(e)}",
                 success=False
             )
-
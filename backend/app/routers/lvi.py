@@ -1,84 +1,100 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query, Request, Response
 from app.models import LVIData, ApiResponse
 from app.database import FirebaseConnection
-from datetime import datetime, timedelta
+from app.cache import ActivityVersion
+from app.etag import make_etag, etag_matches, cache_headers, not_modified
+from app.lvi_rollups import ensure_rollup, week_bounds
+from app.lvi_engine import lvi_metrics, load_daily_activity, rolling_windows, utc_today, window_metrics
+from datetime import date, datetime, timedelta, timezone
+from typing import Optional
 
 router = APIRouter()
 
 
-def calc_lvi(concepts: int, rate: float, time: float, scale: int = 10) -> int:
-    if time <= 0:
-        return 0
-    return min(max(round((concepts * rate) / time * scale), 0), 100)
+MAX_RANGE_DAYS = 366
 
 
-def get_lvi_data(user_id: str) -> LVIData:
-    if not FirebaseConnection.is_configured():
-        raise HTTPException(status_code=500, detail="Firestore not configured")
-
-    db = FirebaseConnection.get_firestore()
-    now = datetime.now()
-    
-    # Calculate week start (Sunday)
-    week_start = now - timedelta(days=now.weekday() + 1)
-    week_start = week_start.replace(hour=0, minute=0, second=0, microsecond=0)
-    
-    # Calculate week end (Saturday)
-    week_end = week_start + timedelta(days=6)
-    week_end = week_end.replace(hour=23, minute=59, second=59, microsecond=999)
-    
-    # Firestore client automatically converts Python datetime to Firestore Timestamp
-    # Query sessions
-    sessions_ref = db.collection('sessions')
-    sessions_query = sessions_ref.where('userId', '==', user_id)\
-        .where('startTime', '>=', week_start)\
-        .where('startTime', '<=', week_end)
-    sessions = sessions_query.get()
-    
-    # Query skill applications
-    apps_ref = db.collection('skill_applications')
-    apps_query = apps_ref.where('userId', '==', user_id)\
-        .where('appliedAt', '>=', week_start)\
-        .where('appliedAt', '<=', week_end)
-    apps = apps_query.get()
-    
-    # Process sessions
-    concepts = set()
-    total_duration = 0
-    for doc in sessions:
-        data = doc.to_dict()
-        concepts_learned = data.get('conceptsLearned', [])
-        if concepts_learned:
-            concepts.update(concepts_learned)
-            total_duration += data.get('duration', 0)
-    
-    # Process applications
-    rate_sum = 0.0
-    for doc in apps:
-        data = doc.to_dict()
-        rate_sum += data.get('successRate', 0.0)
-    rate = rate_sum / len(apps) if apps else 0.0
-    
-    count = len(concepts)
-    avg_time = (total_duration / 60 / 24) / count if count > 0 else 1.0
-    
+def lvi_from_rollup(rollup: dict, week_start: datetime, week_end: datetime) -> LVIData:
     return LVIData(
-        score=calc_lvi(count, rate, avg_time),
-        conceptsMastered=count,
-        applicationRate=rate,
-        avgTimeToMastery=max(avg_time, 0.1),
-        scalingFactor=10,
+        **lvi_metrics(
+            len(rollup.get('concepts') or []),
+            rollup.get('durationSum', 0),
+            rollup.get('successRateSum', 0.0),
+            rollup.get('applicationCount', 0)
+        ),
         weekStart=week_start.strftime('%Y-%m-%d'),
         weekEnd=week_end.strftime('%Y-%m-%d')
     )
+
+
+async def get_lvi_data(user_id: str) -> LVIData:
+    if not FirebaseConnection.is_configured():
+        raise HTTPException(status_code=500, detail="Firestore not configured")
+
+    db = FirebaseConnection.get_async_firestore()
+    week_start, week_end = week_bounds(datetime.now(timezone.utc))
+    
+    # One document read; the week's sessions are only scanned if its rollup doesn't exist yet
+    rollup = await ensure_rollup(db, user_id, week_start, week_end)
+    return lvi_from_rollup(rollup, week_start, week_end)
         
 
+async def get_lvi_range(user_id: str, first: date, last: date, window: Optional[int] = None):
+    """One LVIData for [first, last], or with window=N one per day for the N days ending that day"""
+    if not FirebaseConnection.is_configured():
+        raise HTTPException(status_code=500, detail="Firestore not configured")
+
+    db = FirebaseConnection.get_async_firestore()
+    windows = rolling_windows(first, last, window) if window else [(first, last)]
+    # A single scan reaching back far enough for the earliest window
+    daily = await load_daily_activity(db, user_id, windows[0][0], last)
+    return [LVIData(**metrics) for metrics in window_metrics(daily, windows)]
+
+
+def resolve_range(from_: Optional[date], to: Optional[date], window: Optional[int]):
+    last = to or utc_today()
+    # Rolling queries default to the single window ending on `to`; plain ranges to its week
+    first = from_ or (last if window else last - timedelta(days=6))
+    if first > last:
+        raise HTTPException(status_code=400, detail="'from' must not be after 'to'")
+    if (last - first).days + (window or 1) > MAX_RANGE_DAYS:
+        raise HTTPException(status_code=400, detail=f"Range (including window) is limited to {MAX_RANGE_DAYS} days")
+    return first, last
+
+
 @router.get("", response_model=ApiResponse)
-async def get_lvi():
+async def get_lvi(
+    request: Request,
+    response: Response,
+    from_: Optional[date] = Query(None, alias="from"),
+    to: Optional[date] = None,
+    window: Optional[int] = Query(None, ge=1, le=MAX_RANGE_DAYS)
+):
+    """Current week by default; from/to for a custom range; window=N for rolling N-day scores"""
+    ranged = from_ is not None or to is not None or window is not None
+    if ranged:
+        first, last = resolve_range(from_, to, window)
+        etag = make_etag("lvi", "user-1", first, last, window, ActivityVersion.tag())
+    else:
+        week_start, _ = week_bounds(datetime.now(timezone.utc))
+        etag = make_etag("lvi", "user-1", week_start.date(), ActivityVersion.tag())
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
     try:
-        data = get_lvi_data("user-1")
+        if not ranged:
+            data = (await get_lvi_data("user-1")).model_dump()
+        else:
+            points = await get_lvi_range("user-1", first, last, window)
+            data = points[0].model_dump() if window is None else {
+                "from": first.isoformat(),
+                "to": last.isoformat(),
+                "window": window,
+                "points": [point.model_dump() for point in points]
+            }
+        response.headers.update(cache_headers(etag))
         return ApiResponse(
-            data=data.model_dump(),
+            data=data,
             error=None,
             success=True
         )
@@ -90,4 +106,3 @@ async def get_lvi():
             error=str(e),
             success=False
         )
-
@@ -1,6 +1,9 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request, Response
 from app.models import LVITrendData, LVISnapshot, ApiResponse
 from app.database import FirebaseConnection
+from app.cache import ActivityVersion
+from app.etag import make_etag, etag_matches, cache_headers, not_modified
+from app.metrics import firestore_read
 from typing import List, Literal
 from datetime import datetime
 
@@ -27,17 +30,17 @@ def determine_trend(snapshots: List[dict]) -> dict:
     return {"trend": trend, "percentChange": change}
 
 
-def get_snapshots(user_id: str) -> List[LVISnapshot]:
+async def get_snapshots(user_id: str) -> List[LVISnapshot]:
     if not FirebaseConnection.is_configured():
         raise HTTPException(status_code=500, detail="Firestore not configured")
 
-    db = FirebaseConnection.get_firestore()
+    db = FirebaseConnection.get_async_firestore()
 
     snapshots_ref = db.collection('lvi_snapshots')
     snapshots_query = snapshots_ref.where('userId', '==', user_id)\
         .order_by('createdAt', direction='DESCENDING')\
         .limit(12)
-    snapshots = snapshots_query.get()
+    snapshots = await firestore_read('lvi_snapshots', snapshots_query.get())
 
     result = []
     for doc in snapshots:
@@ -65,9 +68,13 @@ def get_snapshots(user_id: str) -> List[LVISnapshot]:
 
 
 @router.get("", response_model=ApiResponse)
-async def get_lvi_trend():
+async def get_lvi_trend(request: Request, response: Response):
+    etag = make_etag("lvi-trend", "user-1", ActivityVersion.tag())
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
     try:
-        snapshots = get_snapshots("user-1")
+        snapshots = await get_snapshots("user-1")
         trend_data = determine_trend([s.model_dump() for s in snapshots])
 
         data = LVITrendData(
@@ -76,6 +83,7 @@ async def get_lvi_trend():
             percentChange=trend_data["percentChange"]
         )
 
+        response.headers.update(cache_headers(etag))
         return ApiResponse(
             data=data.model_dump(),
             error=None,
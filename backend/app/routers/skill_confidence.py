@@ -1,29 +1,21 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request, Response
 from app.models import RadarDataPoint, ApiResponse
 from app.database import Neo4jConnection
+from app.repository import get_repository
+from app.cache import GraphVersion
+from app.etag import make_etag, etag_matches, cache_headers, not_modified
 from typing import List
 
 router = APIRouter()
 
 
-def get_top_skills(user_id: str) -> List[RadarDataPoint]:
+async def get_top_skills(user_id: str) -> List[RadarDataPoint]:
     """Get top skills by confidence - matches Next.js implementation"""
     if not Neo4jConnection.is_configured():
         raise HTTPException(status_code=500, detail="Neo4j not configured")
 
-    # Create new driver for each request (like Next.js does)
-    driver = Neo4jConnection.create_driver()
-    session = driver.session()
-    
     try:
-        query = """
-        MATCH (u:User {id: $userId})-[l:LEARNED]->(s:Skill)
-        RETURN s.name as skill, l.confidence as confidence
-        ORDER BY l.confidence DESC
-        LIMIT 6
-        """
-        result = session.run(query, userId=user_id)
-        records = list(result)  # Consume results immediately
+        records = await get_repository().top_skills(user_id)
 
         skills = []
         for record in records:
@@ -46,23 +38,19 @@ def get_top_skills(user_id: str) -> List[RadarDataPoint]:
     except Exception as e:
         # Re-raise to be handled by endpoint
         raise e
-    finally:
-        # Always close session and driver (like Next.js does)
-        try:
-            session.close()
-        except:
-            pass
-        try:
-            driver.close()
-        except:
-            pass
 
 
 @router.get("", response_model=ApiResponse)
-async def get_skill_confidence():
+async def get_skill_confidence(request: Request, response: Response):
     """Get skill confidence data directly from Neo4j"""
+    # LEARNED confidence changes bump the graph version, so it covers this payload too
+    etag = make_etag("skill-confidence", "user-1", GraphVersion.tag())
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
     try:
-        data = get_top_skills("user-1")
+        data = await get_top_skills("user-1")
+        response.headers.update(cache_headers(etag))
         return ApiResponse(
             data=[s.model_dump() for s in data],
             error=None,
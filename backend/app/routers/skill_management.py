@@ -4,11 +4,19 @@ from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from app.models import ApiResponse, SkillCategory
 from app.database import Neo4jConnection
-from app.graph_rag import GraphRAG
+from app.repository import get_repository
+from app.cache import GraphVersion
+from app.skill_index import skill_index
+from app.skill_embeddings import skill_embeddings
+from app.graph_rag import AsyncGraphRAG
 from typing import Optional
+import os
 
 router = APIRouter()
 
+# Candidate skills sent to the LLM when linking a new skill into the graph
+SHORTLIST_SIZE = int(os.getenv("SKILL_SHORTLIST_SIZE", "40"))
+
 
 class AddSkillRequest(BaseModel):
     skill_name: str
@@ -25,19 +33,33 @@ class UpdateSkillStatusRequest(BaseModel):
     user_id: str = "user-1"
 
 
-def enrich_skill(skill_name):
-    # Use AI to get skill metadata
+def fallback_enrichment(skill_name):
+    return {
+        'category': 'backend',
+        'description': f'User-added skill: {skill_name}',
+        'difficulty_level': 2,
+        'learning_time_hours': 20
+    }
+
+
+async def analyze_skill(skill_name, existing_names):
+    # Use AI to get skill metadata, related skills and prerequisites in a single completion
     try:
-        rag = GraphRAG()
-        return rag.enrich_single_skill(skill_name)
+        rag = AsyncGraphRAG()
     except Exception as e:
         print(f"Error in GraphRAG enrichment: {e}")
-        return {
-            'category': 'backend',
-            'description': f'User-added skill: {skill_name}',
-            'difficulty_level': 2,
-            'learning_time_hours': 20
-        }
+        return fallback_enrichment(skill_name), [], []
+    analysis = await rag.analyze_skill(skill_name, existing_names)
+    if analysis is not None:
+        related = analysis.pop('related')
+        prereqs = analysis.pop('prerequisites')
+        enriched = analysis
+    else:
+        # Fused response unusable - fall back to the three concurrent calls
+        enriched, related, prereqs = await rag.analyze_new_skill(skill_name, existing_names)
+    print(f"AI found related skills for '{skill_name}': {related}")
+    print(f"AI found prerequisites for '{skill_name}': {prereqs}")
+    return enriched, related, prereqs
 
 
 @router.post("/add-skill", response_model=ApiResponse)
@@ -46,139 +68,76 @@ async def add_skill(request: AddSkillRequest):
         if not Neo4jConnection.is_configured():
             raise HTTPException(status_code=500, detail="Neo4j not configured")
         
-        driver = Neo4jConnection.create_driver()
-        session = driver.session()
+        repo = get_repository()
+        
+        # Generate skill ID
+        skill_id = request.skill_name.lower().replace(' ', '-').replace('.', '')
+        
+        # Check if exists
+        if await repo.skill_exists(skill_id):
+            return ApiResponse(
+                data=None,
+                error=f"Skill '{request.skill_name}' already exists",
+                success=False
+            )
+        
+        # Shortlist the existing skills most similar to the new one for AI analysis
+        await skill_embeddings.ensure_loaded(repo)
+        existing_names = skill_embeddings.shortlist(request.skill_name, SHORTLIST_SIZE, exclude={skill_id})
+        
+        # Get AI-enriched skill data and relationships
+        enriched, related, prereqs = await analyze_skill(request.skill_name, existing_names)
+        desc = enriched['description']
+        difficulty = enriched['difficulty_level']
+        learning_time = enriched['learning_time_hours']
+        
+        # Category is optional (for visualization only)
+        category = request.category or enriched.get('category', 'backend')
         
         try:
-            # Get AI-enriched skill data
-            enriched = enrich_skill(request.skill_name)
-            desc = enriched['description']
-            difficulty = enriched['difficulty_level']
-            learning_time = enriched['learning_time_hours']
-            
-            # Category is optional (for visualization only)
-            category = request.category or enriched.get('category', 'backend')
-            
-            # Generate skill ID
-            skill_id = request.skill_name.lower().replace(' ', '-').replace('.', '')
-            
-            # Check if exists
-            check = session.run("""
-                MATCH (s:Skill {id: $skillId})
-                RETURN s.id as id
-            """, skillId=skill_id)
-            
-            if check.single():
-                return ApiResponse(
-                    data=None,
-                    error=f"Skill '{request.skill_name}' already exists",
-                    success=False
-                )
-            
             # Create skill node
-            session.run("""
-                CREATE (s:Skill {
-                    id: $id,
-                    name: $name,
-                    category: $category,
-                    description: $description,
-                    difficulty_level: $difficulty,
-                    learning_time_hours: $learningTime
-                })
-            """, 
-            id=skill_id,
-            name=request.skill_name,
-            category=category,
-            description=desc,
-            difficulty=difficulty,
-            learningTime=learning_time)
-            
-            # Get existing skills for AI analysis
-            existing = session.run("""
-                MATCH (s:Skill)
-                WHERE s.id <> $skillId
-                RETURN s.name as name
-            """, skillId=skill_id)
-            existing_names = [r['name'] for r in existing]
-            
-            # Use AI to find related skills
-            try:
-                rag = GraphRAG()
-                related = rag.find_related_skills(request.skill_name, existing_names)
-                print(f"AI found related skills for '{request.skill_name}': {related}")
-            except Exception as e:
-                print(f"ERROR: GraphRAG failed to find related skills: {e}")
-                related = []
+            await repo.create_skill(skill_id, request.skill_name, category, desc, difficulty, learning_time)
+            skill_index.add_skill(skill_id, request.skill_name, category)
+            skill_embeddings.add(skill_id, request.skill_name, desc)
             
             # Create RELATES_TO relationships
             relates_count = 0
-            if related:
-                for rel_name in related:
-                    rel_id = rel_name.lower().replace(' ', '-').replace('.', '')
-                    result = session.run("""
-                        MATCH (new:Skill {id: $skillId})
-                        MATCH (related:Skill)
-                        WHERE related.id = $relatedId OR related.name = $relatedName
-                        CREATE (new)-[:RELATES_TO]->(related)
-                        RETURN count(*) as count
-                    """, skillId=skill_id, relatedId=rel_id, relatedName=rel_name)
-                    rec = result.single()
-                    if rec and rec['count'] > 0:
-                        relates_count += rec['count']
-            
-            # Find prerequisites using AI
-            try:
-                prereqs = rag.find_prerequisites(request.skill_name, existing_names)
-                print(f"AI found prerequisites for '{request.skill_name}': {prereqs}")
-            except Exception as e:
-                print(f"ERROR: GraphRAG failed to find prerequisites: {e}")
-                prereqs = []
+            for rel_name in related:
+                rel_id = rel_name.lower().replace(' ', '-').replace('.', '')
+                for linked_id in await repo.link_related(skill_id, rel_id, rel_name):
+                    skill_index.add_edge(skill_id, linked_id, "RELATES_TO")
+                    relates_count += 1
             
             # Create PREREQUISITE_OF relationships
             prereq_count = 0
-            if prereqs:
-                for prereq_name in prereqs:
-                    prereq_id = prereq_name.lower().replace(' ', '-').replace('.', '')
-                    result = session.run("""
-                        MATCH (prereq:Skill)
-                        WHERE prereq.id = $prereqId OR prereq.name = $prereqName
-                        MATCH (new:Skill {id: $skillId})
-                        CREATE (prereq)-[:PREREQUISITE_OF]->(new)
-                        RETURN count(*) as count
-                    """, prereqId=prereq_id, prereqName=prereq_name, skillId=skill_id)
-                    rec = result.single()
-                    if rec and rec['count'] > 0:
-                        prereq_count += rec['count']
+            for prereq_name in prereqs:
+                prereq_id = prereq_name.lower().replace(' ', '-').replace('.', '')
+                for linked_id in await repo.link_prerequisite(skill_id, prereq_id, prereq_name):
+                    skill_index.add_edge(linked_id, skill_id, "PREREQUISITE_OF")
+                    prereq_count += 1
             
             # Mark as learned if requested
             if request.learned:
-                session.run("""
-                    MATCH (u:User {id: $userId})
-                    MATCH (s:Skill {id: $skillId})
-                    CREATE (u)-[:LEARNED {confidence: $confidence}]->(s)
-                """, 
-                userId=request.user_id,
-                skillId=skill_id,
-                confidence=request.confidence or 50)
-            
-            return ApiResponse(
-                data={
-                    "skill_id": skill_id,
-                    "skill_name": request.skill_name,
-                    "learned": request.learned,
-                    "relationships_created": {
-                        "relates_to": relates_count,
-                        "prerequisites": prereq_count
-                    },
-                    "message": f"Skill added with {relates_count + prereq_count} relationships"
-                },
-                error=None,
-                success=True
-            )
-            
+                await repo.add_learned(request.user_id, skill_id, request.confidence or 50)
+                skill_index.set_learned(request.user_id, skill_id)
         finally:
-            session.close()
-            driver.close()
+            # Invalidate cached graphs even if a later write failed part-way
+            GraphVersion.bump()
+        
+        return ApiResponse(
+            data={
+                "skill_id": skill_id,
+                "skill_name": request.skill_name,
+                "learned": request.learned,
+                "relationships_created": {
+                    "relates_to": relates_count,
+                    "prerequisites": prereq_count
+                },
+                "message": f"Skill added with {relates_count + prereq_count} relationships"
+            },
+            error=None,
+            success=True
+        )
             
     except Exception as e:
         return ApiResponse(
@@ -194,43 +153,27 @@ async def update_skill_status(request: UpdateSkillStatusRequest):
         if not Neo4jConnection.is_configured():
             raise HTTPException(status_code=500, detail="Neo4j not configured")
         
-        driver = Neo4jConnection.create_driver()
-        session = driver.session()
+        repo = get_repository()
         
-        try:
-            if request.learned:
-                session.run("""
-                    MATCH (u:User {id: $userId})
-                    MATCH (s:Skill {id: $skillId})
-                    MERGE (u)-[l:LEARNED]->(s)
-                    SET l.confidence = $confidence
-                """, 
-                userId=request.user_id,
-                skillId=request.skill_id,
-                confidence=request.confidence or 50)
-                msg = "Skill marked as learned"
-            else:
-                session.run("""
-                    MATCH (u:User {id: $userId})-[l:LEARNED]->(s:Skill {id: $skillId})
-                    DELETE l
-                """, 
-                userId=request.user_id,
-                skillId=request.skill_id)
-                msg = "Skill marked as not learned"
-            
-            return ApiResponse(
-                data={
-                    "skill_id": request.skill_id,
-                    "learned": request.learned,
-                    "message": msg
-                },
-                error=None,
-                success=True
-            )
-            
-        finally:
-            session.close()
-            driver.close()
+        if request.learned:
+            await repo.set_learned(request.user_id, request.skill_id, request.confidence or 50)
+            skill_index.set_learned(request.user_id, request.skill_id)
+            msg = "Skill marked as learned"
+        else:
+            await repo.remove_learned(request.user_id, request.skill_id)
+            skill_index.set_learned(request.user_id, request.skill_id, learned=False)
+            msg = "Skill marked as not learned"
+        GraphVersion.bump()
+        
+        return ApiResponse(
+            data={
+                "skill_id": request.skill_id,
+                "learned": request.learned,
+                "message": msg
+            },
+            error=None,
+            success=True
+        )
             
     except Exception as e:
         return ApiResponse(
@@ -246,37 +189,26 @@ async def delete_skill(skill_id: str):
         if not Neo4jConnection.is_configured():
             raise HTTPException(status_code=500, detail="Neo4j not configured")
         
-        driver = Neo4jConnection.create_driver()
-        session = driver.session()
+        deleted = await get_repository().delete_skill(skill_id)
         
-        try:
-            result = session.run("""
-                MATCH (s:Skill {id: $skillId})
-                DETACH DELETE s
-                RETURN count(s) as deleted
-            """, skillId=skill_id)
-            
-            deleted = result.single()["deleted"]
-            
-            if deleted == 0:
-                return ApiResponse(
-                    data=None,
-                    error=f"Skill '{skill_id}' not found",
-                    success=False
-                )
-            
+        if deleted == 0:
             return ApiResponse(
-                data={
-                    "skill_id": skill_id,
-                    "message": "Skill deleted successfully"
-                },
-                error=None,
-                success=True
+                data=None,
+                error=f"Skill '{skill_id}' not found",
+                success=False
             )
-            
-        finally:
-            session.close()
-            driver.close()
+        skill_index.remove_skill(skill_id)
+        skill_embeddings.remove(skill_id)
+        GraphVersion.bump()
+        
+        return ApiResponse(
+            data={
+                "skill_id": skill_id,
+                "message": "Skill deleted successfully"
+            },
+            error=None,
+            success=True
+        )
             
     except Exception as e:
         return ApiResponse(
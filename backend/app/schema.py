@@ -0,0 +1,141 @@
+# Neo4j schema bootstrap - idempotent constraints/indexes plus a query-plan check
+#
+#   python -m app.schema          apply constraints and indexes
+#   python -m app.schema --check  apply, then EXPLAIN the hot lookups and fail on label scans
+
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional
+from dotenv import load_dotenv
+from app.database import Neo4jConnection
+
+
+# Every statement is IF NOT EXISTS, so re-running is a no-op
+SCHEMA = [
+    ("skill_id_unique", "CREATE CONSTRAINT skill_id_unique IF NOT EXISTS FOR (s:Skill) REQUIRE s.id IS UNIQUE"),
+    ("user_id_unique", "CREATE CONSTRAINT user_id_unique IF NOT EXISTS FOR (u:User) REQUIRE u.id IS UNIQUE"),
+    ("skill_name", "CREATE INDEX skill_name IF NOT EXISTS FOR (s:Skill) ON (s.name)"),
+]
+
+# Lookups on the request path; each must be planned as index seeks only
+HOT_QUERIES = {
+    "skill_by_id": ("""
+        MATCH (s:Skill {id: $skillId})
+        RETURN s.id as id
+    """, {"skillId": "x"}),
+    "skill_by_id_or_name": ("""
+        CALL {
+            MATCH (s:Skill {id: $skillId}) RETURN s
+            UNION
+            MATCH (s:Skill {name: $skillName}) RETURN s
+        }
+        RETURN s.id as id
+    """, {"skillId": "x", "skillName": "x"}),
+    "user_learned": ("""
+        MATCH (u:User {id: $userId})-[l:LEARNED]->(s:Skill)
+        RETURN s.id as id, l.confidence as confidence
+    """, {"userId": "x"}),
+    "learned_edge": ("""
+        MATCH (u:User {id: $userId})
+        MATCH (s:Skill {id: $skillId})
+        RETURN u.id, s.id
+    """, {"userId": "x", "skillId": "x"}),
+}
+
+SCAN_OPERATORS = ("NodeByLabelScan", "AllNodesScan")
+
+
+async def apply_schema(session_factory=None) -> Dict[str, str]:
+    """Create missing constraints and indexes; returns {name: "ok" | error message}.
+
+    Each statement runs in its own auto-commit transaction (schema writes can't
+    share one with data). A failure, e.g. duplicate Skill ids blocking the
+    uniqueness constraint, is reported and the remaining statements still run.
+    """
+    session_factory = session_factory or Neo4jConnection.session
+
+    results = {}
+    for name, statement in SCHEMA:
+        try:
+            async with session_factory() as session:
+                result = await session.run(statement)
+                await result.consume()
+            results[name] = "ok"
+        except Exception as e:
+            results[name] = str(e)
+    return results
+
+
+def apply_schema_sync(driver) -> Dict[str, str]:
+    # Same as apply_schema for scripts on the sync driver
+    results = {}
+    for name, statement in SCHEMA:
+        try:
+            with driver.session() as session:
+                session.run(statement).consume()
+            results[name] = "ok"
+        except Exception as e:
+            results[name] = str(e)
+    return results
+
+
+def plan_operators(plan) -> List[str]:
+    """Operator names in an EXPLAIN plan, depth first, without the @runtime suffix"""
+    if not plan:
+        return []
+    operators = [str(plan.get("operatorType", "")).split("@")[0]]
+    for child in plan.get("children", []) or []:
+        operators.extend(plan_operators(child))
+    return operators
+
+
+async def check_query_plans(session_factory=None) -> Dict[str, dict]:
+    """EXPLAIN every hot query; ok means an index seek and no label or all-nodes scan"""
+    session_factory = session_factory or Neo4jConnection.session
+
+    report = {}
+    async with session_factory() as session:
+        for name, (query, params) in HOT_QUERIES.items():
+            result = await session.run("EXPLAIN " + query, **params)
+            summary = await result.consume()
+            operators = plan_operators(summary.plan)
+            report[name] = {
+                "ok": any("IndexSeek" in op for op in operators)
+                      and not any(op in SCAN_OPERATORS for op in operators),
+                "operators": operators,
+            }
+    return report
+
+
+async def _main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Apply the Neo4j schema and optionally verify query plans")
+    parser.add_argument("--check", action="store_true", help="fail unless hot queries use index seeks")
+    args = parser.parse_args(argv)
+
+    project_root = Path(__file__).parent.parent.parent
+    load_dotenv(project_root / '.env.local')
+    load_dotenv(project_root / '.env')
+    if not Neo4jConnection.is_configured():
+        print("Neo4j not configured - set NEO4J_URI, NEO4J_USER, NEO4J_PASSWORD")
+        return 1
+
+    failed = False
+    try:
+        for name, status in (await apply_schema()).items():
+            print(f"  {'✅' if status == 'ok' else '❌'} {name}{'' if status == 'ok' else ': ' + status}")
+            failed |= status != "ok"
+
+        if args.check:
+            print()
+            for name, result in (await check_query_plans()).items():
+                print(f"  {'✅' if result['ok'] else '❌'} {name}: {' > '.join(result['operators'])}")
+                failed |= not result["ok"]
+    finally:
+        await Neo4jConnection.close()
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(_main()))
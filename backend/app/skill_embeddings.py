@@ -0,0 +1,225 @@
+# Local skill embeddings - hashed character n-gram TF-IDF vectors on NumPy
+
+import asyncio
+import math
+import os
+import re
+import time
+import zlib
+from typing import Dict, Iterable, List, Optional, Tuple
+import numpy as np
+
+
+_WORD = re.compile(r"[a-z0-9+#]+")
+# Once this share of the slots belongs to removed skills, the live entries are packed together
+COMPACT_FRACTION = 0.25
+# Entries scored per pass, bounding the temporaries of a query on a large index
+SCORE_BLOCK = 1 << 20
+
+
+def hashed_features(name: str, description: str = "", dim: int = 1024, ngram_range=(2, 4)) -> Dict[int, float]:
+    """Term counts in dim hash buckets: name character n-grams plus name/description words"""
+    features: Dict[int, float] = {}
+
+    def add(token, weight=1.0):
+        bucket = zlib.crc32(token.encode()) % dim
+        features[bucket] = features.get(bucket, 0.0) + weight
+
+    padded = f" {name.lower()} "
+    for n in range(ngram_range[0], ngram_range[1] + 1):
+        for i in range(len(padded) - n + 1):
+            add("c:" + padded[i:i + n])
+    for word in _WORD.findall(name.lower()):
+        add("w:" + word, 2.0)
+    for word in _WORD.findall((description or "").lower()):
+        add("w:" + word)
+    return features
+
+
+class SkillEmbeddingIndex:
+    """Cosine top-k over TF-IDF vectors of every skill's name and description.
+
+    Each skill's non-zero bucket counts are appended to flat (slot, bucket,
+    count) arrays, so an add or remove touches only that skill's entries.
+    IDF is applied at query time: the query is weighted by idf^2 and each
+    row's TF-IDF norm is summed over its own entries, which gives the same
+    scores as normalising an IDF-weighted matrix without ever holding one.
+    Removed skills' entries are zeroed and their slot is left empty until
+    COMPACT_FRACTION of the slots are empty, then the live entries are
+    packed so scans stay proportional to live skills. Edits made while a
+    reload is waiting on Neo4j are journaled and replayed on the snapshot.
+    """
+
+    def __init__(self, dim=1024, ttl_seconds=600.0):
+        self.dim = dim
+        self.ttl_seconds = ttl_seconds
+        self._lock = None
+        self._loaded_at: Optional[float] = None
+        self._journal: Optional[List[Tuple[str, tuple]]] = None
+        self._clear()
+
+    def _clear(self):
+        self._entry_slots = np.zeros(0, dtype=np.int32)
+        self._buckets = np.zeros(0, dtype=np.uint16 if self.dim <= 1 << 16 else np.int32)
+        self._counts = np.zeros(0, dtype=np.float32)
+        self._nnz = 0
+        # _starts[slot]: offset of the slot's first entry; entries of a slot are contiguous
+        self._starts: List[int] = []
+        self._names: List[Optional[str]] = []
+        self._slots: Dict[str, int] = {}
+        self._df = np.zeros(self.dim, dtype=np.float32)
+
+    @property
+    def loaded(self):
+        return self._loaded_at is not None and time.monotonic() - self._loaded_at < self.ttl_seconds
+
+    def __len__(self):
+        return len(self._slots)
+
+    def load(self, skills: Iterable[dict]):
+        self._clear()
+        for skill in skills:
+            self.add(skill["id"], skill["name"], skill.get("description") or "")
+        self._loaded_at = time.monotonic()
+
+    async def ensure_loaded(self, repo):
+        if self.loaded:
+            return
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            if self.loaded:
+                return
+            self._journal = []
+            try:
+                skills = await repo.all_skills()
+            finally:
+                edits, self._journal = self._journal, None
+            self.load(skills)
+            # Edits are idempotent, so replaying one the snapshot already reflects is harmless
+            for method, args in edits:
+                getattr(self, method)(*args)
+
+    def _record(self, method, *args):
+        if self._journal is not None:
+            self._journal.append((method, args))
+
+    def invalidate(self):
+        self._loaded_at = None
+
+    def _vector(self, name, description=""):
+        row = np.zeros(self.dim, dtype=np.float32)
+        for bucket, count in hashed_features(name, description, self.dim).items():
+            row[bucket] = count
+        return row
+
+    def _reserve(self, extra):
+        if self._nnz + extra <= len(self._counts):
+            return
+        capacity = max(1024, len(self._counts) + len(self._counts) // 2, self._nnz + extra)
+        for attr in ("_entry_slots", "_buckets", "_counts"):
+            old = getattr(self, attr)
+            grown = np.zeros(capacity, dtype=old.dtype)
+            grown[:self._nnz] = old[:self._nnz]
+            setattr(self, attr, grown)
+
+    def add(self, skill_id, name, description=""):
+        self._record("add", skill_id, name, description)
+        self._discard(skill_id)
+        features = hashed_features(name, description, self.dim)
+        start, end = self._nnz, self._nnz + len(features)
+        self._reserve(len(features))
+        slot = len(self._starts)
+        self._entry_slots[start:end] = slot
+        self._buckets[start:end] = list(features)
+        self._counts[start:end] = list(features.values())
+        self._df[self._buckets[start:end]] += 1
+        self._nnz = end
+        self._starts.append(start)
+        self._names.append(name)
+        self._slots[skill_id] = slot
+
+    def remove(self, skill_id):
+        self._record("remove", skill_id)
+        self._discard(skill_id)
+
+    def _discard(self, skill_id):
+        slot = self._slots.pop(skill_id, None)
+        if slot is None:
+            return
+        start = self._starts[slot]
+        end = self._starts[slot + 1] if slot + 1 < len(self._starts) else self._nnz
+        self._df[self._buckets[start:end]] -= 1
+        self._counts[start:end] = 0
+        self._names[slot] = None
+        if len(self._starts) - len(self._slots) > max(16, COMPACT_FRACTION * len(self._starts)):
+            self._compact()
+
+    def _compact(self):
+        n = self._nnz
+        live = np.zeros(len(self._starts), dtype=bool)
+        live[list(self._slots.values())] = True
+        keep = live[self._entry_slots[:n]]
+        renumber = np.cumsum(live, dtype=np.int32) - 1
+        lengths = np.diff(np.append(np.array(self._starts, dtype=np.int64), n))[live]
+
+        self._entry_slots = renumber[self._entry_slots[:n][keep]]
+        self._buckets = self._buckets[:n][keep]
+        self._counts = self._counts[:n][keep]
+        self._nnz = len(self._counts)
+        self._starts = (np.cumsum(lengths) - lengths).tolist()
+        self._names = [name for name, alive in zip(self._names, live.tolist()) if alive]
+        self._slots = {skill_id: int(renumber[slot]) for skill_id, slot in self._slots.items()}
+
+    def _idf(self):
+        n = len(self._slots)
+        return np.log((1.0 + n) / (1.0 + self._df)) + 1.0
+
+    def _scores(self, query, idf):
+        """Cosine between the idf-weighted query (unit length) and every slot's TF-IDF row"""
+        size = len(self._starts)
+        weight, idf2 = (query * idf).astype(np.float32), (idf * idf).astype(np.float32)
+        dots, norms = np.zeros(size), np.zeros(size)
+        for start in range(0, self._nnz, SCORE_BLOCK):
+            end = min(start + SCORE_BLOCK, self._nnz)
+            slots, buckets, counts = self._entry_slots[start:end], self._buckets[start:end], self._counts[start:end]
+            dots += np.bincount(slots, weights=counts * weight[buckets], minlength=size)
+            norms += np.bincount(slots, weights=counts * counts * idf2[buckets], minlength=size)
+        norms = np.sqrt(norms)
+        norms[norms == 0] = 1.0
+        return dots / norms
+
+    def top_k(self, name, k=20, description="", exclude=()) -> List[str]:
+        """Names of the k skills most similar to the given name/description"""
+        if not self._slots:
+            return []
+        idf = self._idf()
+        query = self._vector(name, description) * idf
+        norm = np.linalg.norm(query)
+        if norm == 0:
+            return []
+        scores = self._scores(query / norm, idf)
+        for skill_id in exclude:
+            slot = self._slots.get(skill_id)
+            if slot is not None:
+                scores[slot] = -math.inf
+        for slot, skill_name in enumerate(self._names):
+            if skill_name is None:
+                scores[slot] = -math.inf
+
+        k = min(k, len(self._slots))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [self._names[i] for i in top if scores[i] > -math.inf]
+
+    def shortlist(self, name, k, exclude=()) -> List[str]:
+        # Small graphs go to the LLM whole; large ones are cut to the k nearest skills
+        if len(self._slots) <= k:
+            return [self._names[slot] for skill_id, slot in self._slots.items() if skill_id not in exclude]
+        return self.top_k(name, k, exclude=exclude)
+
+
+skill_embeddings = SkillEmbeddingIndex(
+    dim=int(os.getenv("SKILL_EMBEDDING_DIM", "1024")),
+    ttl_seconds=float(os.getenv("SKILL_INDEX_TTL", "600"))
+)
@@ -0,0 +1,240 @@
+# In-process skill graph index - integer ids, CSR adjacency, per-user learned bitsets
+
+import asyncio
+import os
+import time
+from array import array
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+
+def _csr(num_nodes: int, edges: Iterable[Tuple[int, int]]):
+    """Compressed sparse rows: neighbours of node i are idx[ptr[i]:ptr[i + 1]]"""
+    counts = [0] * (num_nodes + 1)
+    edges = sorted(edges)
+    for src, _ in edges:
+        counts[src + 1] += 1
+    for i in range(num_nodes):
+        counts[i + 1] += counts[i]
+    return array('i', counts), array('i', (dst for _, dst in edges))
+
+
+def _bits(bitset: int):
+    while bitset:
+        low = bitset & -bitset
+        yield low.bit_length() - 1
+        bitset ^= low
+
+
+class SkillGraphIndex:
+    """Skill/PREREQUISITE_OF/RELATES_TO topology held in memory.
+
+    Skills get dense integer slots; removed skills leave a tombstone so slots
+    and user bitsets never need renumbering. Writes edit the edge sets and mark
+    the CSR arrays dirty; they are recompacted from memory on the next read.
+    Edits made while a reload is waiting on Neo4j are journaled and replayed
+    on top of the fresh snapshot, so the swap cannot drop them.
+    """
+
+    def __init__(self, ttl_seconds=600.0):
+        self.ttl_seconds = ttl_seconds
+        self._lock = None
+        self._loaded_at: Optional[float] = None
+        self._journal: Optional[List[Tuple[str, tuple]]] = None
+        self._clear()
+
+    def _clear(self):
+        self._ids: List[Optional[str]] = []
+        self._slots: Dict[str, int] = {}
+        self._names: List[str] = []
+        self._categories: List[str] = []
+        self._prereq_edges: Set[Tuple[int, int]] = set()
+        self._relates_edges: Set[Tuple[int, int]] = set()
+        self._learned: Dict[str, int] = {}
+        self._dirty = True
+
+    @property
+    def loaded(self):
+        return self._loaded_at is not None and time.monotonic() - self._loaded_at < self.ttl_seconds
+
+    def __len__(self):
+        return len(self._slots)
+
+    # Loading
+
+    def load(self, skills: Iterable[dict], links: Iterable[dict]):
+        self._clear()
+        for skill in skills:
+            self.add_skill(skill["id"], skill["name"], skill["category"])
+        for link in links:
+            self.add_edge(link["source"], link["target"], link["type"])
+        self._loaded_at = time.monotonic()
+
+    async def ensure_loaded(self, repo):
+        if self.loaded:
+            return
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            if self.loaded:
+                return
+            self._journal = []
+            try:
+                skills, links = await asyncio.gather(repo.skill_topology(), repo.graph_links())
+            finally:
+                edits, self._journal = self._journal, None
+            self.load(skills, links)
+            # Edits are idempotent, so replaying one the snapshot already reflects is harmless
+            for method, args in edits:
+                getattr(self, method)(*args)
+
+    def _record(self, method, *args):
+        if self._journal is not None:
+            self._journal.append((method, args))
+
+    def invalidate(self):
+        # Force a full reload on next use (bulk regeneration, external seeding)
+        self._loaded_at = None
+
+    # Incremental updates
+
+    def add_skill(self, skill_id, name, category):
+        self._record("add_skill", skill_id, name, category)
+        slot = self._slots.get(skill_id)
+        if slot is None:
+            slot = len(self._ids)
+            self._slots[skill_id] = slot
+            self._ids.append(skill_id)
+            self._names.append(name)
+            self._categories.append(category)
+        else:
+            self._names[slot] = name
+            self._categories[slot] = category
+        self._dirty = True
+        return slot
+
+    def remove_skill(self, skill_id):
+        self.remove_skills((skill_id,))
+
+    def remove_skills(self, skill_ids: Iterable[str]):
+        """Tombstone a batch of skills with one pass over the edge sets"""
+        skill_ids = tuple(skill_ids)
+        self._record("remove_skills", skill_ids)
+        slots, cleared = set(), 0
+        for skill_id in skill_ids:
+            slot = self._slots.pop(skill_id, None)
+            if slot is not None:
+                self._ids[slot] = None
+                slots.add(slot)
+                cleared |= 1 << slot
+        if not slots:
+            return
+        self._prereq_edges = {e for e in self._prereq_edges if e[0] not in slots and e[1] not in slots}
+        self._relates_edges = {e for e in self._relates_edges if e[0] not in slots and e[1] not in slots}
+        for user_id in self._learned:
+            self._learned[user_id] &= ~cleared
+        self._dirty = True
+
+    def add_edge(self, source_id, target_id, rel_type):
+        self._record("add_edge", source_id, target_id, rel_type)
+        src, dst = self._slots.get(source_id), self._slots.get(target_id)
+        if src is None or dst is None:
+            return
+        if rel_type == "PREREQUISITE_OF":
+            self._prereq_edges.add((src, dst))
+        elif rel_type == "RELATES_TO":
+            self._relates_edges.add((src, dst))
+        self._dirty = True
+
+    def remove_edge(self, source_id, target_id, rel_type):
+        self._record("remove_edge", source_id, target_id, rel_type)
+        src, dst = self._slots.get(source_id), self._slots.get(target_id)
+        if src is None or dst is None:
+            return
+        if rel_type == "PREREQUISITE_OF":
+            self._prereq_edges.discard((src, dst))
+        elif rel_type == "RELATES_TO":
+            self._relates_edges.discard((src, dst))
+        self._dirty = True
+
+    def set_learned(self, user_id, skill_id, learned=True):
+        slot = self._slots.get(skill_id)
+        if slot is None or user_id not in self._learned:
+            return
+        if learned:
+            self._learned[user_id] |= 1 << slot
+        else:
+            self._learned[user_id] &= ~(1 << slot)
+
+    def sync_learned(self, user_id, skill_ids: Iterable[str]):
+        bitset = 0
+        for skill_id in skill_ids:
+            slot = self._slots.get(skill_id)
+            if slot is not None:
+                bitset |= 1 << slot
+        self._learned[user_id] = bitset
+
+    def has_user(self, user_id):
+        return user_id in self._learned
+
+    # Queries
+
+    def _compact(self):
+        if not self._dirty:
+            return
+        n = len(self._ids)
+        # prerequisites[i]: sources of PREREQUISITE_OF edges into i; dependents[i]: targets out of i
+        self._prereq_ptr, self._prereq_idx = _csr(n, ((dst, src) for src, dst in self._prereq_edges))
+        self._dependent_ptr, self._dependent_idx = _csr(n, self._prereq_edges)
+        self._related_ptr, self._related_idx = _csr(n, self._relates_edges)
+        self._dirty = False
+
+    def prerequisites(self, skill_id) -> List[str]:
+        self._compact()
+        slot = self._slots.get(skill_id)
+        if slot is None:
+            return []
+        ptr = self._prereq_ptr
+        return [self._ids[i] for i in self._prereq_idx[ptr[slot]:ptr[slot + 1]]]
+
+    def related(self, skill_id) -> List[str]:
+        self._compact()
+        slot = self._slots.get(skill_id)
+        if slot is None:
+            return []
+        ptr = self._related_ptr
+        return [self._ids[i] for i in self._related_idx[ptr[slot]:ptr[slot + 1]]]
+
+    def suggestions(self, user_id, limit=5) -> List[dict]:
+        """Unlearned skills with at least one learned prerequisite, readiest first"""
+        self._compact()
+        learned = self._learned.get(user_id, 0)
+        dep_ptr, dep_idx = self._dependent_ptr, self._dependent_idx
+        pre_ptr, pre_idx = self._prereq_ptr, self._prereq_idx
+
+        candidates = set()
+        for slot in _bits(learned):
+            for nxt in dep_idx[dep_ptr[slot]:dep_ptr[slot + 1]]:
+                if not learned >> nxt & 1:
+                    candidates.add(nxt)
+
+        ranked = []
+        for slot in candidates:
+            prereqs = pre_idx[pre_ptr[slot]:pre_ptr[slot + 1]]
+            known = [self._names[p] for p in prereqs if learned >> p & 1]
+            readiness = len(known) / len(prereqs) * 100 if prereqs else 100.0
+            ranked.append((-readiness, -len(known), self._names[slot], slot, known, readiness))
+        ranked.sort()
+
+        return [
+            {
+                "id": self._ids[slot],
+                "name": self._names[slot],
+                "category": self._categories[slot],
+                "prerequisites": known,
+                "readiness": readiness,
+            }
+            for _, _, _, slot, known, readiness in ranked[:limit]
+        ]
+
+
+skill_index = SkillGraphIndex(ttl_seconds=float(os.getenv("SKILL_INDEX_TTL", "600")))
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Concurrency benchmark - blocking sync Neo4j calls vs the async repository
+
+Fires N concurrent "dashboard requests" (knowledge graph + skill confidence
+reads) inside one event loop, the way uvicorn serves them:
+
+  * blocking: sync driver session.run() called directly from a coroutine,
+    which is what the routers did before the async repository
+  * async:    GraphRepository on the shared AsyncGraphDatabase driver
+
+Needs a reachable Neo4j (NEO4J_URI / NEO4J_USER / NEO4J_PASSWORD).
+
+    python benchmarks/bench_async_concurrency.py --requests 200 --concurrency 50
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+from dotenv import load_dotenv
+
+backend_root = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_root))
+load_dotenv(backend_root.parent / '.env.local')
+load_dotenv(backend_root.parent / '.env')
+
+from app.database import Neo4jConnection
+from app.repository import GraphRepository
+
+
+NODES_QUERY = """
+MATCH (s:Skill)
+OPTIONAL MATCH (u:User {id: $userId})-[l:LEARNED]->(s)
+RETURN s.id as id, s.name as name, s.category as category,
+       COALESCE(l.confidence, 0) as confidence
+"""
+
+LINKS_QUERY = """
+MATCH (s1:Skill)-[r:PREREQUISITE_OF|RELATES_TO]->(s2:Skill)
+RETURN s1.id as source, s2.id as target, type(r) as type
+"""
+
+TOP_SKILLS_QUERY = """
+MATCH (u:User {id: $userId})-[l:LEARNED]->(s:Skill)
+RETURN s.name as skill, l.confidence as confidence
+ORDER BY l.confidence DESC
+LIMIT 6
+"""
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def report(label, latencies, wall):
+    print(f"  {label:<9} throughput {len(latencies) / wall:8.1f} req/s   "
+          f"p50 {percentile(latencies, 50) * 1000:8.1f} ms   "
+          f"p95 {percentile(latencies, 95) * 1000:8.1f} ms   "
+          f"p99 {percentile(latencies, 99) * 1000:8.1f} ms   "
+          f"mean {statistics.mean(latencies) * 1000:8.1f} ms")
+
+
+async def run_load(handler, total, concurrency):
+    # Every request is queued at t0, so latency includes time spent waiting on the loop
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one():
+        async with semaphore:
+            start = time.perf_counter()
+            await handler()
+            latencies.append(time.perf_counter() - start)
+
+    wall_start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(total)))
+    return latencies, time.perf_counter() - wall_start
+
+
+async def main(args):
+    if not Neo4jConnection.is_configured():
+        print("Neo4j not configured - set NEO4J_URI, NEO4J_USER, NEO4J_PASSWORD")
+        sys.exit(1)
+
+    sync_driver = Neo4jConnection.create_driver()
+    repo = GraphRepository()
+
+    async def blocking_request():
+        with sync_driver.session() as session:
+            list(session.run(NODES_QUERY, userId=args.user))
+            list(session.run(LINKS_QUERY))
+            list(session.run(TOP_SKILLS_QUERY, userId=args.user))
+
+    async def async_request():
+        await asyncio.gather(
+            repo.graph_nodes(args.user),
+            repo.graph_links(),
+            repo.top_skills(args.user)
+        )
+
+    try:
+        # Warm both pools so handshakes do not skew the first samples
+        await blocking_request()
+        await Neo4jConnection.warm_up(min(args.concurrency, Neo4jConnection.pool_size()))
+
+        print(f"\n{args.requests} requests, concurrency {args.concurrency}\n")
+        blocking_latencies, blocking_wall = await run_load(blocking_request, args.requests, args.concurrency)
+        report("blocking", blocking_latencies, blocking_wall)
+        async_latencies, async_wall = await run_load(async_request, args.requests, args.concurrency)
+        report("async", async_latencies, async_wall)
+
+        improvement = percentile(blocking_latencies, 99) / max(percentile(async_latencies, 99), 1e-9)
+        print(f"\n  p99 improvement: {improvement:.1f}x")
+    finally:
+        sync_driver.close()
+        await Neo4jConnection.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--user", default=os.getenv("BENCH_USER_ID", "user-1"))
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+"""
+Offline endpoint benchmark - every router through the FastAPI app, no services needed
+
+Neo4j, Firestore and OpenAI are replaced by the in-process stand-ins in
+benchmarks/fakes.py, so this runs on a laptop with no credentials. For each
+graph size it reports per endpoint:
+
+  * throughput (req/s) at the given concurrency
+  * p50 / p95 / p99 latency
+  * peak traced allocation per request (tracemalloc, measured in a separate pass)
+  * errors (non-2xx/304 responses or success=false)
+
+The layout is computed in the background after the first graph request and
+awaited before timing; sizes above GRAPH_LAYOUT_MAX_NODES are served without
+one, as in production. The last row per size runs the generate-skills job
+handler end to end (sharded generation + merge). It rewrites the graph, so
+it always runs last.
+
+    python benchmarks/bench_endpoints.py
+    python benchmarks/bench_endpoints.py --sizes 100,10000 --requests 500 --concurrency 20
+    python benchmarks/bench_endpoints.py --llm-latency 0.4 --json before.json
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import itertools
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Callable, Optional, Union
+
+backend_root = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_root))
+sys.path.insert(0, str(Path(__file__).parent))
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+@dataclass
+class Endpoint:
+    name: str
+    method: str
+    path: Union[str, Callable[[int], str]]
+    body: Optional[Callable[[int], dict]] = None
+    headers: Optional[Callable[[int], dict]] = None
+    before: Optional[Callable[[], None]] = None
+    # Caps the timed requests (None = no cap) and sees the finished row, for endpoints that depend on each other
+    limit: Optional[Callable[[], Optional[int]]] = None
+    after: Optional[Callable[[dict], None]] = None
+
+    def request(self, i):
+        path = self.path(i) if callable(self.path) else self.path
+        return self.method, path, {
+            "json": self.body(i) if self.body else None,
+            "headers": self.headers(i) if self.headers else None,
+        }
+
+
+def ok(response):
+    if response.status_code == 304:
+        return True
+    if response.status_code != 200:
+        return False
+    if response.headers.get("content-type", "").startswith("application/msgpack"):
+        import msgpack
+        payload = msgpack.unpackb(response.content)
+    else:
+        payload = response.json()
+    return not isinstance(payload, dict) or payload.get("success", True) is not False
+
+
+async def send(client, endpoint, i):
+    if endpoint.before:
+        endpoint.before()
+    method, path, kwargs = endpoint.request(i)
+    return await client.request(method, path, **kwargs)
+
+
+async def measure(client, endpoint, counter, requests, concurrency, max_seconds, alloc_samples):
+    # Warm-up request: fills caches and indexes the way the first production request would
+    await send(client, endpoint, next(counter))
+
+    latencies, errors = [], 0
+    deadline = time.perf_counter() + max_seconds
+    issued = itertools.count()
+
+    async def worker():
+        nonlocal errors
+        while next(issued) < requests and time.perf_counter() < deadline:
+            start = time.perf_counter()
+            response = await send(client, endpoint, next(counter))
+            latencies.append(time.perf_counter() - start)
+            errors += not ok(response)
+
+    wall_start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    wall = time.perf_counter() - wall_start
+
+    # Allocation pass is sequential and separate, tracemalloc would distort the timings
+    peaks = []
+    tracemalloc.start()
+    try:
+        for _ in range(alloc_samples):
+            tracemalloc.reset_peak()
+            baseline = tracemalloc.get_traced_memory()[0]
+            await send(client, endpoint, next(counter))
+            peaks.append(tracemalloc.get_traced_memory()[1] - baseline)
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "endpoint": endpoint.name,
+        "requests": len(latencies),
+        "throughput": len(latencies) / wall if wall else 0.0,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "alloc_kib": sum(peaks) / len(peaks) / 1024 if peaks else 0.0,
+        "errors": errors,
+    }
+
+
+def report(size, rows):
+    print(f"\n{size:,} skills")
+    print(f"  {'endpoint':<34}{'n':>6}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"
+          f"{'KiB/req':>11}{'errors':>8}")
+    for row in rows:
+        print(f"  {row['endpoint']:<34}{row['requests']:>6}{row['throughput']:>10.1f}{row['p50_ms']:>10.2f}"
+              f"{row['p95_ms']:>10.2f}{row['p99_ms']:>10.2f}{row['alloc_kib']:>11.1f}{row['errors']:>8}")
+
+
+def endpoints(size, state, GraphVersion, make_etag, graph_layout):
+    today = date.today()
+    last_skill = f"skill-{size - 1}"
+    return [
+        Endpoint("GET knowledge-graph (cached)", "GET", "/api/knowledge-graph"),
+        Endpoint("GET knowledge-graph (rebuild)", "GET", "/api/knowledge-graph", before=GraphVersion.bump),
+        Endpoint("GET knowledge-graph (msgpack)", "GET", "/api/knowledge-graph",
+                 headers=lambda i: {"Accept": "application/msgpack"}),
+        Endpoint("GET knowledge-graph (304)", "GET", "/api/knowledge-graph",
+                 headers=lambda i: {"If-None-Match": make_etag(
+                     "knowledge-graph", "user-1", GraphVersion.tag(), graph_layout.generation, "json")}),
+        Endpoint("GET skill-confidence", "GET", "/api/skill-confidence", before=GraphVersion.bump),
+        Endpoint("GET lvi", "GET", "/api/lvi"),
+        Endpoint("GET lvi (84d, window=7)", "GET",
+                 f"/api/lvi?from={today - timedelta(days=84)}&to={today}&window=7"),
+        Endpoint("GET lvi-trend", "GET", "/api/lvi-trend"),
+        Endpoint("POST generate-learning-path", "POST", "/api/graph-rag/generate-learning-path",
+                 body=lambda i: {"user_id": "user-1", "target_skill_id": last_skill}),
+        Endpoint("POST generate-learning-path +llm", "POST", "/api/graph-rag/generate-learning-path",
+                 body=lambda i: {"user_id": "user-1", "target_skill_id": last_skill, "annotate": True}),
+        Endpoint("POST enrich-skill (llm)", "POST", "/api/graph-rag/enrich-skill",
+                 body=lambda i: {"skill_id": f"skill-{i % size}"}),
+        Endpoint("GET graph-rag status", "GET", "/api/graph-rag/status"),
+        Endpoint("POST activity/sessions", "POST", "/api/activity/sessions", body=lambda i: {
+            "startTime": (datetime.now(timezone.utc) - timedelta(minutes=i)).isoformat(), "duration": 45,
+            "conceptsLearned": [f"concept-{i % 80}"]}),
+        Endpoint("POST activity/applications", "POST", "/api/activity/applications", body=lambda i: {
+            "skillId": f"skill-{i % size}", "appliedAt": datetime.now(timezone.utc).isoformat(), "successRate": 0.7}),
+        Endpoint("POST update-skill-status", "POST", "/api/skills/update-skill-status",
+                 body=lambda i: {"skill_id": f"skill-{i % size}", "learned": i % 2 == 0, "confidence": 60}),
+        Endpoint("POST add-skill (llm)", "POST", "/api/skills/add-skill",
+                 body=lambda i: {"skill_name": f"Bench Skill {i}", "learned": True},
+                 after=lambda row: state.update(skills_added=row["requests"])),
+        # Uses its own counter from 0 and stops at add-skill's count, so it deletes exactly the skills created
+        Endpoint("DELETE delete-skill", "DELETE", lambda i: f"/api/skills/delete-skill/bench-skill-{i}",
+                 limit=lambda: state.get("skills_added")),
+        Endpoint("POST generate-skills (enqueue)", "POST", "/api/graph-rag/generate-skills",
+                 body=lambda i: {"domain": "Benchmarking", "num_skills": 20}),
+        Endpoint("GET jobs", "GET", "/api/jobs"),
+        Endpoint("GET jobs/{id}", "GET", lambda i: f"/api/jobs/{state['job_id']}"),
+    ]
+
+
+async def run_generation_job(num_skills, runs):
+    from app.jobs import JobContext, job_queue
+    from app.routers.graph_rag_admin import GENERATE_SKILLS_JOB, run_generate_skills_job
+
+    # The enqueue endpoint leaves a backlog for the workers; drain it so the timed runs don't share the loop
+    for status in ("queued", "running"):
+        for job in await job_queue.list(limit=1_000_000, status=status):
+            await job_queue.cancel(job["id"])
+
+    latencies, errors = [], 0
+    for _ in range(runs):
+        job = job_queue.store.create(GENERATE_SKILLS_JOB, {"domain": "Benchmarking", "num_skills": num_skills})
+        start = time.perf_counter()
+        try:
+            await run_generate_skills_job(JobContext(job_queue.store, job))
+        except Exception as e:
+            print(f"  generate-skills job failed: {e}")
+            errors += 1
+        latencies.append(time.perf_counter() - start)
+    return {
+        "endpoint": f"job generate-skills ({num_skills}, merge)",
+        "requests": runs,
+        "throughput": runs / sum(latencies),
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "alloc_kib": 0.0,
+        "errors": errors,
+    }
+
+
+async def main(args):
+    import httpx
+    from fakes import FakeFirestore, FakeGraphRepository, FakeOpenAI
+    from main import app
+    from app.cache import GraphVersion, graph_cache
+    from app.database import FirebaseConnection
+    from app.etag import make_etag
+    from app.graph_layout import graph_layout
+    from app.graph_rag import set_async_client
+    from app.repository import set_repository
+    from app.skill_embeddings import skill_embeddings
+    from app.skill_index import skill_index
+
+    llm = FakeOpenAI(latency=args.llm_latency)
+    set_async_client(llm)
+    results = {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        for size in args.sizes:
+            build_start = time.perf_counter()
+            set_repository(FakeGraphRepository.synthetic(size))
+            FirebaseConnection.set_async_firestore(FakeFirestore.synthetic())
+            skill_index.invalidate()
+            skill_embeddings.invalidate()
+            graph_cache.clear()
+            graph_layout.__init__(iterations=graph_layout.iterations, max_nodes=graph_layout.max_nodes)
+            GraphVersion.bump()
+
+            # First graph request pays for the index builds and starts the layout; report both separately
+            await client.get("/api/knowledge-graph")
+            first_request = time.perf_counter() - build_start
+            await graph_layout.wait()
+            layout = ("skipped" if size > graph_layout.max_nodes
+                      else f"{time.perf_counter() - build_start - first_request:.1f}s in the background")
+            job = await client.post("/api/graph-rag/generate-skills", json={"domain": "Benchmarking"})
+            state = {"job_id": job.json()["data"]["job_id"]}
+            print(f"\n[{size:,} skills] fixtures + first graph request: {first_request:.1f}s, layout: {layout}")
+
+            rows = []
+            # Handlers print progress per request; keep it out of the report unless asked for
+            with contextlib.redirect_stdout(sys.stdout if args.verbose else io.StringIO()):
+                for endpoint in endpoints(size, state, GraphVersion, make_etag, graph_layout):
+                    if args.only and not any(part in endpoint.name for part in args.only):
+                        continue
+                    cap = endpoint.limit() if endpoint.limit else None
+                    requests = args.requests if cap is None else min(args.requests, cap)
+                    row = await measure(client, endpoint, itertools.count(), requests,
+                                        args.concurrency, args.max_seconds, args.alloc_samples)
+                    if endpoint.after:
+                        endpoint.after(row)
+                    rows.append(row)
+                if not args.only or any(part in "job generate-skills" for part in args.only):
+                    rows.append(await run_generation_job(args.generate_skills, args.job_runs))
+            report(size, rows)
+            results[size] = rows
+
+    set_async_client(None)
+    set_repository(None)
+    FirebaseConnection.set_async_firestore(None)
+    print(f"\n  fake LLM calls: {llm.calls} at {args.llm_latency * 1000:.0f} ms each")
+    if args.json:
+        Path(args.json).write_text(json.dumps({
+            "args": {k: v for k, v in vars(args).items() if k != "json"},
+            "results": results,
+        }, indent=2))
+        print(f"  wrote {args.json}")
+
+
+def configure_environment(args):
+    # Everything the app reads at import time; the fakes make these values inert
+    os.environ.update({
+        "NEO4J_URI": "bolt://offline.invalid",
+        "NEO4J_USER": "bench",
+        "NEO4J_PASSWORD": "bench",
+        "NEO4J_SCHEMA_BOOTSTRAP": "0",
+        "OPENAI_API_KEY": "offline",
+        "LLM_CACHE_ENABLED": "0",
+        "JOB_DB_PATH": str(Path(tempfile.mkdtemp(prefix="bench-jobs-")) / "jobs.sqlite3"),
+        "GRAPH_LAYOUT_ITERATIONS": str(args.layout_iterations),
+    })
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=lambda s: [int(x) for x in s.split(",")], default=[100, 10000, 100000])
+    parser.add_argument("--requests", type=int, default=200, help="timed requests per endpoint")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--max-seconds", type=float, default=10.0, help="time budget per endpoint")
+    parser.add_argument("--alloc-samples", type=int, default=5)
+    parser.add_argument("--llm-latency", type=float, default=0.0, help="seconds per fake completion")
+    parser.add_argument("--layout-iterations", type=int, default=50)
+    parser.add_argument("--generate-skills", type=int, default=40)
+    parser.add_argument("--job-runs", type=int, default=3)
+    parser.add_argument("--only", action="append", help="substring of endpoint names to run (repeatable)")
+    parser.add_argument("--verbose", action="store_true", help="show the app's own console output")
+    parser.add_argument("--json", help="write results to this file for later comparison")
+    args = parser.parse_args()
+    configure_environment(args)
+    asyncio.run(main(args))
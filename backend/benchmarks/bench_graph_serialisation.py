@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Knowledge graph response benchmark - Pydantic model path vs pre-built rows + orjson
+
+Serves the same synthetic graph through two minimal FastAPI routes over the
+ASGI transport, so FastAPI's own response handling is included:
+
+  * models: GraphNode/GraphLink per record, KnowledgeGraphData.model_dump(),
+            ApiResponse validated and encoded again via response_model
+            (the knowledge-graph route before the fast path)
+  * rows:   graph_rows() dicts serialised with orjson into a raw Response
+  * cached: the rows body already encoded, as served until the graph version changes
+  * msgpack: graph_columns() packed as MessagePack (Accept: application/msgpack)
+
+No services needed. Responses are checked to decode to the same graph.
+
+    python benchmarks/bench_graph_serialisation.py --links 10000,100000
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+backend_root = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_root))
+
+import httpx
+import msgpack
+import numpy as np
+import orjson
+from fastapi import FastAPI
+
+from app.models import ApiResponse, GraphLink, GraphNode, KnowledgeGraphData, SuggestedSkill
+from app.responses import api_body, api_msgpack_body, json_response, msgpack_response
+from app.routers.knowledge_graph import graph_columns, graph_rows
+
+CATEGORIES = ["frontend", "backend", "database", "devops", "ai-ml", "mobile", "security"]
+
+
+def synthetic_records(num_links, seed=7):
+    # Two links per skill on average, like the generated graphs
+    rng = random.Random(seed)
+    num_nodes = max(2, num_links // 2)
+    nodes = [{
+        "id": f"skill-{i}", "name": f"Skill {i}", "category": CATEGORIES[i % len(CATEGORIES)],
+        "confidence": rng.randint(40, 95) if i % 3 == 0 else 0, "learned": i % 3 == 0,
+    } for i in range(num_nodes)]
+    links = [{
+        "source": f"skill-{rng.randrange(num_nodes)}", "target": f"skill-{rng.randrange(num_nodes)}",
+        "type": rng.choice(["PREREQUISITE_OF", "RELATES_TO"]),
+    } for _ in range(num_links)]
+    positions = {n["id"]: (round(rng.uniform(-900, 900), 1), round(rng.uniform(-900, 900), 1)) for n in nodes}
+    suggestions = [{"id": f"skill-{i}", "name": f"Skill {i}", "category": "backend",
+                    "prerequisites": ["Skill 0"], "readinessScore": 80} for i in range(5)]
+    return nodes, links, positions, suggestions
+
+
+def model_payload(nodes_records, links_records, positions, suggestions):
+    nodes = []
+    for record in nodes_records:
+        node = GraphNode(id=str(record["id"]), name=str(record["name"]), category=str(record["category"]),
+                         confidence=float(record["confidence"]), learned=bool(record["learned"]))
+        node.x, node.y = positions.get(node.id, (None, None))
+        nodes.append(node)
+    links = [GraphLink(source=str(r["source"]), target=str(r["target"]), type=str(r["type"]))
+             for r in links_records]
+    return KnowledgeGraphData(nodes=nodes, links=links,
+                              suggestedNextSkills=[SuggestedSkill(**s) for s in suggestions])
+
+
+def row_payload(nodes_records, links_records, positions, suggestions):
+    nodes, links = graph_rows(nodes_records, links_records)
+    for node in nodes:
+        node["x"], node["y"] = positions.get(node["id"], (None, None))
+    return {"nodes": nodes, "links": links, "suggestedNextSkills": suggestions}
+
+
+def build_app(records):
+    app = FastAPI()
+    cached = {}
+
+    @app.get("/models", response_model=ApiResponse)
+    async def models():
+        return ApiResponse(data=model_payload(*records).model_dump(), error=None, success=True)
+
+    @app.get("/rows", response_model=ApiResponse)
+    async def rows():
+        return json_response(api_body(row_payload(*records)))
+
+    @app.get("/cached", response_model=ApiResponse)
+    async def cached_rows():
+        if "body" not in cached:
+            cached["body"] = api_body(row_payload(*records))
+        return json_response(cached["body"])
+
+    @app.get("/msgpack", response_model=ApiResponse)
+    async def columns():
+        return msgpack_response(api_msgpack_body(graph_columns(row_payload(*records))))
+
+    return app
+
+
+def check_columns(body, expected):
+    """Rebuild rows from the columnar body and compare with the JSON payload"""
+    data = msgpack.unpackb(body)["data"]
+    ids, n = data["ids"], data["nodeCount"]
+    categories, types = data["categories"], data["linkTypes"]
+    confidence = np.frombuffer(data["confidence"], "<f4")
+    x = np.frombuffer(data["x"], "<f4")
+    assert [node["id"] for node in expected["nodes"]] == ids[:n]
+    assert [node["category"] for node in expected["nodes"]] == [categories[c] for c in data["category"]]
+    assert np.allclose([node["confidence"] for node in expected["nodes"]], confidence)
+    assert np.allclose([node["x"] for node in expected["nodes"]], x, atol=0.01)
+    links = zip(np.frombuffer(data["source"], "<u4"), np.frombuffer(data["target"], "<u4"), data["linkType"])
+    assert [[l["source"], l["target"], l["type"]] for l in expected["links"]] == \
+        [[ids[s], ids[t], types[k]] for s, t, k in links]
+
+
+async def run(num_links, repeats):
+    app = build_app(synthetic_records(num_links))
+    transport = httpx.ASGITransport(app=app)
+    results = {}
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        bodies = {}
+        for path in ("models", "rows", "cached", "msgpack"):
+            bodies[path] = (await client.get(f"/{path}")).content
+            timings = []
+            for _ in range(repeats):
+                start = time.perf_counter()
+                response = await client.get(f"/{path}")
+                timings.append(time.perf_counter() - start)
+                assert response.status_code == 200
+            results[path] = (statistics.median(timings), len(bodies[path]))
+        assert json.loads(bodies["models"]) == orjson.loads(bodies["rows"]) == orjson.loads(bodies["cached"])
+        check_columns(bodies["msgpack"], orjson.loads(bodies["rows"])["data"])
+
+        # Client side: time to turn each body back into usable structures
+        decode = {
+            "rows": lambda: orjson.loads(bodies["rows"]),
+            "msgpack": lambda: msgpack.unpackb(bodies["msgpack"]),
+        }
+        decode_ms = {}
+        for path, fn in decode.items():
+            start = time.perf_counter()
+            for _ in range(repeats):
+                fn()
+            decode_ms[path] = (time.perf_counter() - start) / repeats * 1000
+
+    baseline = results["models"][0]
+    print(f"\n{num_links:,} links ({num_links // 2:,} nodes), median of {repeats}")
+    for path, (seconds, size) in results.items():
+        print(f"  {path:<8} {seconds * 1000:9.1f} ms   {size / 1024:9.0f} KiB   {baseline / seconds:6.1f}x")
+    print("  decode   " + "   ".join(f"{path} {ms:.1f} ms" for path, ms in decode_ms.items()))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--links", type=lambda s: [int(x) for x in s.split(",")], default=[10000, 100000])
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+    for links in args.links:
+        asyncio.run(run(links, args.repeats))
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Ingestion benchmark - one session.run per row vs batched UNWIND writes
+
+Builds a synthetic graph (default 5,000 skills / 20,000 edges) and loads it
+with app.ingest in a single write transaction. The per-row loop the seeders
+used before is timed on a smaller graph and extrapolated, since running it
+on the full graph takes minutes.
+
+Benchmark skills get ids starting with "bench-" and are deleted afterwards;
+the rest of the graph is left alone. The schema (app.schema) is applied
+first so the edge MATCHes are index seeks on :Skill(id).
+
+Needs a reachable Neo4j (NEO4J_URI / NEO4J_USER / NEO4J_PASSWORD).
+
+    python benchmarks/bench_ingest.py --skills 5000 --edges 20000 --chunk-size 1000
+"""
+
+import argparse
+import asyncio
+import random
+import sys
+import time
+from pathlib import Path
+from dotenv import load_dotenv
+
+backend_root = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_root))
+load_dotenv(backend_root.parent / '.env.local')
+load_dotenv(backend_root.parent / '.env')
+
+from app.database import Neo4jConnection
+from app.graph_rag import Skill, SkillRelationship
+from app.ingest import ingest_graph
+from app.schema import apply_schema
+
+
+PREFIX = "bench-"
+
+
+def synthetic_graph(num_skills, num_edges, seed=7):
+    rng = random.Random(seed)
+    skills = [
+        Skill(
+            id=f"{PREFIX}{i}",
+            name=f"Bench Skill {i}",
+            category=f"Category {i % 12}",
+            description=f"Synthetic benchmark skill {i}",
+            difficulty_level=rng.randint(1, 5),
+            learning_time_hours=rng.randint(5, 80)
+        )
+        for i in range(num_skills)
+    ]
+
+    # Prerequisites point from lower to higher index so the generated graph stays a DAG
+    pairs = set()
+    while len(pairs) < min(num_edges, num_skills * (num_skills - 1) // 2):
+        a, b = rng.sample(range(num_skills), 2)
+        pairs.add((min(a, b), max(a, b)))
+    relationships = [
+        SkillRelationship(
+            source_skill_id=f"{PREFIX}{a}",
+            target_skill_id=f"{PREFIX}{b}",
+            relationship_type="PREREQUISITE_OF" if rng.random() < 0.6 else "RELATES_TO",
+            strength=round(rng.uniform(0.5, 1.0), 2)
+        )
+        for a, b in pairs
+    ]
+    return skills, relationships
+
+
+async def cleanup(session):
+    result = await session.run(
+        "MATCH (s:Skill) WHERE s.id STARTS WITH $prefix DETACH DELETE s RETURN count(s) as deleted",
+        prefix=PREFIX
+    )
+    await result.consume()
+
+
+async def per_row(session, skills, relationships):
+    for skill in skills:
+        await session.run("""
+            CREATE (s:Skill {
+                id: $id,
+                name: $name,
+                category: $category,
+                description: $description,
+                difficulty_level: $difficulty,
+                learning_time_hours: $hours
+            })
+        """, id=skill.id, name=skill.name, category=skill.category, description=skill.description,
+             difficulty=skill.difficulty_level, hours=skill.learning_time_hours)
+    for rel in relationships:
+        await session.run(f"""
+            MATCH (s1:Skill {{id: $source}})
+            MATCH (s2:Skill {{id: $target}})
+            CREATE (s1)-[:{rel.relationship_type} {{strength: $strength}}]->(s2)
+        """, source=rel.source_skill_id, target=rel.target_skill_id, strength=rel.strength)
+
+
+async def main(args):
+    if not Neo4jConnection.is_configured():
+        print("Neo4j not configured - set NEO4J_URI, NEO4J_USER, NEO4J_PASSWORD")
+        sys.exit(1)
+
+    skills, relationships = synthetic_graph(args.skills, args.edges)
+    rows = len(skills) + len(relationships)
+
+    # Baseline graph is smaller but keeps the same edge/skill ratio
+    slice_skills, slice_rels = synthetic_graph(
+        args.baseline_skills, args.baseline_skills * args.edges // max(args.skills, 1)
+    )
+    slice_rows = len(slice_skills) + len(slice_rels)
+
+    try:
+        await apply_schema()
+        async with Neo4jConnection.session() as session:
+            await cleanup(session)
+
+            print(f"\nper-row baseline: {len(slice_skills)} skills / {len(slice_rels)} edges")
+            start = time.perf_counter()
+            await per_row(session, slice_skills, slice_rels)
+            baseline = time.perf_counter() - start
+            await cleanup(session)
+            baseline_rate = slice_rows / baseline
+            print(f"  {baseline:8.2f} s   {baseline_rate:10.0f} rows/s   "
+                  f"(~{rows / baseline_rate:.0f} s extrapolated to {rows} rows)")
+
+            print(f"\nUNWIND bulk: {len(skills)} skills / {len(relationships)} edges, chunk size {args.chunk_size}")
+            start = time.perf_counter()
+            counts = await session.execute_write(ingest_graph, skills, relationships, args.chunk_size)
+            bulk = time.perf_counter() - start
+            print(f"  {bulk:8.2f} s   {rows / bulk:10.0f} rows/s   "
+                  f"{counts['skills']} skills, {counts['relationships']} edges, {counts['batches']} batches")
+
+            print(f"\n  speedup: {(rows / bulk) / baseline_rate:.1f}x")
+            await cleanup(session)
+    finally:
+        await Neo4jConnection.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--skills", type=int, default=5000)
+    parser.add_argument("--edges", type=int, default=20000)
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--baseline-skills", type=int, default=250)
+    asyncio.run(main(parser.parse_args()))
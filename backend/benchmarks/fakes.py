@@ -0,0 +1,429 @@
+"""
+In-process stand-ins for Neo4j, Firestore and OpenAI used by the offline benchmarks
+
+  * FakeGraphRepository - GraphRepository over dicts, installed with set_repository()
+  * FakeFirestore       - async Firestore subset the routers use (queries, documents,
+                          batches, Increment / ArrayUnion / SERVER_TIMESTAMP)
+  * FakeOpenAI          - AsyncOpenAI with a configurable per-call latency, returning
+                          canned JSON shaped for each GraphRAG prompt
+
+They model data shape and call patterns, not server-side cost: queries are
+linear scans and nothing is serialised over a wire.
+"""
+
+import asyncio
+import functools
+import inspect
+import itertools
+import json
+import random
+import re
+import uuid
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from typing import Dict, List, Optional
+
+from google.cloud.firestore_v1.transforms import ArrayUnion, Increment, Sentinel
+
+from app.graph_diff import diff_graph
+from app.ingest import RELATIONSHIP_TYPES, relationship_rows, skill_rows
+from app.metrics import named_query, observe_query
+from app.repository import GraphRepository
+
+CATEGORIES = ["frontend", "backend", "database", "devops", "ai-ml", "mobile", "security"]
+GRAPH_TYPES = ("PREREQUISITE_OF", "RELATES_TO")
+
+
+# Neo4j
+
+class FakeGraphRepository(GraphRepository):
+    """GraphRepository over in-memory skills, typed edges and LEARNED confidences"""
+
+    def __init__(self):
+        self.skills: Dict[str, dict] = {}
+        self.by_name: Dict[str, str] = {}
+        self.edges: Dict[tuple, Optional[float]] = {}
+        self.learned: Dict[str, Dict[str, int]] = {}
+
+    @classmethod
+    def synthetic(cls, num_skills, edges_per_skill=2, learned_fraction=0.3, user_id="user-1", seed=7):
+        """Random DAG-ish graph: edges point from lower to higher index, as prerequisites do"""
+        rng = random.Random(seed)
+        repo = cls()
+        for i in range(num_skills):
+            repo._put_skill({
+                "id": f"skill-{i}", "name": f"Skill {i}", "category": CATEGORIES[i % len(CATEGORIES)],
+                "description": f"Synthetic skill number {i}", "difficulty": 1 + i % 5, "hours": 10 + i % 40,
+            })
+        for i in range(1, num_skills):
+            for _ in range(edges_per_skill):
+                j = rng.randrange(i)
+                repo.edges[(f"skill-{j}", f"skill-{i}", rng.choice(GRAPH_TYPES))] = 0.8
+        repo.learned[user_id] = {
+            f"skill-{i}": rng.randint(40, 95) for i in range(num_skills) if rng.random() < learned_fraction
+        }
+        return repo
+
+    def _put_skill(self, row):
+        self.skills[row["id"]] = row
+        self.by_name[row["name"]] = row["id"]
+
+    def _drop_skills(self, skill_ids):
+        # One pass over the edges for the whole set; merges can remove most of a large graph
+        skill_ids = set(skill_ids)
+        for skill_id in skill_ids:
+            row = self.skills.pop(skill_id)
+            self.by_name.pop(row["name"], None)
+        self.edges = {key: value for key, value in self.edges.items()
+                      if key[0] not in skill_ids and key[1] not in skill_ids}
+        for learned in self.learned.values():
+            for skill_id in skill_ids:
+                learned.pop(skill_id, None)
+
+    async def _run(self, query, **params):
+        raise RuntimeError("FakeGraphRepository does not execute Cypher")
+
+    # Knowledge graph reads
+
+    async def graph_nodes(self, user_id):
+        learned = self.learned.get(user_id, {})
+        return [
+            {"id": s["id"], "name": s["name"], "category": s["category"],
+             "confidence": learned.get(s["id"], 0), "learned": s["id"] in learned}
+            for s in self.skills.values()
+        ]
+
+    async def graph_links(self):
+        return [{"source": s, "target": t, "type": r} for (s, t, r) in self.edges if r in GRAPH_TYPES]
+
+    async def skill_topology(self):
+        return [{"id": s["id"], "name": s["name"], "category": s["category"]} for s in self.skills.values()]
+
+    async def top_skills(self, user_id, limit=6):
+        learned = sorted(self.learned.get(user_id, {}).items(), key=lambda item: -item[1])[:limit]
+        return [{"skill": self.skills[skill_id]["name"], "confidence": c} for skill_id, c in learned]
+
+    # Skill lookups
+
+    async def skill_exists(self, skill_id):
+        return skill_id in self.skills
+
+    async def get_skill(self, skill_id):
+        return dict(self.skills[skill_id]) if skill_id in self.skills else None
+
+    async def get_skills(self, skill_ids):
+        return [dict(self.skills[skill_id]) for skill_id in skill_ids if skill_id in self.skills]
+
+    async def all_skills(self):
+        return [dict(s) for s in self.skills.values()]
+
+    async def learned_skill_ids(self, user_id):
+        return list(self.learned.get(user_id, {}))
+
+    # Skill writes
+
+    async def create_skill(self, skill_id, name, category, description, difficulty, learning_time):
+        self._put_skill({"id": skill_id, "name": name, "category": category, "description": description,
+                         "difficulty": difficulty, "hours": learning_time})
+
+    def _resolve(self, skill_id, name):
+        return list(dict.fromkeys(i for i in (skill_id if skill_id in self.skills else None,
+                                              self.by_name.get(name)) if i))
+
+    async def link_related(self, skill_id, related_id, related_name):
+        if skill_id not in self.skills:
+            return []
+        linked = self._resolve(related_id, related_name)
+        for other in linked:
+            self.edges[(skill_id, other, "RELATES_TO")] = None
+        return linked
+
+    async def link_prerequisite(self, skill_id, prereq_id, prereq_name):
+        if skill_id not in self.skills:
+            return []
+        linked = self._resolve(prereq_id, prereq_name)
+        for other in linked:
+            self.edges[(other, skill_id, "PREREQUISITE_OF")] = None
+        return linked
+
+    async def delete_skill(self, skill_id):
+        if skill_id not in self.skills:
+            return 0
+        self._drop_skills([skill_id])
+        return 1
+
+    # LEARNED edges
+
+    async def add_learned(self, user_id, skill_id, confidence):
+        if skill_id in self.skills:
+            self.learned.setdefault(user_id, {})[skill_id] = confidence
+
+    set_learned = add_learned
+
+    async def remove_learned(self, user_id, skill_id):
+        self.learned.get(user_id, {}).pop(skill_id, None)
+
+    # Bulk graph replacement
+
+    async def replace_graph(self, skills, relationships, user_id, chunk_size=None):
+        self.skills, self.by_name, self.edges = {}, {}, {}
+        self.learned = {user: {} for user in self.learned}
+        rows = skill_rows(skills)
+        for row in rows:
+            self._put_skill(row)
+        grouped, skipped = relationship_rows(relationships)
+        for rel_type, rel_rows in grouped.items():
+            for row in rel_rows:
+                if row["source"] in self.skills and row["target"] in self.skills:
+                    self.edges[(row["source"], row["target"], rel_type)] = row["strength"]
+        self._learn_some(user_id, [row["id"] for row in rows])
+        return {"skills": len(rows), "relationships": sum(len(r) for r in grouped.values()),
+                "skipped_relationships": skipped, "batches": 1}
+
+    async def merge_graph(self, skills, relationships, user_id, chunk_size=None):
+        current_edges = [{"source": s, "target": t, "type": r, "strength": strength}
+                         for (s, t, r), strength in self.edges.items() if r in RELATIONSHIP_TYPES]
+        delta = diff_graph(list(self.skills.values()), current_edges, skills, relationships)
+        self._drop_skills(delta.removed_skill_ids)
+        for row in delta.added_skills + delta.changed_skills:
+            self._put_skill(dict(row))
+        for row in delta.removed_edges:
+            self.edges.pop((row["source"], row["target"], row["type"]), None)
+        for row in delta.added_edges + delta.changed_edges:
+            self.edges[(row["source"], row["target"], row["type"])] = row.get("strength")
+        self._learn_some(user_id, [row["id"] for row in delta.added_skills])
+        return delta, {"batches": 1, **delta.summary()}
+
+    def _learn_some(self, user_id, skill_ids):
+        learned = self.learned.setdefault(user_id, {})
+        for skill_id in skill_ids:
+            if (self.skills[skill_id].get("difficulty") or 0) <= 2 and random.random() < 0.6:
+                learned[skill_id] = random.randint(70, 95)
+
+
+def _observed(method):
+    # Stands in for the observe_query() around GraphRepository._run, which the fake never calls
+    @functools.wraps(method)
+    async def wrapper(*args, **kwargs):
+        with observe_query():
+            return await method(*args, **kwargs)
+    return wrapper
+
+
+# Same labelling as repository.py, so benchmarks exercise the per-query metrics path production uses
+for _name, _method in list(vars(FakeGraphRepository).items()):
+    if not _name.startswith("_") and inspect.iscoroutinefunction(_method):
+        setattr(FakeGraphRepository, _name, named_query(_observed(_method)))
+
+
+# Firestore
+
+def _apply_write(current: Optional[dict], data: dict, merge: bool) -> dict:
+    document = dict(current or {}) if merge else {}
+    for key, value in data.items():
+        if isinstance(value, Increment):
+            document[key] = document.get(key, 0) + value.value
+        elif isinstance(value, ArrayUnion):
+            existing = list(document.get(key) or [])
+            document[key] = existing + [v for v in value.values if v not in existing]
+        elif isinstance(value, Sentinel):
+            document[key] = datetime.now(timezone.utc)
+        else:
+            document[key] = value
+    return document
+
+
+class FakeSnapshot:
+    def __init__(self, doc_id, data, reference):
+        self.id = doc_id
+        self._data = data
+        self.reference = reference
+
+    @property
+    def exists(self):
+        return self._data is not None
+
+    def to_dict(self):
+        return dict(self._data) if self._data is not None else None
+
+
+class FakeDocument:
+    def __init__(self, store, collection, doc_id):
+        self._store, self._collection, self.id = store, collection, doc_id
+
+    @property
+    def _docs(self):
+        return self._store.setdefault(self._collection, {})
+
+    async def get(self):
+        return FakeSnapshot(self.id, self._docs.get(self.id), self)
+
+    async def create(self, data):
+        if self.id in self._docs:
+            raise ValueError(f"Document {self._collection}/{self.id} already exists")
+        self._docs[self.id] = _apply_write(None, data, merge=False)
+
+    async def set(self, data, merge=False):
+        self._docs[self.id] = _apply_write(self._docs.get(self.id), data, merge)
+
+    async def delete(self):
+        self._docs.pop(self.id, None)
+
+
+_OPERATORS = {
+    "==": lambda a, b: a == b, ">=": lambda a, b: a >= b, "<=": lambda a, b: a <= b,
+    ">": lambda a, b: a > b, "<": lambda a, b: a < b,
+}
+
+
+class FakeQuery:
+    def __init__(self, store, collection, filters=(), order=None, limit=None):
+        self._store, self._collection = store, collection
+        self._filters, self._order, self._limit = list(filters), order, limit
+
+    def where(self, field, op, value):
+        return FakeQuery(self._store, self._collection, self._filters + [(field, _OPERATORS[op], value)],
+                         self._order, self._limit)
+
+    def order_by(self, field, direction="ASCENDING"):
+        return FakeQuery(self._store, self._collection, self._filters, (field, direction), self._limit)
+
+    def limit(self, count):
+        return FakeQuery(self._store, self._collection, self._filters, self._order, count)
+
+    async def get(self):
+        docs = self._store.get(self._collection, {})
+        matches = [
+            (doc_id, data) for doc_id, data in docs.items()
+            if all(field in data and op(data[field], value) for field, op, value in self._filters)
+        ]
+        if self._order:
+            field, direction = self._order
+            matches.sort(key=lambda item: item[1].get(field), reverse=direction == "DESCENDING")
+        if self._limit is not None:
+            matches = matches[:self._limit]
+        return [FakeSnapshot(doc_id, data, FakeDocument(self._store, self._collection, doc_id))
+                for doc_id, data in matches]
+
+
+class FakeCollection(FakeQuery):
+    def document(self, doc_id=None):
+        return FakeDocument(self._store, self._collection, doc_id or uuid.uuid4().hex[:20])
+
+
+class FakeBatch:
+    def __init__(self):
+        self._writes = []
+
+    def set(self, ref, data, merge=False):
+        self._writes.append((ref, data, merge))
+
+    async def commit(self):
+        for ref, data, merge in self._writes:
+            await ref.set(data, merge=merge)
+
+
+class FakeFirestore:
+    def __init__(self):
+        self.store: Dict[str, Dict[str, dict]] = {}
+
+    def collection(self, name):
+        return FakeCollection(self.store, name)
+
+    def batch(self):
+        return FakeBatch()
+
+    @classmethod
+    def synthetic(cls, user_id="user-1", weeks=12, sessions_per_week=20, applications_per_week=10, seed=7):
+        """Sessions, applications and weekly snapshots ending today"""
+        rng = random.Random(seed)
+        db = cls()
+        now = datetime.now(timezone.utc)
+        concepts = [f"concept-{i}" for i in range(60)]
+        sessions, apps, snapshots = (db.store.setdefault(name, {})
+                                     for name in ("sessions", "skill_applications", "lvi_snapshots"))
+        counter = itertools.count()
+        for week in range(weeks):
+            for _ in range(sessions_per_week):
+                start = now - timedelta(days=week * 7 + rng.random() * 7)
+                sessions[f"s{next(counter)}"] = {
+                    "userId": user_id, "startTime": start, "duration": rng.randint(20, 180),
+                    "conceptsLearned": rng.sample(concepts, rng.randint(0, 3)),
+                }
+            for _ in range(applications_per_week):
+                apps[f"a{next(counter)}"] = {
+                    "userId": user_id, "appliedAt": now - timedelta(days=week * 7 + rng.random() * 7),
+                    "skillId": f"skill-{rng.randrange(100)}", "successRate": rng.random(),
+                }
+            snapshots[f"{user_id}_{week}"] = {
+                "userId": user_id, "weekNumber": 40 - week, "year": now.year, "score": rng.randint(40, 90),
+                "conceptsMastered": rng.randint(2, 12), "applicationRate": rng.random(),
+                "avgTimeToMastery": rng.uniform(2, 8), "createdAt": now - timedelta(days=week * 7),
+            }
+        return db
+
+
+# OpenAI
+
+_LIST_AFTER = re.compile(r"(?:existing skills[^:\n]*:)\n(.+?)\n", re.IGNORECASE)
+
+
+def _candidates(prompt):
+    match = _LIST_AFTER.search(prompt)
+    return [] if not match or match.group(1) == "(none)" else match.group(1).split(", ")
+
+
+def canned_response(messages) -> dict:
+    """A plausible JSON answer for each GraphRAG prompt, chosen by its system message"""
+    system, prompt = messages[0]["content"], messages[-1]["content"]
+    candidates = _candidates(prompt)
+    if "curriculum designer" in system:
+        count = int(re.search(r"Generate (?:up to )?(\d+)", prompt).group(1))
+        category = re.search(r'in the "([^"]+)" category', prompt)
+        prefix = category.group(1) if category else "gen"
+        return {"skills": [
+            {"id": f"{prefix}-{i}", "name": f"{prefix.title()} {i}", "category": prefix if category else CATEGORIES[i % 7],
+             "description": "Generated skill", "difficulty_level": 1 + i % 5, "learning_time_hours": 10 + i}
+            for i in range(count)
+        ]}
+    if "knowledge graph design" in system:
+        ids = re.findall(r'"id": "([^"]+)"', prompt)
+        return {"relationships": [
+            {"source_skill_id": a, "target_skill_id": b, "relationship_type": "PREREQUISITE_OF", "strength": 0.8}
+            for a, b in zip(ids, ids[1:])
+        ]}
+    if "learning path designer" in system:
+        return {"summary": "A generated path.", "tips": ["Practice daily."] * prompt.count('"id"')}
+    if "education expert" in system:
+        return {"resources": [{"title": "Docs", "url": "https://example.com", "type": "docs"}],
+                "projects": [{"title": "Build something", "description": "..."}],
+                "key_concepts": ["basics"], "pitfalls": ["skipping fundamentals"]}
+    if "relationship expert" in system or "prerequisite expert" in system:
+        return candidates[:2]
+    return {"description": "Generated description", "difficulty_level": 2, "learning_time_hours": 20,
+            "related": candidates[:2], "prerequisites": candidates[2:3]}
+
+
+class _Completions:
+    def __init__(self, owner):
+        self._owner = owner
+
+    async def create(self, model, messages, temperature=None, **params):
+        self._owner.calls += 1
+        if self._owner.latency:
+            await asyncio.sleep(self._owner.latency)
+        content = json.dumps(canned_response(messages))
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=content))],
+            usage=SimpleNamespace(prompt_tokens=sum(len(m["content"]) for m in messages) // 4,
+                                  completion_tokens=len(content) // 4)
+        )
+
+
+class FakeOpenAI:
+    """AsyncOpenAI stand-in; install with graph_rag.set_async_client()"""
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.calls = 0
+        self.chat = SimpleNamespace(completions=_Completions(self))
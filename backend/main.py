@@ -1,10 +1,20 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Header, HTTPException
+from fastapi.responses import PlainTextResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
 from dotenv import load_dotenv
 from pathlib import Path
+from typing import Optional
 import os
 import certifi
-from app.routers import knowledge_graph, lvi, lvi_trend, skill_confidence, graph_rag_admin, skill_management
+from app.database import Neo4jConnection
+from app.cache import GraphVersion, graph_cache
+from app.graph_layout import graph_layout
+from app.llm_cache import get_llm_cache
+from app.schema import apply_schema
+from app.jobs import job_queue
+from app import metrics, profiling
+from app.routers import knowledge_graph, lvi, lvi_trend, skill_confidence, graph_rag_admin, skill_management, jobs, activity
 
 project_root = Path(__file__).parent.parent
 load_dotenv(project_root / '.env.local') 
@@ -14,10 +24,34 @@ load_dotenv()
 os.environ['SSL_CERT_FILE'] = certifi.where()
 os.environ['REQUESTS_CA_BUNDLE'] = certifi.where()
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Open the shared Neo4j pool once per process and warm it before traffic arrives
+    if Neo4jConnection.is_configured():
+        try:
+            warmed = await Neo4jConnection.warm_up()
+            print(f"Neo4j pool ready ({warmed} connections warmed)")
+        except Exception as e:
+            print(f"Neo4j warm-up failed, connecting lazily: {e}")
+        if os.getenv("NEO4J_SCHEMA_BOOTSTRAP", "1") not in ("0", "false", "False"):
+            try:
+                for name, status in (await apply_schema()).items():
+                    if status != "ok":
+                        print(f"Neo4j schema {name} not applied: {status}")
+            except Exception as e:
+                print(f"Neo4j schema bootstrap failed: {e}")
+    await job_queue.start()
+    yield
+    await job_queue.stop()
+    await Neo4jConnection.close()
+
+
 app = FastAPI(
     title="Neu4G API",
     description="Learning Analytics Dashboard API",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # CORS middleware - allow frontend origins
@@ -38,14 +72,22 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag"],
 )
 
+if metrics.enabled():
+    app.add_middleware(metrics.RequestMetricsMiddleware)
+if profiling.enabled():
+    app.add_middleware(profiling.ProfilingMiddleware)
+
 app.include_router(knowledge_graph.router, prefix="/api/knowledge-graph", tags=["knowledge-graph"])
 app.include_router(lvi.router, prefix="/api/lvi", tags=["lvi"])
 app.include_router(lvi_trend.router, prefix="/api/lvi-trend", tags=["lvi-trend"])
 app.include_router(skill_confidence.router, prefix="/api/skill-confidence", tags=["skill-confidence"])
 app.include_router(graph_rag_admin.router, prefix="/api/graph-rag", tags=["graph-rag"])
 app.include_router(skill_management.router, prefix="/api/skills", tags=["skills"])
+app.include_router(jobs.router, prefix="/api/jobs", tags=["jobs"])
+app.include_router(activity.router, prefix="/api/activity", tags=["activity"])
 
 
 @app.get("/")
@@ -58,6 +100,46 @@ async def health():
     return {"status": "healthy"}
 
 
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    """Request, Neo4j, Firestore and OpenAI latency histograms in Prometheus text format"""
+    return Response(content=metrics.registry.render(), media_type=metrics.CONTENT_TYPE)
+
+
+@app.get("/debug/neo4j-pool")
+async def debug_neo4j_pool():
+    """Connection pool statistics for the shared Neo4j driver"""
+    return Neo4jConnection.pool_stats()
+
+
+@app.get("/debug/cache")
+async def debug_cache():
+    """Knowledge graph, layout and LLM response cache statistics"""
+    llm_cache = get_llm_cache()
+    return {
+        "graph_version": GraphVersion.current(),
+        "graph_cache": graph_cache.stats(),
+        "graph_layout": graph_layout.stats(),
+        "llm_cache": llm_cache.stats() if llm_cache else None,
+    }
+
+
+@app.get("/debug/profiles/{name}", include_in_schema=False)
+async def debug_profile(name: str, x_profile_token: Optional[str] = Header(None)):
+    """A stored request profile (collapsed stacks), named by the X-Profile-File response header.
+
+    Needs the same X-Profile-Token as starting a profile when PROFILING_TOKEN is set.
+    """
+    if not profiling.enabled():
+        raise HTTPException(status_code=404, detail="Profile not found")
+    if not profiling.token_matches(x_profile_token):
+        raise HTTPException(status_code=403, detail="Invalid profile token")
+    content = profiling.read_profile(name)
+    if content is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return PlainTextResponse(content)
+
+
 @app.get("/debug/env")
 async def debug_env():
     """Debug endpoint to check environment variables"""
@@ -11,6 +11,7 @@ load_dotenv('../.env.local')
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from app.database import Neo4jConnection
+from app.schema import apply_schema_sync
 
 BASIC_SKILLS = [
     # Programming fundamentals
@@ -34,6 +35,7 @@ def seed_basics():
     driver = None
     try:
         driver = Neo4jConnection.create_driver()
+        apply_schema_sync(driver)
         with driver.session() as session:
             # Create User if doesn't exist
             session.run("""
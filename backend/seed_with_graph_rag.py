@@ -17,6 +17,8 @@ load_dotenv(project_root / '.env')
 # Import after loading env
 from app.graph_rag import GraphRAG
 from app.database import Neo4jConnection
+from app.ingest import ingest_graph_sync
+from app.schema import apply_schema_sync
 
 
 def seed_database_with_graph_rag(domain: str = "Full-Stack Web Development", num_skills: int = 50):
@@ -94,6 +96,7 @@ def seed_database_with_graph_rag(domain: str = "Full-Stack Web Development", num
     print("5. Populating Neo4j database...")
     try:
         driver = Neo4jConnection.create_driver()
+        apply_schema_sync(driver)
         session = driver.session()
         
         try:
@@ -109,44 +112,13 @@ def seed_database_with_graph_rag(domain: str = "Full-Stack Web Development", num
                     u.email = 'demo@vibecoderz.com'
             """)
             
-            # Create skills
-            print(f"   • Creating {len(skills)} skills...")
-            for i, skill in enumerate(skills, 1):
-                session.run("""
-                    CREATE (s:Skill {
-                        id: $id,
-                        name: $name,
-                        category: $category,
-                        description: $description,
-                        difficulty_level: $difficulty_level,
-                        learning_time_hours: $learning_time_hours
-                    })
-                """, **skill.model_dump())
-                
-                if i % 10 == 0:
-                    print(f"      Progress: {i}/{len(skills)} skills created")
+            # Create skills and relationships in batched UNWIND writes
+            print(f"   • Creating {len(skills)} skills and {len(relationships)} relationships...")
+            counts = session.execute_write(ingest_graph_sync, skills, relationships)
+            created_count = counts["relationships"]
             
-            print(f"   ✅ Created {len(skills)} skills")
-            
-            # Create relationships
-            print(f"   • Creating {len(relationships)} relationships...")
-            created_count = 0
-            for rel in relationships:
-                try:
-                    session.run(f"""
-                        MATCH (s1:Skill {{id: $source}})
-                        MATCH (s2:Skill {{id: $target}})
-                        CREATE (s1)-[:{rel.relationship_type} {{strength: $strength}}]->(s2)
-                    """, 
-                    source=rel.source_skill_id,
-                    target=rel.target_skill_id,
-                    strength=rel.strength)
-                    created_count += 1
-                except:
-                    # Skip if skills don't exist
-                    pass
-            
-            print(f"   ✅ Created {created_count} relationships")
+            print(f"   ✅ Created {counts['skills']} skills")
+            print(f"   ✅ Created {created_count} relationships in {counts['batches']} batches")
             
             # Assign random skills to user as "learned"
             print("   • Assigning learned skills to user...")
@@ -41,12 +41,16 @@ async function seed() {
   console.log('Seeding Firestore...\n');
   const userId = 'user-1';
 
-  // Clear existing
-  for (const col of ['sessions', 'skill_applications', 'lvi_snapshots']) {
+  // Clear existing - lvi_weekly too: the backend only rebuilds a week's rollup
+  // from sessions/applications when its document is missing
+  for (const col of ['sessions', 'skill_applications', 'lvi_snapshots', 'lvi_weekly']) {
     const snap = await db.collection(col).get();
-    const batch = db.batch();
-    snap.docs.forEach(doc => batch.delete(doc.ref));
-    await batch.commit();
+    // A batch takes at most 500 writes
+    for (let i = 0; i < snap.docs.length; i += 500) {
+      const batch = db.batch();
+      snap.docs.slice(i, i + 500).forEach(doc => batch.delete(doc.ref));
+      await batch.commit();
+    }
   }
 
   const skillIds = ['react', 'typescript', 'nextjs', 'nodejs', 'graphql', 'tailwind', 'd3', 'postgresql', 'docker', 'jwt'];
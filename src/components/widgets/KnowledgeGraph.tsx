@@ -117,6 +117,15 @@ export function KnowledgeGraph({ className }: { className?: string }) {
     // Make a copy so D3 can mutate it
     const data: KnowledgeGraphData = JSON.parse(JSON.stringify(graph));
 
+    // Server-side layout is centred on the origin; shift it into the viewport
+    const prelaid = data.nodes.every(n => n.x != null && n.y != null);
+    if (prelaid) {
+      data.nodes.forEach(n => {
+        n.x = n.x! + width / 2;
+        n.y = n.y! + height / 2;
+      });
+    }
+
     // Setup zoom behavior
     const container = svg.append('g');
     const zoom = d3.zoom<SVGSVGElement, unknown>()
@@ -255,7 +264,7 @@ export function KnowledgeGraph({ className }: { className?: string }) {
       .style('pointer-events', 'none');
 
     // Update positions on each tick
-    simulation.on('tick', () => {
+    const ticked = () => {
       linkElements
         .attr('x1', d => (d.source as GraphNode).x!)
         .attr('y1', d => (d.source as GraphNode).y!)
@@ -263,7 +272,14 @@ export function KnowledgeGraph({ className }: { className?: string }) {
         .attr('y2', d => (d.target as GraphNode).y!);
       
       nodeGroups.attr('transform', d => `translate(${d.x},${d.y})`);
-    });
+    };
+    simulation.on('tick', ticked);
+
+    // Pre-laid graphs render at once; the simulation only runs again while dragging
+    if (prelaid) {
+      simulation.stop();
+      ticked();
+    }
 
     // Cleanup
     return () => {